@@ -0,0 +1,256 @@
+# End-to-end benchmarks of the operations that get slow on large corpora: loading and saving a corpus, updating
+# outdated paths (Corpus.add_missing_paths), searching for each type of target (SearchModel.search_corpus), building
+# the results tables for all of them, exporting to and importing from JSON, and merging corpora. Corpora are synthetic (see syntheticcorpus.py), with a configurable
+# number of signs, modules per sign and checked paths per module.
+#
+# Each operation is repeated a few times; the fastest and median times are printed, and with --output they're written
+# to a JSON file along with the parameters and the current git commit. Pass an earlier run's file to --compare to see
+# how much each operation has sped up or slowed down since then, eg:
+#     python -m benchmarks.benchmarksuite --output before.json
+#     (check out another commit)
+#     python -m benchmarks.benchmarksuite --output after.json --compare before.json
+#
+# Run from src/main/python; see --help for the other options.
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+
+from PyQt5.QtWidgets import QApplication
+
+from benchmarks.corpuscompression import loadcorpus, savecorpus
+from benchmarks.syntheticcorpus import writesyntheticcorpus, allmoduletypes
+from gui.background_job import ForegroundJob
+from gui.exportcorpus_dialog import exportcorpus
+from gui.importcorpus_dialog import ImportCorpusWizard
+from gui.mergecorpora_dialog import mergesigns
+from lexicon.lexicon_classes import Corpus
+from lexicon.module_classes import SignLevelInformation, ExtendedFingersModule, PhonLocations, ModuleTypes, \
+    RelationModule, RelationX, RelationY, ContactRelation, BodypartInfo
+from models.location_models import BodypartTreeModel
+from search.search_classes import SearchTargetItem, XslotTarget, XslotTypes
+from search.search_models import SearchModel, SearchValuesItem
+from search.results import ResultSummaryModel, IndividualSummaryModel
+from serialization_classes import nocompression
+from constant import HAND, ARM, LEG, TargetTypes
+
+resultsversion = 1
+
+
+def gitcommit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+# time operation() repetitions times, calling setup() (untimed) before each one
+def timeoperation(operation, repetitions, setup=None):
+    times = []
+    for _ in range(repetitions):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        operation()
+        times.append(time.perf_counter() - start)
+    return {'min': min(times), 'median': statistics.median(times), 'times': times}
+
+
+def searchmodelfortarget(target):
+    searchmodel = SearchModel()
+    searchmodel.matchtype = 'minimal'
+    searchmodel.matchdegree = 'any'
+    target.include = True
+    searchmodel.add_target(target)
+    return searchmodel
+
+
+# one search target of each type, built from sign's contents so that at least that sign matches each of them
+# bodyparts_dict for a RelationModule with no body parts selected
+def uncheckedbodyparts():
+    bodyparts = {}
+    for bodyparttype in [HAND, ARM, LEG]:
+        bodyparts[bodyparttype] = {}
+        for n in [1, 2]:
+            treemodel = BodypartTreeModel(bodyparttype=bodyparttype)
+            treemodel.populate(treemodel.invisibleRootItem())
+            bodyparts[bodyparttype][n] = BodypartInfo(bodyparttype=bodyparttype, bodyparttreemodel=treemodel)
+    return bodyparts
+
+
+def searchtargets(sign):
+    targets = {
+        TargetTypes.XSLOT: SearchTargetItem(name="x-slots", targettype=TargetTypes.XSLOT,
+                                            module=XslotTarget("1", str(sign.xslotstructure.number))),
+        TargetTypes.SIGNLEVELINFO: SearchTargetItem(name="sign-level info", targettype=TargetTypes.SIGNLEVELINFO,
+                                                    module=SignLevelInformation(signlevel_info={
+                                                        'entryid': None, 'gloss': "", 'lemma': sign.signlevel_information.lemma,
+                                                        'idgloss': "", 'source': "", 'signer': "", 'frequency': None,
+                                                        'coder': "", 'date created': None, 'date last modified': None,
+                                                        'note': "", 'handdominance': None})),
+        TargetTypes.SIGNTYPEINFO: SearchTargetItem(name="sign type", targettype=TargetTypes.SIGNTYPEINFO, module=sign.signtype,
+                                                   searchvaluesitem=SearchValuesItem(TargetTypes.SIGNTYPEINFO, sign.signtype)),
+    }
+    for moduletype in allmoduletypes:
+        modules = list(sign.getmoduledict(moduletype).values())
+        if modules:
+            targets[moduletype] = SearchTargetItem(name=moduletype, targettype=moduletype, xslottype=XslotTypes.IGNORE,
+                                                   module=modules[0], searchvaluesitem=SearchValuesItem(moduletype, modules[0]))
+    extendedfingers = ExtendedFingersModule(i_extended=False,
+                                            finger_selections={"Thumb": "Either", "Index": "Extended", "Middle": "Either",
+                                                               "Ring": "Not extended", "Pinky": "Not extended"},
+                                            num_extended_selections={n: False for n in range(6)},
+                                            articulators=(HAND, {1: True, 2: False}), phonlocs=PhonLocations())
+    targets[TargetTypes.EXTENDEDFINGERS] = SearchTargetItem(name="extended fingers", targettype=ModuleTypes.HANDCONFIG,
+                                                            xslottype=XslotTypes.IGNORE, module=extendedfingers,
+                                                            searchvaluesitem=SearchValuesItem(ModuleTypes.HANDCONFIG, extendedfingers))
+    # "no contact" is saved with no contact type or manner (see RelationSpecificationLayout.getcurrentcontact())
+    nocontact = RelationModule(RelationX(h1=True), RelationY(h2=True), uncheckedbodyparts(), ContactRelation(contact=False),
+                               xy_crossed=False, xy_linked=False, directionslist=None,
+                               articulators=(None, {1: None, 2: None}), phonlocs=PhonLocations())
+    targets["no contact relation"] = SearchTargetItem(name="no contact relation", targettype=ModuleTypes.RELATION,
+                                                      xslottype=XslotTypes.IGNORE, module=nocontact,
+                                                      searchvaluesitem=SearchValuesItem(ModuleTypes.RELATION, nocontact))
+    return targets
+
+
+def mergecorpora(corpora):
+    mergedcorpus = Corpus()
+    duplicatedglosses, glosses_seen, lemmas_seen = {}, defaultdict(list), defaultdict(list)
+    for corpus in corpora:
+        mergesigns(mergedcorpus, corpus, corpus.path, True, duplicatedglosses, glosses_seen, lemmas_seen)
+    return mergedcorpus
+
+
+def runbenchmarks(folder, options):
+    results = {}
+
+    def record(name, result):
+        results[name] = result
+        matches = "{} matches".format(result['matches']) if 'matches' in result else ""
+        print("{:<36}{:>12.3f}{:>12.3f}  {}".format(name, result['min'], result['median'], matches), flush=True)
+
+    signoptions = {'moduletypes': allmoduletypes, 'modulespersign': options.modules,
+                   'checkedpaths': tuple(options.paths)}
+    corpuspath = os.path.join(folder, "synthetic.slpaa")
+    writesyntheticcorpus(corpuspath, options.signs, numvariants=options.variants, **signoptions)
+    print("{} signs; file size {:.1f} MB".format(options.signs, os.path.getsize(corpuspath) / 1e6))
+    print("{:<36}{:>12}{:>12}".format("operation", "min (s)", "median (s)"))
+    repetitions = options.repetitions
+
+    record("load", timeoperation(lambda: loadcorpus(corpuspath), repetitions))
+    corpus = loadcorpus(corpuspath)
+
+    savepath = os.path.join(folder, "saved.slpaa")
+    compression = (nocompression, None)
+    record("save (unchanged signs)", timeoperation(lambda: savecorpus(corpus, savepath, compression), repetitions))
+
+    def markallchanged():
+        for sign in corpus.signs:
+            sign.dirty = True
+    record("save (all signs changed)", timeoperation(lambda: savecorpus(corpus, savepath, compression), repetitions,
+                                                     setup=markallchanged))
+
+    def markallunmigrated():
+        for sign in corpus.signs:
+            sign.migrationversion = 0
+    record("add_missing_paths", timeoperation(corpus.add_missing_paths, repetitions, setup=markallunmigrated))
+
+    referencesign = min(corpus.signs, key=lambda s: s.signlevel_information.entryid.counter)
+    # every target's results together, as a "match any" search for all of them would give
+    allresults = {}
+    for targettype, target in searchtargets(referencesign).items():
+        searchmodel = searchmodelfortarget(target)
+        result = timeoperation(lambda: searchmodel.search_corpus(corpus), repetitions)
+        # so that runs can be checked for giving the same results as well as compared for speed
+        resultsdict = searchmodel.search_corpus(corpus)
+        result['matches'] = sum(len(targetresults['signs']) for targetresults in resultsdict.values())
+        record("search: " + targettype, result)
+        allresults.update(resultsdict)
+
+    def buildresultstables():
+        ResultSummaryModel().populate(allresults)
+        IndividualSummaryModel().populate(allresults)
+    result = timeoperation(buildresultstables, repetitions)
+    result['matches'] = sum(len(targetresults['signs']) for targetresults in allresults.values())
+    record("results tables", result)
+
+    jsonpath = os.path.join(folder, "exported.txt")
+    record("export to JSON", timeoperation(lambda: exportcorpus(corpus, jsonpath, "max"), repetitions))
+    importwizard = ImportCorpusWizard(defaultdict(dict))
+    importedpath = os.path.join(folder, "imported.slpaa")
+    record("import from JSON", timeoperation(lambda: importwizard.import_corpus(ForegroundJob(), jsonpath, importedpath),
+                                             repetitions))
+
+    # merging changes the signs' entry IDs, so each repetition merges freshly-loaded corpora
+    secondpath = os.path.join(folder, "second.slpaa")
+    writesyntheticcorpus(secondpath, options.signs, numvariants=options.variants, seed=options.variants,
+                         firstentryid=options.signs + 1, **signoptions)
+    corpora = []
+
+    def loadcorpora():
+        corpora[:] = [loadcorpus(corpuspath), loadcorpus(secondpath)]
+    record("merge two corpora", timeoperation(lambda: mergecorpora(corpora), repetitions, setup=loadcorpora))
+
+    return results
+
+
+def comparewith(results, previouspath):
+    with open(previouspath) as f:
+        previous = json.load(f)
+    print()
+    print("compared with {} (commit {})".format(previouspath, previous.get('commit', "unknown")))
+    print("{:<36}{:>12}{:>12}{:>10}".format("operation", "before (s)", "after (s)", "change"))
+    for name, result in results.items():
+        if name in previous['results']:
+            before = previous['results'][name]['min']
+            change = (result['min'] - before) / before * 100 if before > 0 else 0
+            differentmatches = "" if result.get('matches') == previous['results'][name].get('matches') \
+                else "  (matches: {} before, {} after)".format(previous['results'][name].get('matches'), result.get('matches'))
+            print("{:<36}{:>12.3f}{:>12.3f}{:>+9.1f}%{}".format(name, before, result['min'], change, differentmatches))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time loading, saving, searching, exporting, importing and merging "
+                                                 "synthetic corpora.")
+    parser.add_argument("--signs", type=int, default=2000, help="number of signs in each corpus")
+    parser.add_argument("--modules", type=int, default=1, help="number of modules of each type per sign")
+    parser.add_argument("--paths", type=int, nargs=2, default=[1, 5], metavar=("MIN", "MAX"),
+                        help="range of the number of checked paths per movement or location module")
+    parser.add_argument("--variants", type=int, default=20, help="number of distinct signs the corpus is built from")
+    parser.add_argument("--repetitions", type=int, default=3, help="number of times each operation is timed")
+    parser.add_argument("--output", help="JSON file to write the results to")
+    parser.add_argument("--compare", help="JSON results file (from an earlier --output) to compare the results with")
+    options = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    with tempfile.TemporaryDirectory() as folder:
+        results = runbenchmarks(folder, options)
+
+    if options.output:
+        with open(options.output, 'w') as f:
+            json.dump({
+                'version': resultsversion,
+                'commit': gitcommit(),
+                'date': datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'parameters': {'signs': options.signs, 'modules': options.modules, 'paths': options.paths,
+                               'variants': options.variants, 'repetitions': options.repetitions},
+                'results': results,
+            }, f, indent=2)
+    if options.compare:
+        comparewith(results, options.compare)
+
+
+if __name__ == '__main__':
+    main()
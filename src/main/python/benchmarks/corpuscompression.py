@@ -0,0 +1,81 @@
+# Compares file size and save/load times of indexed corpus files written with each compression codec (at its lowest,
+# default and highest levels), for the bundled sample corpus and for a scaled-up synthetic corpus.
+# Save time covers compressing and writing every sign record; load time covers reading the file and decoding every sign.
+#
+# Run from src/main/python:
+#     python -m benchmarks.corpuscompression [number of synthetic signs] [number of repetitions]
+
+import os
+import sys
+import tempfile
+import timeit
+
+from PyQt5.QtWidgets import QApplication
+
+from benchmarks.syntheticcorpus import writesyntheticcorpus
+from lexicon.lexicon_classes import Corpus
+from serialization_classes import renamed_load, isindexedcorpusfile, readindexedcorpus, writeindexedcorpus, \
+    recordcodecs, nocompression
+
+samplecorpuspath = os.path.join(os.path.dirname(__file__), "..", "..", "resources", "base", "corpora",
+                                "SLPAA_sample_corpus.slpaa")
+
+
+def loadcorpus(path):
+    if isindexedcorpusfile(path):
+        corpus = Corpus(serializedcorpus=readindexedcorpus(path))
+    else:
+        with open(path, 'rb') as f:
+            corpus = Corpus(serializedcorpus=renamed_load(f))
+    corpus.decodeall()
+    return corpus
+
+
+def savecorpus(corpus, path, compression):
+    with open(path, 'wb') as f:
+        writeindexedcorpus(f, corpus.serializeindexed(list(corpus.signs)), compression=compression)
+
+
+def compressionsettings():
+    settings = [(nocompression, None)]
+    for codec in recordcodecs.values():
+        for level in sorted(set([codec.levels[0], codec.defaultlevel, codec.levels[1]])):
+            settings.append((codec.name, level))
+    return settings
+
+
+def comparecodecs(corpus, folder, repetitions):
+    print("{:<16}{:>12}{:>10}{:>12}{:>12}".format("codec", "size (KB)", "ratio", "save (s)", "load (s)"))
+    uncompressedsize = None
+    for compression in compressionsettings():
+        path = os.path.join(folder, "compressed.slpaa")
+        savetime = min(timeit.repeat(lambda: savecorpus(corpus, path, compression), number=1, repeat=repetitions))
+        size = os.path.getsize(path)
+        uncompressedsize = uncompressedsize or size
+        loadtime = min(timeit.repeat(lambda: loadcorpus(path), number=1, repeat=repetitions))
+        codecname, level = compression
+        label = codecname if level is None else codecname + " " + str(level)
+        print("{:<16}{:>12.1f}{:>9.2f}x{:>12.3f}{:>12.3f}".format(label, size / 1e3, uncompressedsize / size,
+                                                                 savetime, loadtime))
+
+
+def main():
+    app = QApplication.instance() or QApplication(sys.argv)
+    numsigns = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    repetitions = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    with tempfile.TemporaryDirectory() as folder:
+        samplecorpus = loadcorpus(samplecorpuspath)
+        print("sample corpus: {} signs".format(len(samplecorpus)))
+        comparecodecs(samplecorpus, folder, repetitions)
+        print()
+
+        syntheticpath = os.path.join(folder, "synthetic.slpaa")
+        writesyntheticcorpus(syntheticpath, numsigns)
+        syntheticcorpus = loadcorpus(syntheticpath)
+        print("synthetic corpus: {} signs".format(len(syntheticcorpus)))
+        comparecodecs(syntheticcorpus, folder, repetitions)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+# Compares decoding every sign of a synthetic indexed corpus one by one (as happens when each sign is first needed)
+# with decoding them in a pool of worker processes (Corpus.decodeall(parallel=True)), for several pool sizes.
+#
+# Run from src/main/python:
+#     python -m benchmarks.corpusdecoding [number of signs] [number of repetitions]
+
+import os
+import sys
+import tempfile
+import timeit
+
+from PyQt5.QtWidgets import QApplication
+
+from benchmarks.syntheticcorpus import writesyntheticcorpus
+from lexicon.lexicon_classes import Corpus
+from serialization_classes import readindexedcorpus
+
+
+def loadanddecode(path, parallel, processes=None):
+    corpus = Corpus(serializedcorpus=readindexedcorpus(path))
+    corpus.decodeall(parallel=parallel, processes=processes)
+    return corpus
+
+
+def main():
+    app = QApplication.instance() or QApplication(sys.argv)
+    numsigns = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    repetitions = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "synthetic.slpaa")
+        writesyntheticcorpus(path, numsigns)
+        print("{} signs; file size {:.1f} MB".format(numsigns, os.path.getsize(path) / 1e6))
+
+        serialtime = min(timeit.repeat(lambda: loadanddecode(path, parallel=False), number=1, repeat=repetitions))
+        print("{:<20}{:>12}{:>10}".format("decoding", "time (s)", "speedup"))
+        print("{:<20}{:>12.2f}{:>9.1f}x".format("serial", serialtime, 1))
+
+        processcounts = sorted(set([2, 4, os.cpu_count() or 1]))
+        for processes in processcounts:
+            paralleltime = min(timeit.repeat(lambda: loadanddecode(path, parallel=True, processes=processes),
+                                             number=1, repeat=repetitions))
+            print("{:<20}{:>12.2f}{:>9.1f}x".format(str(processes) + " processes", paralleltime, serialtime / paralleltime))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+# Reports how much memory the small value classes in lexicon.module_classes (see SlottedValue) take up in a corpus
+# whose signs have all been decoded, compared with what the same objects would take with a per-instance __dict__
+# (as they had before they used __slots__), and how many AddedInfos are the one shared emptyaddedinfo.
+# Reported for the bundled sample corpus and for a scaled-up synthetic corpus.
+#
+# Run from src/main/python:
+#     python -m benchmarks.corpusmemory [number of synthetic signs]
+
+import gc
+import os
+import sys
+import tempfile
+import types
+from collections import defaultdict
+
+from PyQt5.QtWidgets import QApplication
+
+from benchmarks.corpuscompression import loadcorpus, samplecorpuspath
+from benchmarks.syntheticcorpus import writesyntheticcorpus
+from lexicon.module_classes import SlottedValue, AddedInfo, emptyaddedinfo
+
+
+# the size of an object with the same attribute values as obj, but kept in a __dict__ rather than in slots
+def unslottedsize(obj, unslottedclasses={}):
+    cls = type(obj)
+    if cls not in unslottedclasses:
+        unslottedclasses[cls] = type("Unslotted" + cls.__name__, (), {})
+    unslotted = unslottedclasses[cls]()
+    unslotted.__dict__.update(obj.attributes())
+    return sys.getsizeof(unslotted) + sys.getsizeof(unslotted.__dict__)
+
+
+# counts of, and bytes taken by, each SlottedValue class's instances reachable from root,
+# along with the number of references to emptyaddedinfo
+def slottedvalues(root):
+    counts = defaultdict(int)
+    sizes = defaultdict(int)
+    unslottedsizes = defaultdict(int)
+    emptyreferences = 0
+    seen = set()
+    tovisit = [root]
+    while tovisit:
+        obj = tovisit.pop()
+        for referent in gc.get_referents(obj):
+            if referent is emptyaddedinfo:
+                emptyreferences += 1
+            # don't wander from the corpus into classes, functions, and modules (and from there everything else)
+            if id(referent) in seen or isinstance(referent, (type, types.FunctionType, types.ModuleType)):
+                continue
+            seen.add(id(referent))
+            tovisit.append(referent)
+            if isinstance(referent, SlottedValue):
+                name = type(referent).__name__
+                counts[name] += 1
+                sizes[name] += sys.getsizeof(referent)
+                unslottedsizes[name] += unslottedsize(referent)
+    return counts, sizes, unslottedsizes, emptyreferences
+
+
+def report(corpus):
+    counts, sizes, unslottedsizes, emptyreferences = slottedvalues(corpus)
+    print("{:<24}{:>12}{:>14}{:>16}".format("class", "instances", "slots (KB)", "__dict__ (KB)"))
+    for name in sorted(counts, key=lambda n: -unslottedsizes[n]):
+        print("{:<24}{:>12}{:>14.1f}{:>16.1f}".format(name, counts[name], sizes[name] / 1e3, unslottedsizes[name] / 1e3))
+
+    # each reference to emptyaddedinfo would otherwise have been a separate AddedInfo
+    emptysize = unslottedsize(AddedInfo())
+    print("{:<24}{:>12}{:>14.1f}{:>16.1f}".format("(shared empty AddedInfo)", emptyreferences, 0,
+                                                  emptyreferences * emptysize / 1e3))
+    totalslotted = sum(sizes.values())
+    totalunslotted = sum(unslottedsizes.values()) + emptyreferences * emptysize
+    print("total: {:.1f} KB rather than {:.1f} KB ({:.1f} bytes saved per sign)".format(
+        totalslotted / 1e3, totalunslotted / 1e3, (totalunslotted - totalslotted) / max(1, len(corpus))))
+
+
+def main():
+    app = QApplication.instance() or QApplication(sys.argv)
+    numsigns = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+
+    samplecorpus = loadcorpus(samplecorpuspath)
+    print("sample corpus: {} signs".format(len(samplecorpus)))
+    report(samplecorpus)
+    print()
+
+    with tempfile.TemporaryDirectory() as folder:
+        syntheticpath = os.path.join(folder, "synthetic.slpaa")
+        writesyntheticcorpus(syntheticpath, numsigns)
+        syntheticcorpus = loadcorpus(syntheticpath)
+        print("synthetic corpus: {} signs".format(len(syntheticcorpus)))
+        report(syntheticcorpus)
+
+
+if __name__ == '__main__':
+    main()
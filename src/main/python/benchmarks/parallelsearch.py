@@ -0,0 +1,79 @@
+# Compares searching every sign of a synthetic indexed corpus in this process with searching it in pools of worker
+# processes (SearchModel.search_corpus(processes=...)) of several sizes, and checks that they all find the same signs.
+# The search matches all of the x-slot, sign type and orientation targets built from one of the signs, which the
+# search indexes can't narrow down, so every sign is compared with them.
+# Each pool's first search includes its workers decoding their shares of the corpus, so it's timed separately from the
+# searches after it.
+#
+# Run from src/main/python:
+#     python -m benchmarks.parallelsearch [number of signs] [number of repetitions]
+
+import os
+import sys
+import tempfile
+import time
+import timeit
+
+from PyQt5.QtWidgets import QApplication
+
+from benchmarks.benchmarksuite import searchtargets
+from benchmarks.corpuscompression import loadcorpus
+from benchmarks.syntheticcorpus import writesyntheticcorpus, basicmoduletypes
+from lexicon.module_classes import ModuleTypes
+from search.parallel_search import shutdownsearchworkers
+from search.search_models import SearchModel
+from constant import TargetTypes
+
+
+def searchmodelforsign(sign):
+    searchmodel = SearchModel()
+    searchmodel.matchtype = 'minimal'
+    searchmodel.matchdegree = 'all'
+    targets = searchtargets(sign)
+    for targettype in [TargetTypes.XSLOT, TargetTypes.SIGNTYPEINFO, ModuleTypes.ORIENTATION]:
+        if targettype in targets:
+            targets[targettype].include = True
+            searchmodel.add_target(targets[targettype])
+    return searchmodel
+
+
+def matchingentryids(searchmodel, corpus, processes=None):
+    resultsdict = searchmodel.search_corpus(corpus, processes=processes)
+    return [signlevelinfo.entryid.counter for targetresults in resultsdict.values() for signlevelinfo in targetresults['signs']]
+
+
+def main():
+    app = QApplication.instance() or QApplication(sys.argv)
+    numsigns = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    repetitions = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "synthetic.slpaa")
+        writesyntheticcorpus(path, numsigns, moduletypes=basicmoduletypes + (ModuleTypes.ORIENTATION,))
+        print("{} signs; file size {:.1f} MB".format(numsigns, os.path.getsize(path) / 1e6))
+        corpus = loadcorpus(path)
+        searchmodel = searchmodelforsign(min(corpus.signs, key=lambda s: s.signlevel_information.entryid.counter))
+
+        # (decoding every sign in this process, and building the search indexes, aren't timed)
+        expected = matchingentryids(searchmodel, corpus)
+        serialtime = min(timeit.repeat(lambda: searchmodel.search_corpus(corpus), number=1, repeat=repetitions))
+        print("{} matching signs".format(len(expected)))
+        print("{:<20}{:>16}{:>12}{:>10}".format("searching", "first time (s)", "time (s)", "speedup"))
+        print("{:<20}{:>16}{:>12.3f}{:>9.1f}x".format("in this process", "", serialtime, 1))
+
+        processcounts = sorted(set([1, 2, 4, os.cpu_count() or 1]))
+        for processes in processcounts:
+            start = time.perf_counter()
+            results = matchingentryids(searchmodel, corpus, processes)
+            firsttime = time.perf_counter() - start
+            if results != expected:
+                print("{} processes found different signs!".format(processes))
+            paralleltime = min(timeit.repeat(lambda: searchmodel.search_corpus(corpus, processes=processes),
+                                             number=1, repeat=repetitions))
+            print("{:<20}{:>16.2f}{:>12.3f}{:>9.1f}x".format(str(processes) + " processes", firsttime, paralleltime,
+                                                            serialtime / paralleltime))
+            shutdownsearchworkers()
+
+
+if __name__ == '__main__':
+    main()
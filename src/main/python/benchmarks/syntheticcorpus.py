@@ -0,0 +1,185 @@
+# Builds synthetic indexed corpus files, for benchmarking loading, saving and searching large corpora.
+#
+# Each sign has modulespersign modules of each of the given module types. Serialized movement and location trees hold
+# an entry for every path in the options tree (as trees serialized from a tree model always used to), with a few paths
+# checked. Building that many distinct signs would take a long time, so signs share a small number of distinct records.
+
+import random
+from datetime import datetime
+
+from PyQt5.QtCore import Qt
+
+from lexicon.lexicon_classes import Sign, Corpus
+from lexicon.module_classes import SignLevelInformation, MovementModule, LocationModule, LocationType, AddedInfo, \
+    HandConfigurationModule, OrientationModule, RelationModule, RelationX, RelationY, ContactRelation, ContactType, \
+    MannerRelation, BodypartInfo, Direction, Signtype, XslotStructure, PhonLocations, ModuleTypes, PREDEFINED_MAP
+from models.location_models import locationoptionspaths, BodypartTreeModel
+from models.movement_models import movementoptionspaths
+from serialization_classes import MovementTreeSerializable, LocationTreeSerializable, LocationTableSerializable, \
+    writeindexedcorpus
+from constant import HAND, ARM, LEG, treepathdelimiter
+
+# the module types that signs have unless told otherwise
+basicmoduletypes = (ModuleTypes.MOVEMENT, ModuleTypes.LOCATION)
+# every module type that can be searched for
+allmoduletypes = (ModuleTypes.MOVEMENT, ModuleTypes.LOCATION, ModuleTypes.HANDCONFIG, ModuleTypes.ORIENTATION,
+                  ModuleTypes.RELATION)
+
+# (field number, number of slots) for each field of a hand configuration
+handconfigfields = [(2, 4), (3, 10), (4, 4), (5, 5), (6, 5), (7, 5)]
+
+signtypespecs = [["1h", "1h.moves"], ["1h", "1h.no mvmt"], ["2h", "2h.same HCs", "2h.neither moves"],
+                 ["2h", "2h.different HCs", "2h.both move", "2h.both move.move similarly"]]
+
+
+def syntheticsignlevelinfo(entryid):
+    now = datetime.now()
+    return SignLevelInformation(signlevel_info={
+        'entryid': entryid,
+        'gloss': ["GLOSS" + str(entryid)],
+        'lemma': "lemma" + str(entryid),
+        'idgloss': "idgloss" + str(entryid),
+        'source': "synthetic",
+        'signer': "",
+        'frequency': 1.0,
+        'coder': "benchmark",
+        'date created': now,
+        'date last modified': now,
+        'note': "",
+        'handdominance': 'R',
+    })
+
+
+# checkstates for paths with numchecked of them (chosen at random) checked, and their ancestors partially checked
+#   (as they would be in a tree model)
+def syntheticcheckstates(rng, paths, numchecked):
+    checkstates = {p: Qt.Unchecked for p in paths}
+    for p in rng.sample(paths, numchecked):
+        checkstates[p] = Qt.Checked
+        nodes = p.split(treepathdelimiter)
+        for depth in range(1, len(nodes)):
+            ancestor = treepathdelimiter.join(nodes[:depth])
+            if checkstates.get(ancestor) == Qt.Unchecked:
+                checkstates[ancestor] = Qt.PartiallyChecked
+    return checkstates
+
+
+def syntheticmovementtree(rng, numchecked):
+    paths = list(movementoptionspaths().keys())
+    return MovementTreeSerializable(infodicts={
+        'checkstates': syntheticcheckstates(rng, paths, numchecked),
+        'addedinfos': {p: AddedInfo() for p in paths},
+        'userspecifiedvalues': {},
+    })
+
+
+def syntheticlocationtree(rng, numchecked):
+    locationtree = LocationTreeSerializable()
+    locationtree.locationtype = LocationType(body=True)
+    paths = list(locationoptionspaths(locationtree.locationtype).keys())
+    locationtree.checkstates = syntheticcheckstates(rng, paths, numchecked)
+    locationtree.addedinfos = {p: AddedInfo() for p in paths}
+    locationtree.detailstables = {p: LocationTableSerializable() for p in paths}
+    return locationtree
+
+
+# a hand configuration (as held by HandConfigurationModule) with the given 33-symbol transcription
+def synthetichandconfiguration(transcription):
+    fields = []
+    symbols = iter(transcription)
+    slotnumber = 2
+    for fieldnumber, numslots in handconfigfields:
+        slots = []
+        for _ in range(numslots):
+            slots.append({'slot_number': slotnumber, 'symbol': next(symbols), 'addedinfo': AddedInfo()})
+            slotnumber += 1
+        fields.append({'field_number': fieldnumber, 'slots': slots})
+    return fields
+
+
+def syntheticdirections(rng):
+    directions = []
+    for axis in [Direction.HORIZONTAL, Direction.VERTICAL, Direction.SAGITTAL]:
+        selected = rng.random() < 0.5
+        plus = selected and rng.random() < 0.5
+        directions.append(Direction(axis=axis, axisselected=selected, plus=plus, minus=selected and not plus))
+    return directions
+
+
+# body parts for a relation between H1 and H2, each with one (random) path checked; the other body parts are empty
+def syntheticbodyparts(rng):
+    bodyparts = {}
+    for bodyparttype in [HAND, ARM, LEG]:
+        bodyparts[bodyparttype] = {}
+        for n in [1, 2]:
+            treemodel = BodypartTreeModel(bodyparttype=bodyparttype)
+            treemodel.populate(treemodel.invisibleRootItem())
+            if bodyparttype == HAND:
+                serializedtree = LocationTreeSerializable(treemodel)
+                serializedtree.checkstates[rng.choice(list(serializedtree.checkstates.keys()))] = Qt.Checked
+                treemodel = BodypartTreeModel(bodyparttype=bodyparttype, serializedbodyparttree=serializedtree)
+            bodyparts[bodyparttype][n] = BodypartInfo(bodyparttype=bodyparttype, bodyparttreemodel=treemodel)
+    return bodyparts
+
+
+def syntheticmodule(rng, moduletype, articulators, checkedpaths):
+    if moduletype == ModuleTypes.MOVEMENT:
+        return MovementModule(None, articulators, phonlocs=PhonLocations(),
+                              movementtree=syntheticmovementtree(rng, rng.randint(*checkedpaths)))
+    elif moduletype == ModuleTypes.LOCATION:
+        return LocationModule(None, articulators, phonlocs=PhonLocations(),
+                              locationtree=syntheticlocationtree(rng, rng.randint(*checkedpaths)))
+    elif moduletype == ModuleTypes.HANDCONFIG:
+        return HandConfigurationModule(synthetichandconfiguration(rng.choice(list(PREDEFINED_MAP.keys()))),
+                                       {'forearm': rng.random() < 0.1,
+                                        'forearm_addedinfo': AddedInfo(),
+                                        'overall_addedinfo': AddedInfo()},
+                                       (HAND, {1: True, 2: False}), phonlocs=PhonLocations())
+    elif moduletype == ModuleTypes.ORIENTATION:
+        return OrientationModule(syntheticdirections(rng), syntheticdirections(rng), (HAND, {1: True, 2: False}),
+                                 phonlocs=PhonLocations())
+    elif moduletype == ModuleTypes.RELATION:
+        contact = rng.random() < 0.5
+        return RelationModule(RelationX(h1=True), RelationY(h2=True), syntheticbodyparts(rng),
+                              ContactRelation(contact=contact, contacttype=ContactType(light=contact),
+                                              mannerrel=MannerRelation()),
+                              xy_crossed=False, xy_linked=False, directionslist=syntheticdirections(rng),
+                              articulators=(None, {1: None, 2: None}), phonlocs=PhonLocations())
+    raise ValueError("no synthetic modules of type " + str(moduletype))
+
+
+# a sign (with the given entry ID) whose contents are random but reproducible from seed, with modulespersign modules
+# of each of moduletypes, and between checkedpaths[0] and checkedpaths[1] paths checked in each movement and location
+def syntheticsign(entryid, seed, moduletypes=basicmoduletypes, modulespersign=1, checkedpaths=(1, 5)):
+    rng = random.Random(seed)
+    sign = Sign(signlevel_info=syntheticsignlevelinfo(entryid))
+    sign.signtype = Signtype(rng.choice(signtypespecs))
+    sign.xslotstructure = XslotStructure(number=rng.randint(1, 3))
+    articulators = (HAND, {1: True, 2: rng.random() < 0.5})
+    for moduletype in moduletypes:
+        for _ in range(modulespersign):
+            module = syntheticmodule(rng, moduletype, articulators, checkedpaths)
+            # modules created in quick succession can get the same timestamp-based ID
+            module.uniqueid = float(sum(len(sign.getmoduledict(t)) for t in moduletypes) + 1)
+            sign.addmodule(module)
+    return sign
+
+
+# write an indexed corpus file with numsigns signs (with entry IDs starting from firstentryid), whose contents are
+# taken from numvariants distinct signs; see syntheticsign() for the other arguments
+def writesyntheticcorpus(path, numsigns, numvariants=20, seed=0, firstentryid=1, **signoptions):
+    variantrecords = [syntheticsign(0, seed + v, **signoptions).serializerecord() for v in range(numvariants)]
+    corpus = Corpus(signs=set(), path=path)
+    signs = []
+    for entryid in range(firstentryid, firstentryid + numsigns):
+        sign = Sign(signlevel_info=syntheticsignlevelinfo(entryid))
+        corpus.add_sign(sign)
+        signs.append(sign)
+    serializedcorpus = {
+        'signs': [(s.signlevel_information.serialize(), variantrecords[i % numvariants]) for i, s in enumerate(signs)],
+        'path': path,
+        'minimum id': firstentryid,
+        'highest id': corpus.highestID,
+    }
+    with open(path, 'wb') as f:
+        writeindexedcorpus(f, serializedcorpus)
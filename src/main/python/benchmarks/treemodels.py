@@ -0,0 +1,77 @@
+# Compares the per-module cost of building location and movement tree models from scratch (walking the
+# options structure item by item, as populate() used to do for every model) with copying the shared
+# template trees that populate() now clones from.
+#
+# Run from src/main/python:
+#     python -m benchmarks.treemodels [number of repetitions]
+
+import sys
+import timeit
+
+from PyQt5.QtWidgets import QApplication
+
+from lexicon.module_classes import LocationType
+from models.location_models import LocationTreeModel, locn_options_body, locn_options_purelyspatial
+from models.movement_models import MovementTreeModel
+
+
+# building from scratch: walk the whole options structure
+def rebuildlocationtree(locationtype, structure):
+    treemodel = LocationTreeModel()
+    treemodel.locationtype = locationtype
+    treemodel.populate(treemodel.invisibleRootItem(), structure=structure, pathsofar="")
+    makelistmodel = treemodel.listmodel
+    return treemodel
+
+
+# populating with no options structure copies the template tree
+def clonelocationtree(locationtype):
+    treemodel = LocationTreeModel()
+    treemodel.locationtype = locationtype
+    treemodel.populate(treemodel.invisibleRootItem())
+    makelistmodel = treemodel.listmodel
+    return treemodel
+
+
+def rebuildmovementtree():
+    treemodel = MovementTreeModel()
+    treemodel.populate(treemodel.invisibleRootItem(), structure=treemodel.optionstree, pathsofar="")
+    makelistmodel = treemodel.listmodel
+    return treemodel
+
+
+def clonemovementtree():
+    treemodel = MovementTreeModel()
+    treemodel.populate(treemodel.invisibleRootItem())
+    makelistmodel = treemodel.listmodel
+    return treemodel
+
+
+def main():
+    app = QApplication.instance() or QApplication(sys.argv)
+    repetitions = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    bodytype = LocationType(body=True)
+    spatialtype = LocationType(signingspace=True, purelyspatial=True)
+    cases = [
+        ("location (body)",
+         lambda: rebuildlocationtree(bodytype, locn_options_body),
+         lambda: clonelocationtree(bodytype)),
+        ("location (purely spatial)",
+         lambda: rebuildlocationtree(spatialtype, locn_options_purelyspatial),
+         lambda: clonelocationtree(spatialtype)),
+        ("movement",
+         rebuildmovementtree,
+         clonemovementtree),
+    ]
+
+    print("{:<28}{:>16}{:>16}{:>10}".format("tree", "rebuild (ms)", "clone (ms)", "speedup"))
+    for name, rebuild, clone in cases:
+        clone()  # make sure the template tree has been built, so that it isn't counted in the timings
+        clonetime = min(timeit.repeat(clone, number=1, repeat=repetitions)) * 1000
+        rebuildtime = min(timeit.repeat(rebuild, number=1, repeat=repetitions)) * 1000
+        print("{:<28}{:>16.2f}{:>16.2f}{:>9.1f}x".format(name, rebuildtime, clonetime, rebuildtime / clonetime))
+
+
+if __name__ == '__main__':
+    main()
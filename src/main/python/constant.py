@@ -39,6 +39,11 @@ from lexicon.predefined_handshape import (
 # system info
 FROZEN = hasattr(sys, 'frozen')
 VERSION = (0, 2, 1)  # (major, minor, patch)
+# Version of the backward-compatibility fixes (path renames etc) applied to signs and their movement/location/relation
+# trees on load. Saved signs and serialized trees are stamped with it, so fixes that have already been applied are
+# skipped on later loads. Increment it whenever a fix is added to Corpus.add_missing_paths() or to the tree models'
+# backward compatibility functions.
+MIGRATION_VERSION = 1
 SYSTEM = sys.platform
 
 # symbols
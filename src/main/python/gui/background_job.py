@@ -0,0 +1,187 @@
+import time
+
+from PyQt5.QtCore import QThread, QEventLoop, Qt, pyqtSignal, pyqtSlot
+from PyQt5.QtWidgets import QProgressDialog
+
+
+# raised (in the job's thread) by BackgroundJob.setprogress() once the job has been cancelled
+class JobCancelled(Exception):
+    pass
+
+
+# the number of items passed to each call made by BackgroundJob.inmainthreadbatches()
+mainthreadbatchsize = 50
+
+# the minimum number of seconds between progress signals, so that a fast job doesn't flood the GUI thread with them
+progressinterval = 0.1
+
+
+# Runs function(job, *args, **kwargs) on a worker thread, so that long-running operations (loading, merging, importing
+#   corpora) don't block the GUI; see runjob() for running one behind a progress dialog.
+# The function reports its progress with startphase() and setprogress(), which also raise JobCancelled once cancel() has
+#   been called. Anything that creates Qt objects (eg tree models, when building a sign's modules) or shows dialogs has
+#   to happen on the GUI thread instead: inmainthread() runs it there and waits for the result, and inmainthreadbatches()
+#   does so a few items at a time so that the GUI can repaint and respond to the Cancel button in between.
+# Once the job is finished, exactly one of result, error and cancelled says how it went.
+class BackgroundJob(QThread):
+    # description of the current phase, and the total number of items in it (0 if unknown)
+    phasestarted = pyqtSignal(str, int)
+    # items done and total items in the current phase, items per second, estimated seconds remaining (-1 if unknown),
+    #   and anything else the job has to say about its progress (eg how many matches a search has found so far)
+    progress = pyqtSignal(int, int, float, float, str)
+    mainthreadcall = pyqtSignal(object)
+
+    def __init__(self, function, *args, **kwargs):
+        super().__init__()
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.result = None
+        self.error = None
+        self.cancelled = False
+        self._cancelrequested = False
+        self._phasetotal = 0
+        self._phasestart = 0
+        self._lastprogress = 0
+        # this object lives on the GUI thread, so its slots run there; the worker waits for each call to return
+        self.mainthreadcall.connect(self.runmainthreadcall, Qt.BlockingQueuedConnection)
+
+    def run(self):
+        try:
+            self.result = self.function(self, *self.args, **self.kwargs)
+        except JobCancelled:
+            self.cancelled = True
+        except Exception as e:
+            self.error = e
+
+    # can be called from any thread; the job stops at its next call to setprogress()
+    def cancel(self):
+        self._cancelrequested = True
+
+    def startphase(self, description, total=0):
+        self.checkcancelled()
+        self._phasetotal = total
+        self._phasestart = time.perf_counter()
+        self._lastprogress = 0
+        self.phasestarted.emit(description, total)
+
+    def setprogress(self, done, detail=""):
+        self.checkcancelled()
+        now = time.perf_counter()
+        if now - self._lastprogress < progressinterval and done < self._phasetotal:
+            return
+        self._lastprogress = now
+        elapsed = now - self._phasestart
+        rate = done / elapsed if elapsed > 0 else 0
+        remaining = (self._phasetotal - done) / rate if rate > 0 and self._phasetotal > 0 else -1
+        self.progress.emit(done, self._phasetotal, rate, remaining, detail)
+
+    def checkcancelled(self):
+        if self._cancelrequested:
+            raise JobCancelled()
+
+    # run function(*args, **kwargs) on the GUI thread and return its result (or raise its exception)
+    def inmainthread(self, function, *args, **kwargs):
+        call = {'function': function, 'args': args, 'kwargs': kwargs, 'result': None, 'error': None}
+        self.mainthreadcall.emit(call)
+        if call['error'] is not None:
+            raise call['error']
+        return call['result']
+
+    @pyqtSlot(object)
+    def runmainthreadcall(self, call):
+        try:
+            call['result'] = call['function'](*call['args'], **call['kwargs'])
+        except Exception as e:
+            call['error'] = e
+
+    # start a phase with the given description, and call function(batch) on the GUI thread for successive batches of
+    # items, reporting progress after each one
+    def inmainthreadbatches(self, description, function, items, batchsize=mainthreadbatchsize):
+        self.startphase(description, len(items))
+        for start in range(0, len(items), batchsize):
+            self.inmainthread(function, items[start:start + batchsize])
+            self.setprogress(min(start + batchsize, len(items)))
+
+
+# Stands in for a BackgroundJob when a job's function is called directly on the GUI thread, without progress reporting
+#   (eg when loading a corpus to count its x-slots).
+class ForegroundJob:
+
+    def startphase(self, description, total=0):
+        pass
+
+    def setprogress(self, done, detail=""):
+        pass
+
+    def checkcancelled(self):
+        pass
+
+    def inmainthread(self, function, *args, **kwargs):
+        return function(*args, **kwargs)
+
+    def inmainthreadbatches(self, description, function, items, batchsize=mainthreadbatchsize):
+        for start in range(0, len(items), batchsize):
+            function(items[start:start + batchsize])
+
+
+# Shows a job's progress (how many signs have been processed, how fast, roughly how long is left, and any detail the
+#   job gives), with a Cancel button that cancels the job.
+# If applicationmodal, the dialog blocks the whole app rather than just its parent window (see runjob()).
+class JobProgressDialog(QProgressDialog):
+
+    def __init__(self, job, title, applicationmodal=False, **kwargs):
+        super().__init__(**kwargs)
+        self.job = job
+        self.phasedescription = ""
+        self.setWindowTitle(title)
+        self.setWindowModality(Qt.ApplicationModal if applicationmodal else Qt.WindowModal)
+        self.setAutoClose(False)
+        self.setAutoReset(False)
+        # don't bother showing the dialog for jobs that finish quickly (unless it has to block the app right away)
+        self.setMinimumDuration(0 if applicationmodal else 500)
+        self.setRange(0, 0)
+        self.canceled.connect(self.handle_canceled)
+        job.phasestarted.connect(self.handle_phasestarted)
+        job.progress.connect(self.handle_progress)
+
+    def handle_phasestarted(self, description, total):
+        self.phasedescription = description
+        self.setLabelText(description + "...")
+        # a range of (0, 0) shows a busy indicator
+        self.setRange(0, total)
+        self.setValue(0)
+
+    def handle_progress(self, done, total, rate, remaining, detail):
+        labeltext = self.phasedescription + ": " + str(done) + (" of " + str(total) if total else "") + " signs"
+        if rate > 0:
+            labeltext += "\n" + str(int(rate)) + " signs per second"
+            if remaining >= 0:
+                minutes, seconds = divmod(int(remaining + 0.5), 60)
+                labeltext += ", about " + str(minutes) + ":" + str(seconds).zfill(2) + " remaining"
+        if detail:
+            labeltext += "\n" + detail
+        self.setLabelText(labeltext)
+        if total:
+            self.setValue(done)
+
+    def handle_canceled(self):
+        self.setLabelText("Cancelling...")
+        self.job.cancel()
+
+
+# Run job (a BackgroundJob) behind a progress dialog, processing events (so that the GUI stays responsive) until it's
+#   finished, and return it so that the caller can check its result, error, or whether it was cancelled.
+# A job that reads data the rest of the app could change while it runs (eg a search reading the open corpus's signs)
+#   needs applicationmodal, so that nothing else in the app can be used until it's finished.
+def runjob(job, title, parent=None, applicationmodal=False):
+    dialog = JobProgressDialog(job, title, applicationmodal=applicationmodal, parent=parent)
+    if applicationmodal:
+        dialog.show()
+    loop = QEventLoop()
+    job.finished.connect(loop.quit)
+    job.start()
+    loop.exec_()
+    dialog.close()
+    dialog.deleteLater()
+    return job
@@ -39,6 +39,10 @@ def check_unsaved_change(func):
             elif warning_box.clickedButton() == btn_save:
                 self.on_action_save(clicked=False)
 
+        # make sure any save still running in the background has finished (successfully) before proceeding
+        if not self.wait_for_save():
+            return event.ignore() if event else None
+
         func(self, event, *args, **kwargs)
     return wrapper_check_unsaved_change
 
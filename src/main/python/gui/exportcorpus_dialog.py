@@ -19,6 +19,18 @@ from PyQt5.QtCore import pyqtSignal, Qt
 from gui.modulespecification_widgets import StatusDisplay
 from gui.helper_widget import OptionSwitch
 from constant import SYSTEM
+from lexicon.module_classes import SlottedValue
+from lexicon.lexicon_classes import isaxisofrelationtree
+from models.location_models import expandlocationtree
+from models.movement_models import expandmovementtree
+
+
+# for json.dump(s), which writes objects that aren't already json-serializable as dicts of their attributes
+def jsonattributes(obj):
+    if isinstance(obj, SlottedValue):
+        return obj.attributes()
+    return getattr(obj, '__dict__', str(obj))
+
 
 # wizard that walks the user through exporting the current corpus as a .json file (currently only one format available)
 class ExportCorpusWizard(QWizard):
@@ -67,37 +79,7 @@ class ExportCorpusWizard(QWizard):
     def export_corpus(self):
         if self.parent().corpus is None:
             return "export failed - corpus does not exist"
-
-        serialized_corpus = self.parent().corpus.serialize()
-        with io.open(str(self.field("exportedfilepath")), 'w') as exfile:
-            # OK, this is a bit convoluted, but it seems like the most general way to be able to omit values
-            # that are empty/zero/false/null, is to convert everything to json format and read it back in so
-            # all of the data is in either dicts or lists (rather than objects).
-            # If we end up wanting to do something prettier or more customized in the future,
-            # this kind of cleaning might have to be done in the data classes themselves.
-
-            try:
-                # for json.dumps, can also specify separators=(item_separator, key_separator)
-                # default is (', ', ': ') if indent is None and (',', ': ') otherwise
-                thestring = json.dumps(serialized_corpus, indent=3, default=lambda x: getattr(x, '__dict__', str(x)))
-            except Exception:
-                return "export failed - writing original json"
-            try:
-                reloaded = json.loads(thestring)
-            except json.JSONDecodeError:
-                return "export failed - not a valid JSON document"
-            except UnicodeDecodeError:
-                return "export failed - JSON does not contain UTF-8, UTF-16 or UTF-32 encoded data"
-            try:
-                cleaned = cleandictsforexport(reloaded, self.detaillevel)
-            except Exception:
-                return "export failed - cleaning JSON"
-            try:
-                json.dump(cleaned, exfile, indent=3, default=lambda x: getattr(x, '__dict__', str(x)))
-            except Exception:
-                return "export failed - writing cleaned JSON"
-
-        return "export completed"
+        return exportcorpus(self.parent().corpus, str(self.field("exportedfilepath")), self.detaillevel)
 
 
 # wizard page that asks the user to select the file format for the export,
@@ -238,6 +220,56 @@ class ExportCorpusWizardPage(QWizardPage):
         return self.exportattempted
 
 
+# write corpus to path as json, omitting empty/zero/false/null values unless detaillevel is "max"
+# returns a results message
+def exportcorpus(corpus, path, detaillevel):
+    serialized_corpus = corpus.serialize()
+    if detaillevel == "max":
+        expandtreesforexport(serialized_corpus)
+    with io.open(path, 'w') as exfile:
+        # OK, this is a bit convoluted, but it seems like the most general way to be able to omit values
+        # that are empty/zero/false/null, is to convert everything to json format and read it back in so
+        # all of the data is in either dicts or lists (rather than objects).
+        # If we end up wanting to do something prettier or more customized in the future,
+        # this kind of cleaning might have to be done in the data classes themselves.
+
+        try:
+            # for json.dumps, can also specify separators=(item_separator, key_separator)
+            # default is (', ', ': ') if indent is None and (',', ': ') otherwise
+            thestring = json.dumps(serialized_corpus, indent=3, default=jsonattributes)
+        except Exception:
+            return "export failed - writing original json"
+        try:
+            reloaded = json.loads(thestring)
+        except json.JSONDecodeError:
+            return "export failed - not a valid JSON document"
+        except UnicodeDecodeError:
+            return "export failed - JSON does not contain UTF-8, UTF-16 or UTF-32 encoded data"
+        try:
+            cleaned = cleandictsforexport(reloaded, detaillevel)
+        except Exception:
+            return "export failed - cleaning JSON"
+        try:
+            json.dump(cleaned, exfile, indent=3, default=jsonattributes)
+        except Exception:
+            return "export failed - writing cleaned JSON"
+
+    return "export completed"
+
+
+# Modules that have never had their tree models built hold compact movement and location trees (see
+# compactmovementtree() and compactlocationtree()), without entries for unselected paths. For a "max" export, fill
+# these back in, so that every module's tree is written in full, whether or not it has been opened.
+def expandtreesforexport(serializedcorpus):
+    for serializedsign in serializedcorpus['signs']:
+        for serialmodule in serializedsign['mov modules'].values():
+            serialmodule.movementtree = expandmovementtree(serialmodule.movementtree)
+        for serialmodule in serializedsign['loc modules'].values():
+            # (an axis of relation tree is never compacted, and isn't a tree of any current location type)
+            if not isaxisofrelationtree(serialmodule.locationtree):
+                serialmodule.locationtree = expandlocationtree(serialmodule.locationtree)
+
+
 def cleandictsforexport(serialstructure, detaillevel):
     if detaillevel == "max":
         return serialstructure
@@ -260,6 +292,9 @@ def cleandictsforexport(serialstructure, detaillevel):
                 elif k == 'col_contents':
                     # dealt with above
                     pass
+                elif k in ['migrationversion', 'migration version']:
+                    # which path updates a saved sign or tree has had is file format bookkeeping, not annotation
+                    pass
                 elif k == 'action_state':
                     # do not omit any info from non-manual "action/state" subtrees; even when populated the values are empty dictionaries
                     cleaned_dict[k] = v
@@ -20,6 +20,7 @@ from PyQt5.QtCore import pyqtSignal, Qt
 
 from gui.modulespecification_widgets import StatusDisplay
 from gui.helper_widget import OptionSwitch
+from gui.background_job import BackgroundJob, JobCancelled, runjob
 from lexicon.lexicon_classes import Corpus, Sign
 from lexicon.module_classes import SignLevelInformation, Signtype, AddedInfo, XslotStructure, MovementModule, \
     LocationModule, RelationModule, OrientationModule, HandConfigurationModule, NonManualModule, \
@@ -75,29 +76,49 @@ class ImportCorpusWizard(QWizard):
     def handle_import_corpus(self):
         self.importcorpus_page.statusdisplay.setText("importing...")
         self.importcorpus_page.statusdisplay.repaint()
-        resultmessage = self.import_corpus()
+        job = runjob(BackgroundJob(self.import_corpus, str(self.field("importsourcepath")),
+                                   str(self.field("importdestpath"))), "Importing corpus", parent=self)
+        job.deleteLater()
+        if job.cancelled:
+            resultmessage = "import canceled"
+        elif job.error is not None:
+            resultmessage = "import failed - " + str(job.error)
+        else:
+            corpus, resultmessage = job.result
+            if corpus is not None:
+                self.parent().load_corpus_info(corpus.path, preloadedcorpus=corpus)
         self.importcorpus_page.statusdisplay.setText(resultmessage)
 
-    def import_corpus(self):
+    # runs in a BackgroundJob (see handle_import_corpus()): the JSON is parsed on the job's thread, but reading signs
+    # builds tree models for their modules, so that happens on the GUI thread, a few signs at a time
+    # returns the imported corpus (or None if the import failed) and a results message
+    def import_corpus(self, job, sourcepath, destpath):
         returnmessage = ""
-        with io.open(str(self.field("importsourcepath")), "r") as imfile:
+        with io.open(sourcepath, "r") as imfile:
             corpus = Corpus()
             glosses = []
+            job.startphase("Reading " + os.path.split(sourcepath)[1])
             try:
                 data = json.load(imfile)  # dict with keys: 'signs', 'path', 'minimum id', 'highest id'
             except json.JSONDecodeError:
-                return "import failed - not a valid JSON document"
+                return None, "import failed - not a valid JSON document"
             except UnicodeDecodeError:
-                return "import failed - JSON does not contain UTF-8, UTF-16 or UTF-32 encoded data"
+                return None, "import failed - JSON does not contain UTF-8, UTF-16 or UTF-32 encoded data"
+
+            def read_signs(signdicts):
+                for signdict in signdicts:
+                    sign = self.read_sign(signdict)
+                    corpus.add_sign(sign)
+                    glosses.append(str(sign))
+
             try:
                 if 'signs' in data.keys():
-                    for signdict in data['signs']:
-                        sign = self.read_sign(signdict)
-                        corpus.add_sign(sign)
-                        glosses.append(str(sign))
-                corpus.path = str(self.field("importdestpath"))
+                    job.inmainthreadbatches("Importing signs", read_signs, data['signs'])
+                corpus.path = destpath
+            except JobCancelled:
+                raise
             except Exception:
-                return "import failed - reading signs"
+                return None, "import failed - reading signs"
             try:
                 if 'minimum id' in data.keys():
                     corpus.minimumID = data['minimum id']
@@ -105,9 +126,8 @@ class ImportCorpusWizard(QWizard):
                     corpus.highestID = data['highest id']
                 returnmessage = "imported " + str(len(glosses)) + " signs:\n" + "\n".join(glosses)
             except Exception:
-                return "import failed - setting corpus metadata"
-        self.parent().load_corpus_info(corpus.path, preloadedcorpus=corpus)
-        return "import completed\n\n" + returnmessage
+                return None, "import failed - setting corpus metadata"
+        return corpus, "import completed\n\n" + returnmessage
 
     def read_sign(self, signdict):
         sli = self.read_sli(signdict.pop('signlevel', {}))
@@ -181,12 +201,12 @@ class ImportCorpusWizard(QWizard):
 
     def read_addedinfo(self, addedinfodict):
         addedinfo = AddedInfo()
-        addedinfo.__dict__.update(addedinfodict)
+        addedinfo.updateattributes(addedinfodict)
         return addedinfo
 
     def read_phonlocs(self, phonlocsdict):
         phonlocs = PhonLocations()
-        phonlocs.__dict__.update(phonlocsdict)
+        phonlocs.updateattributes(phonlocsdict)
         return phonlocs
 
     def read_parameter_module(self, paramdict):
@@ -255,14 +275,14 @@ class ImportCorpusWizard(QWizard):
         palmlist = oridict.pop('_palm', [])
         for dirdict in palmlist:
             dirn = Direction(axis=dirdict['_axis'])
-            dirn.__dict__.update(dirdict)
+            dirn.updateattributes(dirdict)
             palmdirs_list.append(dirn)
 
         rootdirs_list = []
         rootlist = oridict.pop('_root', [])
         for dirdict in rootlist:
             dirn = Direction(axis=dirdict['_axis'])
-            dirn.__dict__.update(dirdict)
+            dirn.updateattributes(dirdict)
             rootdirs_list.append(dirn)
 
         omod = OrientationModule(palmdirs_list=palmdirs_list, rootdirs_list=rootdirs_list, articulators=articulators,
@@ -324,12 +344,12 @@ class ImportCorpusWizard(QWizard):
 
         contacttype = ContactType()
         if '_contacttype' in contactdict.keys() and contactdict['_contacttype'] is not None:
-            contacttype.__dict__.update(contactdict['_contacttype'])
+            contacttype.updateattributes(contactdict['_contacttype'])
             conrel.contacttype = contacttype
 
         manner = MannerRelation()
         if '_manner' in contactdict.keys() and contactdict['_manner'] is not None:
-            manner.__dict__.update(contactdict['_manner'])
+            manner.updateattributes(contactdict['_manner'])
             conrel.manner = manner
 
         distances = [
@@ -343,7 +363,7 @@ class ImportCorpusWizard(QWizard):
                 distances_idx = 0 if dist['_axis'] == Direction.HORIZONTAL \
                     else (1 if dist['_axis'] == Direction.VERTICAL
                           else (2 if dist['_axis'] == Direction.SAGITTAL else 3))
-                distances[distances_idx].__dict__.update(dist)
+                distances[distances_idx].updateattributes(dist)
         conrel.distances = distances
 
         return conrel
@@ -356,7 +376,7 @@ class ImportCorpusWizard(QWizard):
         ]
         for dirn in dirlist:
             directions_idx = 0 if dirn['_axis'] == Direction.HORIZONTAL else (1 if dirn['_axis'] == Direction.VERTICAL else 2)
-            directions[directions_idx].__dict__.update(dirn)
+            directions[directions_idx].updateattributes(dirn)
         return directions
 
     def read_locmod(self, uid, locdict):
@@ -405,7 +425,7 @@ class ImportCorpusWizard(QWizard):
             if '_specslist' in typedict.keys() and typedict['_specslist'] is not None:
                 specslist = [spec for spec in typedict['_specslist']]
             if '_addedinfo' in typedict.keys() and typedict['_addedinfo'] is not None:
-                addedinfo.__dict__.update(typedict['_addedinfo'])
+                addedinfo.updateattributes(typedict['_addedinfo'])
 
         return Signtype(specslist, addedinfo)
 
@@ -342,10 +342,10 @@ class LocationSpecificationPanel(ModuleSpecificationPanel):
 
         if moduletoload is not None and isinstance(moduletoload, LocationModule):
             self.existingkey = moduletoload.uniqueid
-            loctypetoload = moduletoload.locationtreemodel.locationtype
+            loctypetoload = moduletoload.locationtree.locationtype
             # make a copy, so that the module is not being edited directly via this layout
             # (otherwise "cancel" doesn't actually revert to the original contents)
-            treemodeltoload = LocationTreeModel(LocationTreeSerializable(moduletoload.locationtreemodel))
+            treemodeltoload = LocationTreeModel(LocationTreeSerializable(moduletoload.locationtree))
       
         # create layout with buttons for location type (body, signing space, etc)
         # and for phonological locations (phonological, phonetic, etc)
@@ -1,5 +1,4 @@
 import os
-import pickle
 import json
 import csv
 import re
@@ -15,7 +14,8 @@ from PyQt5.QtCore import (
     QSettings,
     QPoint,
     pyqtSignal,
-    QCoreApplication
+    QCoreApplication,
+    QTimer
 )
 
 from PyQt5.QtWidgets import (
@@ -62,14 +62,17 @@ from gui.signtypespecification_view import Signtype
 from gui.export_csv_dialog import ExportCSVDialog
 from gui.panel import SignLevelMenuPanel, SignSummaryPanel
 from gui.preference_dialog import PreferenceDialog
+from search.result_cache import searchresultcache, resultcachemaxbytes
+from gui.savecorpus_thread import SaveCorpusThread
+from gui.background_job import BackgroundJob, ForegroundJob, runjob
 from gui.decorator import check_unsaved_change, check_unsaved_corpus
 from gui.link_help import show_help, show_version
 from gui.undo_command import TranscriptionUndoCommand, SignLevelUndoCommand
 from gui.xslot_graphics import islistoftimingintervals
 from constant import SYSTEM, SAMPLE_LOCATIONS, filenamefrompath, DEFAULT_LOC_1H, DEFAULT_LOC_2H
-from lexicon.module_classes import ParameterModule, TimingPoint, TimingInterval
-from lexicon.lexicon_classes import Corpus, Sign, glossesdelimiter
-from serialization_classes import renamed_load
+from lexicon.module_classes import ParameterModule, TimingPoint, TimingInterval, setdefaultentryidsettings
+from lexicon.lexicon_classes import Corpus, Sign, glossesdelimiter, decodesigns
+from serialization_classes import renamed_load, isindexedcorpusfile, readindexedcorpus, nocompression
 from constant import ModuleTypes
 from lexicon.module_utils import deepcopymodule, deepcopysign
 
@@ -90,6 +93,10 @@ class SubWindow(QMdiSubWindow):
 # TODO: add undo/redo stack: https://doc.qt.io/qt-5/qtwidgets-tools-undoframework-example.html
 # TODO: location image size problem
 class MainWindow(QMainWindow):
+    # emitted whenever signs in the corpus have been added, edited or removed (eg so that open search results can be
+    #   brought up to date; see ResultsView)
+    corpus_changed = pyqtSignal()
+
     def __init__(self, app_ctx):
         super().__init__()
         self.app_ctx = app_ctx
@@ -102,6 +109,7 @@ class MainWindow(QMainWindow):
 
         self.undostack = QUndoStack(parent=self)
         self.unsaved_changes = False  # a flag that tracks any unsaved changes.
+        self.save_thread = None  # the SaveCorpusThread for the save in progress, if any
 
         self._clipboard = []
 
@@ -119,6 +127,12 @@ class MainWindow(QMainWindow):
         self.move(self.app_settings['display']['position'])
         self.handle_fontsize_changed(self.app_settings['display']['fontsize'])
 
+        # autosave
+        self.autosave_timer = QTimer(parent=self)
+        self.autosave_timer.timeout.connect(self.on_autosave)
+        self.handle_autosave_changed()
+        self.handle_search_cache_changed()
+
         # date information
         self.today = date.today()
 
@@ -418,6 +432,7 @@ class MainWindow(QMainWindow):
         self.signsummary_panel.action_selected.connect(self.handle_moduleaction_selected)
         self.signlevel_panel.sign_updated.connect(self.flag_and_refresh)
         self.signlevel_panel.corpus_updated.connect(lambda sign: self.corpus_display.updated_signs(signs=self.corpus.signs, current_sign=sign))
+        self.signlevel_panel.corpus_updated.connect(lambda sign: self.corpus_changed.emit())
 
         corpusfilename = filenamefrompath(self.corpus.path) if self.corpus else ""
         self.corpus_display = CorpusDisplay(self.app_settings, corpusfilename=corpusfilename, parent=self)
@@ -742,6 +757,10 @@ class MainWindow(QMainWindow):
             'image',
             defaultValue=os.path.normpath(os.path.join(os.path.expanduser('~/Documents'), 'PCT', 'SLP-AA', 'IMAGE'))
         )
+        self.app_settings['storage']['parallel_decoding'] = self.app_qsettings.value('parallel_decoding', defaultValue=False, type=bool)
+        self.app_settings['storage']['compression'] = self.app_qsettings.value('compression', defaultValue=nocompression)
+        self.app_settings['storage']['compression_level'] = self.app_qsettings.value('compression_level', defaultValue=6, type=int)
+        self.app_settings['storage']['search_cache_mb'] = self.app_qsettings.value('search_cache_mb', defaultValue=resultcachemaxbytes // 2**20, type=int)
         self.app_qsettings.endGroup()  # storage
 
         self.app_qsettings.beginGroup('display')
@@ -773,20 +792,7 @@ class MainWindow(QMainWindow):
             self.app_qsettings.remove('entryid_digits')
         self.app_qsettings.endGroup()  # display
 
-        self.app_qsettings.beginGroup('entryid')
-        self.app_qsettings.beginGroup('counter')
-        self.app_qsettings.setValue('visible', self.app_qsettings.value('visible', defaultValue=True, type=bool))
-        self.app_qsettings.setValue('order', self.app_qsettings.value('order', defaultValue=0, type=int))
-        counterdigits = existing_entryid_digits or self.app_qsettings.value('digits', defaultValue=4, type=int)
-        self.app_qsettings.setValue('digits', counterdigits)
-        self.app_qsettings.endGroup()  # counter
-        self.app_qsettings.beginGroup('date')
-        self.app_qsettings.setValue('visible', self.app_qsettings.value('visible', defaultValue=False, type=bool))
-        self.app_qsettings.setValue('order', self.app_qsettings.value('order', defaultValue=0, type=int))
-        self.app_qsettings.setValue('format', self.app_qsettings.value('format', defaultValue='YYYY-MM', type=str))
-        self.app_qsettings.endGroup()  # date
-        self.app_qsettings.setValue('delimiter', self.app_qsettings.value('delimiter', defaultValue='_', type=str))
-        self.app_qsettings.endGroup()  # entryid
+        setdefaultentryidsettings(self.app_qsettings, existing_entryid_digits)
 
         self.app_qsettings.beginGroup('metadata')
         self.app_settings['metadata']['coder'] = self.app_qsettings.value('coder', defaultValue='NEWUSERNAME', type=str)
@@ -797,6 +803,11 @@ class MainWindow(QMainWindow):
         self.app_settings['reminder']['duplicatelemma'] = self.app_qsettings.value('duplicatelemma', defaultValue=True, type=bool)
         self.app_qsettings.endGroup()  # reminder
 
+        self.app_qsettings.beginGroup('autosave')
+        self.app_settings['autosave']['enabled'] = self.app_qsettings.value('enabled', defaultValue=False, type=bool)
+        self.app_settings['autosave']['interval'] = self.app_qsettings.value('interval', defaultValue=5, type=int)
+        self.app_qsettings.endGroup()  # autosave
+
         self.app_qsettings.beginGroup('signdefaults')
         self.app_settings['signdefaults']['handdominance'] = self.app_qsettings.value('handdominance', defaultValue='R', type=str)
         self.app_settings['signdefaults']['signtype'] = self.app_qsettings.value('signtype', defaultValue='none')
@@ -841,6 +852,10 @@ class MainWindow(QMainWindow):
         self.app_qsettings.setValue('recent_results', self.app_settings['storage']['recent_results'])
         self.app_qsettings.setValue('corpora', self.app_settings['storage']['corpora'])
         self.app_qsettings.setValue('image', self.app_settings['storage']['image'])
+        self.app_qsettings.setValue('parallel_decoding', self.app_settings['storage']['parallel_decoding'])
+        self.app_qsettings.setValue('compression', self.app_settings['storage']['compression'])
+        self.app_qsettings.setValue('compression_level', self.app_settings['storage']['compression_level'])
+        self.app_qsettings.setValue('search_cache_mb', self.app_settings['storage']['search_cache_mb'])
         self.app_qsettings.endGroup()  # storage
 
         self.app_qsettings.beginGroup('display')
@@ -874,6 +889,11 @@ class MainWindow(QMainWindow):
         self.app_qsettings.setValue('duplicatelemma', self.app_settings['reminder']['duplicatelemma'])
         self.app_qsettings.endGroup()  # reminder
 
+        self.app_qsettings.beginGroup('autosave')
+        self.app_qsettings.setValue('enabled', self.app_settings['autosave']['enabled'])
+        self.app_qsettings.setValue('interval', self.app_settings['autosave']['interval'])
+        self.app_qsettings.endGroup()  # autosave
+
         self.app_qsettings.beginGroup('signdefaults')
         self.app_qsettings.setValue('handdominance', self.app_settings['signdefaults']['handdominance'])
         self.app_qsettings.setValue('signtype', self.app_settings['signdefaults']['signtype'])
@@ -953,8 +973,32 @@ class MainWindow(QMainWindow):
         pref_dialog.xslotgeneration_changed.connect(self.handle_xslotgeneration_changed)
         pref_dialog.fontsize_changed.connect(self.handle_fontsize_changed)
         pref_dialog.prefs_saved.connect(self.signsummary_panel.refreshsign)
+        pref_dialog.prefs_saved.connect(self.handle_autosave_changed)
+        pref_dialog.prefs_saved.connect(self.handle_search_cache_changed)
         pref_dialog.exec_()
 
+    def handle_autosave_changed(self):
+        if self.app_settings['autosave']['enabled']:
+            self.autosave_timer.start(self.app_settings['autosave']['interval'] * 60 * 1000)
+        else:
+            self.autosave_timer.stop()
+
+    def handle_search_cache_changed(self):
+        searchresultcache().setmaxbytes(self.app_settings['storage']['search_cache_mb'] * 2**20)
+
+    # save in the background, but only if there's something to save, a file to save it to, no save already underway,
+    #   and nothing modal up
+    def on_autosave(self):
+        if self.corpus is None or not self.unsaved_changes or self.save_thread is not None:
+            return
+        if QApplication.activeModalWidget() is not None:
+            # (eg a search's progress dialog, while the search reads the corpus's signs on another thread)
+            return
+        if not self.corpus.path or self.corpus.path in [self.app_ctx.sample_corpus['path'], os.path.expanduser("~")]:
+            return
+        if self.save_corpus_binary(inbackground=True):
+            self.unsaved_changes = False
+
     def handle_xslotgeneration_changed(self, prev_xslotgen, new_xslotgen):
         self.signlevel_panel.enable_module_buttons(len(self.corpus.signs) > 0)
 
@@ -1033,7 +1077,8 @@ class MainWindow(QMainWindow):
             return
 
         if self.corpus.path:
-            self.save_corpus_binary()
+            if not self.save_corpus_binary(inbackground=True):
+                return
             self.corpus_display.corpusfile_edit.setText(filenamefrompath(self.corpus.path))
 
         self.unsaved_changes = False
@@ -1055,27 +1100,104 @@ class MainWindow(QMainWindow):
             if folder:
                 self.app_settings['storage']['recent_folder'] = folder
 
-            self.save_corpus_binary()
+            if not self.save_corpus_binary(inbackground=True):
+                return
             self.corpus_display.corpusfile_edit.setText(filenamefrompath(self.corpus.path))
 
             self.unsaved_changes = False
             self.undostack.clear()
 
-    def save_corpus_binary(self, othercorpusandpath=None):
+    # unless compact is True, only the changes since the corpus was last loaded/saved are written (appended to the file
+    # as a journal entry), if possible; see Corpus.canappendjournal()
+    # a snapshot of the corpus is taken right away, and then written on a SaveCorpusThread; if inbackground is True this
+    # returns as soon as the thread has started, and otherwise only once the corpus has been saved
+    # returns whether the corpus was saved (or, if inbackground, whether the save was started)
+    def save_corpus_binary(self, othercorpusandpath=None, compact=False, inbackground=False):
+        if not self.wait_for_save():
+            return False
+
         corpustosave = self.corpus
         pathtosaveto = self.corpus.path
         if othercorpusandpath:
             corpustosave, pathtosaveto = othercorpusandpath
 
-        with open(pathtosaveto, 'wb') as f:
-            pickle.dump(corpustosave.serialize(), f, protocol=pickle.HIGHEST_PROTOCOL)
-
-    def load_corpus_binary(self, path):
-        with open(path, 'rb') as f:
-            corpus = Corpus(serializedcorpus=renamed_load(f))
-            # in case we're loading a corpus that was originally created on a different machine / in a different folder
-            corpus.path = path
-            return corpus
+        if corpustosave is not self.corpus and self.corpus is not None \
+                and any(os.path.abspath(s.signrecord.path) == os.path.abspath(pathtosaveto)
+                        for s in self.corpus.signs if not s.decoded):
+            # (eg, merging corpora into the open corpus's file) the open corpus's signs that haven't been decoded yet
+            #   can only be read from the file that's about to be replaced
+            self.corpus.decodeall()
+        isjournalentry = not compact and corpustosave.canappendjournal(pathtosaveto)
+        if isjournalentry:
+            signs = corpustosave.changedsigns()
+            serializedcorpus = corpustosave.serializechanges(signs)
+        else:
+            # this includes the records of any signs not yet decoded from the existing file, which are copied
+            # from there before it's replaced
+            signs = list(corpustosave.signs)
+            serializedcorpus = corpustosave.serializeindexed(signs)
+        compression = (self.app_settings['storage']['compression'], self.app_settings['storage']['compression_level'])
+        save_thread = SaveCorpusThread(corpustosave, pathtosaveto, signs, serializedcorpus, isjournalentry,
+                                       compression=compression, parent=self)
+        self.save_thread = save_thread
+
+        if inbackground:
+            save_thread.finished.connect(lambda: self.handle_save_finished(save_thread))
+            self.update_status_bar("Saving " + filenamefrompath(pathtosaveto) + "...")
+            save_thread.start()
+            return True
+        save_thread.run()
+        return self.handle_save_finished(save_thread)
+
+    # wait for the save in progress (if any) to finish; returns False if it failed
+    def wait_for_save(self):
+        if self.save_thread is None:
+            return True
+        self.save_thread.wait()
+        return self.handle_save_finished(self.save_thread)
+
+    # returns whether the save was successful; if it wasn't, the corpus that was being saved (if it's still open) is left
+    # marked as having unsaved changes, since the flag was cleared when the save started (see on_action_save())
+    def handle_save_finished(self, save_thread):
+        if save_thread is not self.save_thread:
+            # already handled by wait_for_save()
+            return True
+        self.save_thread = None
+        saved = save_thread.finishsave()
+        if saved:
+            self.update_status_bar("Saved " + filenamefrompath(save_thread.path))
+        else:
+            if save_thread.corpus is self.corpus:
+                self.unsaved_changes = True
+            self.update_status_bar("")
+            QMessageBox.critical(self, "Error saving corpus",
+                                 "The corpus could not be saved to " + save_thread.path + ":\n" + str(save_thread.error))
+        save_thread.deleteLater()
+        return saved
+
+    # job is the BackgroundJob this is running in, if any (see load_corpus_info()); reading the file happens on the job's
+    # thread, but building signs' modules creates tree models and so happens on the GUI thread, a few signs at a time
+    def load_corpus_binary(self, path, job=None):
+        job = job or ForegroundJob()
+        job.startphase("Reading " + filenamefrompath(path))
+        if isindexedcorpusfile(path):
+            # signs come as SignRecords, which only hold their sign-level info until decoded, so no models are built yet
+            corpus = Corpus(serializedcorpus=readindexedcorpus(path))
+            if self.app_settings['storage']['parallel_decoding']:
+                # decode all the signs now, in worker processes, rather than each one when it's first needed
+                job.startphase("Reading signs", len(corpus))
+                undecoded, serializedsigns = corpus.prepareundecoded(parallel=True, progress=job.setprogress)
+                job.inmainthreadbatches("Decoding signs", decodesigns, list(zip(undecoded, serializedsigns)))
+        else:
+            # corpora saved before 20261018 are a single pickled dict
+            with open(path, 'rb') as f:
+                serializedcorpus = renamed_load(f)
+            corpus = Corpus(serializedcorpus=dict(serializedcorpus, signs=[]))
+            job.inmainthreadbatches("Loading signs", corpus.addserializedsigns, serializedcorpus['signs'])
+            corpus.confirmhighestID("load")
+        # in case we're loading a corpus that was originally created on a different machine / in a different folder
+        corpus.path = path
+        return corpus
 
     def modules_fromselectedbuttons(self):
         selectedmodulebuttons = self.signsummary_panel.selectedmodulebuttons()
@@ -1305,6 +1427,7 @@ class MainWindow(QMainWindow):
                     signtopaste.signlevel_information.entryid.counter = self.corpus.highestID + 1
                     self.corpus.add_sign(signtopaste)
                 self.corpus_display.updated_signs(signs=self.corpus.signs, current_sign=signtopaste)
+                self.corpus_changed.emit()
             return
         else:  # there were some duplicates; what does the user want to do?
             duplicateinfodialog = PastingDuplicateInfoDialog(duplicatedinfoflags, duplicatedinfostrings, parent=self)
@@ -1351,6 +1474,7 @@ class MainWindow(QMainWindow):
                         # user didn't want to view/edit any of the signs with duplicated infos; just paste
                         self.corpus.add_sign(signtopaste)
                         self.corpus_display.updated_signs(signs=self.corpus.signs, current_sign=signtopaste)
+                        self.corpus_changed.emit()
 
     def on_action_paste(self, clicked=None):
         if self.corpus_display.corpus_view.hasFocus():
@@ -1420,16 +1544,22 @@ class MainWindow(QMainWindow):
             file_name = self.app_ctx.sample_corpus['path']
 
 
-        self.load_corpus_info(file_name)
-
-        return self.corpus is not None
+        return self.load_corpus_info(file_name)
 
     # load corpus info from given path
+    # returns False (leaving the current corpus open) if loading was cancelled or failed
     def load_corpus_info(self, corpuspath, preloadedcorpus=None):
         if preloadedcorpus is not None:
             self.corpus = preloadedcorpus
         else:
-            self.corpus = self.load_corpus_binary(corpuspath)
+            job = runjob(BackgroundJob(lambda job: self.load_corpus_binary(corpuspath, job)), "Loading corpus", parent=self)
+            job.deleteLater()
+            if job.error is not None:
+                QMessageBox.critical(self, "Error loading corpus",
+                                     "The corpus could not be loaded from " + corpuspath + ":\n" + str(job.error))
+            if job.result is None:
+                return False
+            self.corpus = job.result
         self.corpus_display.corpusfile_edit.setText(filenamefrompath(self.corpus.path))
         self.corpus_display.updated_signs(signs=self.corpus.signs)
 
@@ -1445,6 +1575,7 @@ class MainWindow(QMainWindow):
             self.unsaved_changes = True
         else:
             self.unsaved_changes = False
+        return True
 
 
 
@@ -1556,6 +1687,7 @@ class MainWindow(QMainWindow):
         self.corpus.remove_sign(trash_sign)
         self.unsaved_changes = True
         self.corpus_display.updated_signs(self.corpus.signs, current_sign=trash_sign, deleted=True)
+        self.corpus_changed.emit()
 
     def on_action_help_main(self):
         show_help('main')
@@ -1571,12 +1703,23 @@ class MainWindow(QMainWindow):
         # it flags unsaved_changes=True and passes on to refreshsign(), which updates the summary panel
         self.unsaved_changes = True
         self.signsummary_panel.refreshsign(sign)
+        self.corpus_changed.emit()
 
     @check_unsaved_change
     def closeEvent(self, event):
         self.save_app_settings()
+        self.compact_corpus_file()
         super().closeEvent(event)
 
+    # rewrite the corpus file without its journal entries (if it has any), as long as it's up to date with the corpus
+    def compact_corpus_file(self):
+        # (a save still in progress might yet fail and leave the corpus with unsaved changes)
+        if not self.wait_for_save():
+            return
+        if self.corpus is not None and not self.unsaved_changes and self.corpus.indexedfilematches(self.corpus.path) \
+                and self.corpus.indexedfile['journal entries'] > 0:
+            self.save_corpus_binary(compact=True)
+
 
 class PastingDuplicateInfoDialog(QDialog):
     edit_SLI = pyqtSignal(str, str, str)
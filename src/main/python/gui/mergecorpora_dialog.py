@@ -24,6 +24,7 @@ from constant import filenamefrompath
 from lexicon.lexicon_classes import Corpus
 from gui.modulespecification_widgets import StatusDisplay
 from gui.helper_widget import OptionSwitch
+from gui.background_job import BackgroundJob, runjob
 
 
 # wizard that walks the user through merging one or more corpora, whether into a new file or into the currently-open one
@@ -87,7 +88,22 @@ class MergeCorporaWizard(QWizard):
         self.mergecorpora_page.statusdisplay.setText("merging...")
         self.mergecorpora_page.statusdisplay.repaint()
 
-        results_lists = self.load_and_merge_corpora()
+        # the wizard's fields are read here, since the merge itself runs on a background thread
+        options = {
+            "conflict_cancel": self.field("conflict_cancel"),
+            "conflict_newIDs": self.field("conflict_newIDs"),
+            "noconflict_newIDs": self.field("noconflict_newIDs"),
+            "mergedfilepath": str(self.field("mergedfilepath")),
+        }
+        job = runjob(BackgroundJob(self.load_and_merge_corpora, options), "Merging corpora", parent=self)
+        job.deleteLater()
+        if job.cancelled:
+            self.mergecorpora_page.statusdisplay.setText("merge canceled")
+            return
+        elif job.error is not None:
+            self.mergecorpora_page.statusdisplay.setText("merge failed - " + str(job.error))
+            return
+        results_lists = job.result
 
         self.mergecorpora_page.statusdisplay.clear()
         for listname in results_lists.keys():
@@ -101,7 +117,8 @@ class MergeCorporaWizard(QWizard):
     #   or if there are duplicate IDglosses and the user decides to cancel out of the merge and address the duplicates
     #   before trying again
     # returns a dictionary of results messages
-    def load_and_merge_corpora(self):
+    # runs in a BackgroundJob (see handle_merge_corpora()), with options holding the values of the wizard's fields
+    def load_and_merge_corpora(self, job, options):
         mergedcorpus = Corpus()
         results_lists = {
             "conflicting Entry IDs": [],
@@ -122,19 +139,19 @@ class MergeCorporaWizard(QWizard):
         invalidfilenames = [fname for fname in self.corpusfilepaths if fname not in validfilenames]
         results_lists["incorrect format"] = invalidfilenames
 
-        self.corporatomerge = [self.parent().load_corpus_binary(fname) for fname in validfilenames]
+        self.corporatomerge = [self.parent().load_corpus_binary(fname, job) for fname in validfilenames]
 
         # check if EntryIDs overlap at all
         entryIDs_overlap = self.checkforoverlap_entryIDs()
 
-        if entryIDs_overlap and self.field("conflict_cancel"):
+        if entryIDs_overlap and options["conflict_cancel"]:
             # there is overlap, and the user said to cancel the merge in the case of overlap
             # so, give up and cancel the merge
             results_lists["conflicting Entry IDs"].append("merge canceled due to conflicting EntryIDs")
             return results_lists
         else:
             # go ahead with the merge, whether with new IDs or not (as specified by user)
-            makenewIDs = (entryIDs_overlap and self.field("conflict_newIDs")) or self.field("noconflict_newIDs")
+            makenewIDs = (entryIDs_overlap and options["conflict_newIDs"]) or options["noconflict_newIDs"]
 
             # check for duplicated IDglosses
             duplicated_IDglosses = self.checkforoverlap_IDglosses()
@@ -142,7 +159,7 @@ class MergeCorporaWizard(QWizard):
             if len(duplicated_IDglosses) > 0:
                 results_lists["duplicated ID-glosses"] = duplicated_IDglosses
                 firstduplicate = duplicated_IDglosses[0]
-                response = QMessageBox.question(self, "Duplicated ID-glosses",
+                response = job.inmainthread(QMessageBox.question, self, "Duplicated ID-glosses",
                                                 "The corpora you selected have one or more overlapping ID-glosses (" +
                                                 ", ".join(duplicated_IDglosses) + "), which are not permitted. " +
                                                 "Click 'OK' to proceed with the merge and append indexed tags to the " +
@@ -151,38 +168,23 @@ class MergeCorporaWizard(QWizard):
                                                 buttons=QMessageBox.Ok | QMessageBox.Cancel)
                 if response == QMessageBox.Cancel:
                     # also cancel out of the whole merge wizard
-                    self.button(QWizard.CancelButton).click()
+                    job.inmainthread(self.button(QWizard.CancelButton).click)
                     return results_lists
                 # else: continue on with the merge, but make sure to tag the duplicated ID-glosses
 
             # go ahead with the merge, either making new EntryIDs or keeping the existing ones as per user specification
             # and tagging any duplicated ID-glosses, if applicable
+            job.startphase("Merging signs", sum(len(corpus) for corpus in self.corporatomerge if corpus is not None))
+            signsmerged = 0
             for idx, corpustoadd in enumerate(self.corporatomerge):
                 corpuspath = validfilenames[idx]
                 if corpustoadd is None:
                     pass
                     results_lists["failed to load"].append(corpuspath)
                 else:
-                    if makenewIDs:
-                        next_entryID = mergedcorpus.highestID
-                    for sign in corpustoadd.signs:
-                        sli = sign.signlevel_information
-                        if makenewIDs:
-                            next_entryID += 1
-                            sli.entryid.counter = next_entryID
-                        # else: use existing Entry ID (so, nothing to change)
-                        # tag duplicatd ID-gloss with index, if applicable
-                        if sli.idgloss in dupl_IDglosses_counters.keys():
-                            dupl_IDglosses_counters[sli.idgloss] += 1
-                            sli.idgloss += "-copy" + str(dupl_IDglosses_counters[sli.idgloss])
-
-                        mergedcorpus.add_sign(sign)
-                        for gloss in [g.lower().strip() for g in sli.gloss if g != ""]:
-                            glosses_seen[gloss].append(corpuspath)
-                        lemma = sli.lemma.lower().strip()
-                        if lemma != "":
-                            lemmas_seen[lemma].append(corpuspath)
-                    mergedcorpus.confirmhighestID("merge")
+                    mergesigns(mergedcorpus, corpustoadd, corpuspath, makenewIDs, dupl_IDglosses_counters,
+                               glosses_seen, lemmas_seen, progress=lambda done: job.setprogress(signsmerged + done))
+                    signsmerged += len(corpustoadd)
                     results_lists["successful results"].append(corpuspath)
 
                 for (gloss, corpuslist) in glosses_seen.items():
@@ -192,8 +194,8 @@ class MergeCorporaWizard(QWizard):
                     if len(corpuslist) > 1 and lemma not in results_lists["duplicated lemmas"]:
                         results_lists["duplicated lemmas"].append(lemma)
 
-                self.parent().save_corpus_binary(othercorpusandpath=(mergedcorpus, str(self.field("mergedfilepath"))))
-                self.mergesuccessful = True
+                self.mergesuccessful = job.inmainthread(self.parent().save_corpus_binary,
+                                                        othercorpusandpath=(mergedcorpus, options["mergedfilepath"]))
         return results_lists
 
     # return a list of IDglosses that are duplicated in the corpora to be merged
@@ -228,6 +230,36 @@ class MergeCorporaWizard(QWizard):
         return False
 
 
+# add corpustoadd's signs (from the file at corpuspath) to mergedcorpus, giving them new EntryIDs if makenewIDs and
+#   tagging the ID-glosses counted in dupl_IDglosses_counters with an index,
+#   and record which corpora each gloss and lemma was seen in (in glosses_seen and lemmas_seen)
+# progress, if given, is called with the number of signs merged so far
+def mergesigns(mergedcorpus, corpustoadd, corpuspath, makenewIDs, dupl_IDglosses_counters, glosses_seen, lemmas_seen,
+               progress=None):
+    if makenewIDs:
+        next_entryID = mergedcorpus.highestID
+    for signsmerged, sign in enumerate(corpustoadd.signs, start=1):
+        sli = sign.signlevel_information
+        if makenewIDs:
+            next_entryID += 1
+            sli.entryid.counter = next_entryID
+        # else: use existing Entry ID (so, nothing to change)
+        # tag duplicatd ID-gloss with index, if applicable
+        if sli.idgloss in dupl_IDglosses_counters.keys():
+            dupl_IDglosses_counters[sli.idgloss] += 1
+            sli.idgloss += "-copy" + str(dupl_IDglosses_counters[sli.idgloss])
+
+        mergedcorpus.add_sign(sign)
+        for gloss in [g.lower().strip() for g in sli.gloss if g != ""]:
+            glosses_seen[gloss].append(corpuspath)
+        lemma = sli.lemma.lower().strip()
+        if lemma != "":
+            lemmas_seen[lemma].append(corpuspath)
+        if progress is not None:
+            progress(signsmerged)
+    mergedcorpus.confirmhighestID("merge")
+
+
 # wizard page that asks the user to select which files should be merged, and whether they should be saved as an entirely
 # new corpus or folded into the one that's currently open
 class FilesSelectionWizardPage(QWizardPage):
@@ -33,7 +33,7 @@ from PyQt5.QtGui import (
     QStandardItem,
 )
 
-from lexicon.module_classes import AddedInfo, PhonLocations, TimingInterval, Signtype, ParameterModule
+from lexicon.module_classes import AddedInfo, emptyaddedinfo, PhonLocations, TimingInterval, Signtype, ParameterModule
 from constant import treepathdelimiter, userdefinedroles as udr, ModuleTypes
 
 
@@ -150,7 +150,8 @@ class AddedInfoContextMenu(QMenu):
     def __init__(self, addedinfo):
         super().__init__()
 
-        self.addedinfo = addedinfo
+        # emptyaddedinfo is shared and can't be modified, so edit a new AddedInfo instead (emitted with info_added)
+        self.addedinfo = AddedInfo() if addedinfo is emptyaddedinfo else addedinfo
 
         self.iconic_action = CheckNoteAction("Iconic")
         self.iconic_action.setChecked(self.addedinfo.iconic_flag)
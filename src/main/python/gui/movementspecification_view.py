@@ -104,7 +104,7 @@ class MovementSpecificationPanel(ModuleSpecificationPanel):
         if moduletoload is not None:
             if isinstance(moduletoload, MovementModule):
                 self.existingkey = moduletoload.uniqueid
-                self.treemodel = MovementTreeModel(MovementTreeSerializable(moduletoload.movementtreemodel))
+                self.treemodel = MovementTreeModel(MovementTreeSerializable(moduletoload.movementtree))
             else:
                 print("moduletoload must be of type MovementModule")
         else:
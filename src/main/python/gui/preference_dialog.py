@@ -26,6 +26,7 @@ from fractions import Fraction
 from gui.locationspecification_view import LocationOptionsSelectionPanel, LocationType
 from models.location_models import LocationTreeModel
 from gui.helper_widget import OptionSwitch
+from serialization_classes import recordcodecs, nocompression
 
 
 # This tab facilitates user interaction with display-related settings in the preference dialog.
@@ -331,6 +332,74 @@ class ReminderTab(QWidget):
         self.settings['reminder']['duplicatelemma'] = self.duplicatelemma_reminder.isChecked()
 
 
+# This tab facilitates user interaction with settings for saving and loading corpora in the preference dialog.
+class SaveLoadTab(QWidget):
+    def __init__(self, settings, **kwargs):
+        super().__init__(**kwargs)
+
+        self.settings = settings
+
+        main_layout = QFormLayout()
+        self.setLayout(main_layout)
+
+        self.autosave_enabled = QCheckBox(parent=self)
+        self.autosave_enabled.setChecked(settings['autosave']['enabled'])
+        self.autosave_enabled.toggled.connect(self.handle_enabled_toggled)
+        main_layout.addRow(QLabel("Automatically save the corpus:"), self.autosave_enabled)
+
+        self.autosave_interval = QSpinBox(parent=self)
+        self.autosave_interval.setMinimum(1)
+        self.autosave_interval.setMaximum(120)
+        self.autosave_interval.setValue(settings['autosave']['interval'])
+        self.autosave_interval.setEnabled(settings['autosave']['enabled'])
+        main_layout.addRow(QLabel("Autosave interval (minutes):"), self.autosave_interval)
+        main_layout.addRow(QLabel(""), QLabel("A corpus that has never been saved to a file is not autosaved"))
+
+        self.parallel_decoding = QCheckBox(parent=self)
+        self.parallel_decoding.setChecked(settings['storage']['parallel_decoding'])
+        main_layout.addRow(QLabel("Decode all signs when loading a corpus, using multiple processes:"), self.parallel_decoding)
+        main_layout.addRow(QLabel(""), QLabel("Otherwise, each sign is decoded when it is first needed"))
+
+        self.compression_codec = QComboBox(parent=self)
+        self.compression_codec.addItem("No compression", nocompression)
+        for codecname in recordcodecs.keys():
+            self.compression_codec.addItem(codecname, codecname)
+        self.compression_codec.setCurrentIndex(max(0, self.compression_codec.findData(settings['storage']['compression'])))
+        self.compression_codec.currentIndexChanged.connect(self.handle_codec_changed)
+        main_layout.addRow(QLabel("Compress saved corpora with:"), self.compression_codec)
+
+        self.compression_level = QSpinBox(parent=self)
+        main_layout.addRow(QLabel("Compression level:"), self.compression_level)
+        main_layout.addRow(QLabel(""), QLabel("Higher levels make smaller files, but take longer to save"))
+        self.handle_codec_changed()
+        if settings['storage']['compression'] in recordcodecs:
+            self.compression_level.setValue(settings['storage']['compression_level'])
+
+        self.search_cache = QSpinBox(parent=self)
+        self.search_cache.setRange(0, 4096)
+        self.search_cache.setValue(settings['storage']['search_cache_mb'])
+        main_layout.addRow(QLabel("Memory for remembering search results (MB):"), self.search_cache)
+        main_layout.addRow(QLabel(""), QLabel("Searches run again on an unchanged corpus reuse the results of any targets that haven't changed; 0 turns this off"))
+
+    def handle_enabled_toggled(self, checked):
+        self.autosave_interval.setEnabled(checked)
+
+    def handle_codec_changed(self):
+        codec = recordcodecs.get(self.compression_codec.currentData(), None)
+        self.compression_level.setEnabled(codec is not None)
+        if codec is not None:
+            self.compression_level.setRange(*codec.levels)
+            self.compression_level.setValue(codec.defaultlevel)
+
+    def save_settings(self):
+        self.settings['autosave']['enabled'] = self.autosave_enabled.isChecked()
+        self.settings['autosave']['interval'] = int(self.autosave_interval.value())
+        self.settings['storage']['parallel_decoding'] = self.parallel_decoding.isChecked()
+        self.settings['storage']['compression'] = self.compression_codec.currentData()
+        self.settings['storage']['compression_level'] = int(self.compression_level.value())
+        self.settings['storage']['search_cache_mb'] = int(self.search_cache.value())
+
+
 # This tab facilitates user interaction with sign-related settings in the preference dialog.
 class SignDefaultsTab(QWidget):
     xslotdivisions_changed = pyqtSignal(dict, dict)
@@ -707,6 +776,9 @@ class PreferenceDialog(QDialog):
         self.reminder_tab = ReminderTab(settings, parent=self)
         tabs.addTab(self.reminder_tab, 'Reminder')
 
+        self.saveload_tab = SaveLoadTab(settings, parent=self)
+        tabs.addTab(self.saveload_tab, 'Save/Load')
+
         self.signdefaults_tab = SignDefaultsTab(settings, parent=self)
         self.signdefaults_tab.xslotdivisions_changed.connect(self.handle_xslotdivisions_changed)
         self.signdefaults_tab.xslotgeneration_changed.connect(self.handle_xslotgeneration_changed)
@@ -781,7 +853,7 @@ class PreferenceDialog(QDialog):
             show_help('preferences')
         elif standard == QDialogButtonBox.Save:
             errormessages = []
-            for tab in [self.display_tab, self.entryid_tab, self.reminder_tab, self.signdefaults_tab, self.location_tab]:
+            for tab in [self.display_tab, self.entryid_tab, self.reminder_tab, self.saveload_tab, self.signdefaults_tab, self.location_tab]:
                 errorstring = tab.save_settings()
                 if errorstring:
                     errormessages.append(errorstring)
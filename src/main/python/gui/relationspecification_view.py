@@ -927,7 +927,7 @@ class RelationSpecificationPanel(ModuleSpecificationPanel):
         self.existingmod_listview = QListView()
         self.existingmod_listview.setMaximumHeight(150)
         self.locmodslist = list(self.mainwindow.current_sign.locationmodules.values())
-        self.locmodslist = [loc for loc in self.locmodslist if loc.locationtreemodel.locationtype.usesbodylocations()]
+        self.locmodslist = [loc for loc in self.locmodslist if loc.locationtree.locationtype.usesbodylocations()]
         self.locmodnums = self.mainwindow.current_sign.locationmodulenumbers
         self.movmodslist = list(self.mainwindow.current_sign.movementmodules.values())
         self.movmodnums = self.mainwindow.current_sign.movementmodulenumbers
@@ -1021,7 +1021,7 @@ class RelationSpecificationPanel(ModuleSpecificationPanel):
             # If the starting location module is specifically a body-anchored signing space location,
             #  "no contact" should be auto-selected. (If the starting location module is a body location,
             #  there should be no associated specification for contact.)
-            if linked_type == ModuleTypes.LOCATION and linkedfrommodule.locationtreemodel.locationtype.bodyanchored:
+            if linked_type == ModuleTypes.LOCATION and linkedfrommodule.locationtree.locationtype.bodyanchored:
                 self.nocontact_rb.setChecked(True)
 
     # set GUI values from an existing Relation Module that we are loading into this panel
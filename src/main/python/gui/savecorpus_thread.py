@@ -0,0 +1,60 @@
+import os
+
+from PyQt5.QtCore import QThread
+
+from serialization_classes import writeindexedcorpustempfile, replacewithtempfile, appendindexedcorpusjournal
+
+
+# Writes a snapshot of a corpus (taken on the GUI thread; see Corpus.serializeindexed()) to its indexed corpus file,
+#   so that the (possibly slow) serialization and writing don't block the GUI.
+# A full save is written to a temporary file, which only replaces the corpus file (with an atomic rename) once it's
+#   completely written; finishsave() does that rename, and must be called from the GUI thread once the thread is done,
+#   so that nothing can read a sign record from the new file before the corpus's signs have been updated to point to it.
+# A journal entry is appended directly to the corpus file, since an incomplete one is ignored when reading.
+# Records copied from an existing file are checked first (see readcopiedrecords()), so a save fails rather than write
+#   the wrong bytes if that file has been replaced since they were read.
+# compression is as for compressrecord(); compressing happens here too, rather than when the snapshot is taken.
+class SaveCorpusThread(QThread):
+
+    def __init__(self, corpus, path, signs, serializedcorpus, isjournalentry, compression=None, **kwargs):
+        super().__init__(**kwargs)
+        self.corpus = corpus
+        self.path = path
+        self.signs = signs
+        self.serializedcorpus = serializedcorpus
+        self.isjournalentry = isjournalentry
+        self.compression = compression
+        self.journaloffset = corpus.indexedfile['length'] if isjournalentry else None
+        # the state of the corpus as of the snapshot, for Corpus.savedindexed()
+        self.revisions = [s.revision for s in signs]
+        self.entryids = [s.signlevel_information.entryid.counter for s in corpus.signs]
+
+        self.temppath = None
+        self.signrecords = None
+        self.error = None
+
+    def run(self):
+        try:
+            if self.isjournalentry:
+                with open(self.path, 'r+b') as f:
+                    f.seek(self.journaloffset)
+                    self.signrecords = appendindexedcorpusjournal(f, self.serializedcorpus, self.compression)
+            else:
+                self.temppath, self.signrecords = writeindexedcorpustempfile(self.path, self.serializedcorpus, self.compression)
+        except Exception as e:
+            self.error = e
+
+    # returns True if the corpus was saved successfully
+    def finishsave(self):
+        if self.error is not None:
+            return False
+        if self.temppath is not None:
+            try:
+                replacewithtempfile(self.temppath, self.path)
+            except OSError as e:
+                self.error = e
+                os.remove(self.temppath)
+                return False
+        self.corpus.savedindexed(self.path, self.signs, self.revisions, self.entryids, self.signrecords,
+                                 self.serializedcorpus['file stamp'], isjournalentry=self.isjournalentry)
+        return True
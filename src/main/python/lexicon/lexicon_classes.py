@@ -1,14 +1,17 @@
 import logging
 import os
+import pickle
 import re
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from copy import deepcopy
 
-from serialization_classes import LocationModuleSerializable, MovementModuleSerializable, RelationModuleSerializable
+from serialization_classes import LocationModuleSerializable, MovementModuleSerializable, RelationModuleSerializable, SignRecord, maxjournalentries, loadrecord, renamed_load, isindexedcorpusfile, readindexedcorpus, checkrecordbytes, newfilestamp, fileidentity
 from lexicon.module_classes import SignLevelInformation, MovementModule, LocationModule, BodypartInfo, RelationX, RelationY, Direction, RelationModule
 from gui.xslotspecification_view import XslotStructure
-from models.movement_models import MovementTreeModel
-from models.location_models import LocationTreeModel, BodypartTreeModel
-from constant import HAND, ARM, LEG, ModuleTypes, treepathdelimiter
+from models.movement_models import compactmovementtree
+from models.location_models import BodypartTreeModel, compactlocationtree
+from constant import HAND, ARM, LEG, MIGRATION_VERSION, ModuleTypes, treepathdelimiter
 
 NULL = '\u2205'
 glossesdelimiter = " / "
@@ -52,11 +55,88 @@ class Sign:
         (that had probably been saved to disk, but might also be just for creating copies without referencing the same object on disk)
     deepcopy is a boolean and determines whether the Sign re-created from serializedsign should be deep-copied
         (that is, should all the subcomponents such as modules etc also be copies instead of references to the original objects?)
+    signrecord is a SignRecord (from an indexed corpus file) and is used for re-creating a Sign whose contents (modules,
+        xslots, etc) are only decoded from the file the first time they're needed; afterdecode (if given) is called
+        with the sign once that has happened
     """
-    def __init__(self, signlevel_info=None, serializedsign=None):
+    def __init__(self, signlevel_info=None, serializedsign=None, signrecord=None, afterdecode=None):
         if signlevel_info is not None:
             signlevel_info.parentsign = self
         self._signlevel_information = signlevel_info
+        self._signrecord = signrecord
+        self._afterdecode = afterdecode
+        # whether this sign has changed since it was last loaded from or saved to an indexed corpus file
+        self._dirty = signrecord is None
+        # incremented with every change, so that a save running in the background can tell whether the sign has
+        # changed again since its snapshot was taken
+        self._revision = 0
+        # where this sign's contents are in the indexed corpus file it was last loaded from or saved to
+        # (only up to date as long as the sign isn't dirty)
+        self._savedrecord = signrecord
+
+        if signrecord is not None:
+            self._signlevel_information = SignLevelInformation(serializedsignlevelinfo=signrecord.serializedsignlevelinfo, parentsign=self)
+            # everything else is left unset until decoderecord() is called; see __getattr__
+            return
+
+        self.initcontents()
+        if serializedsign is not None:
+            # these attributes don't need to be deep-copied
+            self._signlevel_information = SignLevelInformation(serializedsignlevelinfo=serializedsign['signlevel'], parentsign=self)
+            self.loadcontents(serializedsign)
+
+    # only called when an attribute isn't found the usual way, which (other than for genuinely nonexistent attributes)
+    # means that this sign's contents haven't yet been decoded from its record
+    def __getattr__(self, name):
+        if not name.startswith('__') and self.__dict__.get('_signrecord') is not None:
+            self.decoderecord()
+            return getattr(self, name)
+        raise AttributeError("'Sign' object has no attribute '" + name + "'")
+
+    @property
+    def decoded(self):
+        return self.__dict__.get('_signrecord') is None
+
+    # the SignRecord this sign's contents will be decoded from, or None if they already have been
+    @property
+    def signrecord(self):
+        return self.__dict__.get('_signrecord')
+
+    # anything setting part of the sign's contents needs to make sure they've been decoded first,
+    # or decoding later would overwrite what was set
+    def ensuredecoded(self):
+        if not self.decoded:
+            self.decoderecord()
+
+    # serializedsign (if given) is this sign's record as already read and prepared (see preparesignrecord()),
+    # eg by a worker process
+    def decoderecord(self, serializedsign=None):
+        if serializedsign is None:
+            serializedsign = self._signrecord.read()
+        self._signrecord = None
+        self.initcontents()
+        self.loadcontents(serializedsign)
+        if self._afterdecode is not None:
+            self._afterdecode(self)
+
+    # the SignRecord this sign's contents (everything but the sign-level info) can be read from as they are now, or None
+    # if they've changed since the sign was last loaded or saved (or it never has been)
+    @property
+    def contentsrecord(self):
+        if not self.decoded:
+            return self._signrecord
+        return None if self.dirty else self._savedrecord
+
+    # after saving, a sign that still hasn't been decoded needs to read its record from the newly-saved file
+    # revision is the sign's revision as of when the snapshot that was saved was taken
+    def savedrecord(self, signrecord, revision):
+        if not self.decoded:
+            self._signrecord = signrecord
+        self._savedrecord = signrecord
+        if self._revision == revision:
+            self._dirty = False
+
+    def initcontents(self):
         self._signtype = None
         self._xslotstructure = XslotStructure()
         self._specifiedxslots = False
@@ -74,24 +154,27 @@ class Sign:
         self.handconfigmodulenumbers = {}
         self.nonmanualmodules = {}
         self.nonmanualmodulenumbers = {}
-
-        if serializedsign is not None:
-            # these attributes don't need to be deep-copied
-            self._signlevel_information = SignLevelInformation(serializedsignlevelinfo=serializedsign['signlevel'], parentsign=self)
-            self._signtype = serializedsign['type']
-            if self.signtype:
-                # backward compatibility with pre-20241024 signtype, which didn't have a moduletype attribute
-                if not hasattr(self.signtype, '_moduletype'):
-                    self.signtype._moduletype = ModuleTypes.SIGNTYPE
-                # backward compatibility with pre-20250505 signtype structure
-                if len(self.signtype.specslist) > 0 and isinstance(self.signtype.specslist[0], tuple):
-                    self.signtype.specslist = [duple[0] for duple in self.signtype.specslist]
-            self._xslotstructure = serializedsign['xslot structure']
-            self._specifiedxslots = serializedsign['specified xslots']
-
-            # note that relation *must* come before location
-            for moduletype in [ModuleTypes.MOVEMENT, ModuleTypes.RELATION, ModuleTypes.LOCATION, ModuleTypes.ORIENTATION, ModuleTypes.HANDCONFIG, ModuleTypes.NONMANUAL]:
-                self.loadmodules_and_numbering(serializedsign, moduletype)
+        # which backward-compatibility fixes have been applied (see Corpus.add_missing_paths_sign())
+        self.migrationversion = MIGRATION_VERSION
+
+    # everything but the sign-level info
+    def loadcontents(self, serializedsign):
+        # signs saved before migration versions existed (20261018) haven't been checked for outdated paths
+        self.migrationversion = serializedsign.get('migration version', 0)
+        self._signtype = serializedsign['type']
+        if self.signtype:
+            # backward compatibility with pre-20241024 signtype, which didn't have a moduletype attribute
+            if not hasattr(self.signtype, '_moduletype'):
+                self.signtype._moduletype = ModuleTypes.SIGNTYPE
+            # backward compatibility with pre-20250505 signtype structure
+            if len(self.signtype.specslist) > 0 and isinstance(self.signtype.specslist[0], tuple):
+                self.signtype.specslist = [duple[0] for duple in self.signtype.specslist]
+        self._xslotstructure = serializedsign['xslot structure']
+        self._specifiedxslots = serializedsign['specified xslots']
+
+        # note that relation *must* come before location
+        for moduletype in [ModuleTypes.MOVEMENT, ModuleTypes.RELATION, ModuleTypes.LOCATION, ModuleTypes.ORIENTATION, ModuleTypes.HANDCONFIG, ModuleTypes.NONMANUAL]:
+            self.loadmodules_and_numbering(serializedsign, moduletype)
 
     def loadmodules_and_numbering(self, serializedsign, moduletype):
         if moduletype == ModuleTypes.MOVEMENT:
@@ -206,6 +289,11 @@ class Sign:
             return {}
 
     def serialize(self):
+        if not self.decoded:
+            # no need to decode everything just to serialize it again
+            serializedsign = self._signrecord.read()
+            serializedsign['signlevel'] = self._signlevel_information.serialize()
+            return serializedsign
         return {
             'signlevel': self._signlevel_information.serialize(),
             'type': self._signtype,
@@ -223,8 +311,25 @@ class Sign:
             'nonman module numbers': self.nonmanualmodulenumbers,
             'cfg modules': self.handconfigmodules,
             'cfg module numbers': self.handconfigmodulenumbers,
+            'migration version': self.migrationversion,
         }
 
+    # pickled form of everything but the sign-level info, for a sign record in an indexed corpus file
+    def serializerecord(self):
+        serializedsign = self.serialize()
+        serializedsign.pop('signlevel')
+        return pickle.dumps(serializedsign, protocol=pickle.HIGHEST_PROTOCOL)
+
+    # this sign's record as of now, for saving (possibly on another thread, while the sign keeps being edited):
+    # the SignRecord it can be copied from if the sign's contents haven't changed since it was loaded/saved,
+    # or else the pickled bytes
+    def snapshotrecord(self):
+        if not self.decoded:
+            return self._signrecord
+        if not self.dirty and self._savedrecord is not None:
+            return self._savedrecord
+        return self.serializerecord()
+
     def serializemovementmodules(self):
         serialized = {}
         for k in self.movementmodules.keys():
@@ -268,6 +373,7 @@ class Sign:
     def signlevel_information(self, signlevelinfo):
         self._signlevel_information = signlevelinfo  # SignLevelInformation(signlevelinfo)
         self._signlevel_information.parentsign = self
+        self.dirty = True
 
     @property
     def location(self):
@@ -283,10 +389,27 @@ class Sign:
 
     @specifiedxslots.setter
     def specifiedxslots(self, specifiedxslots):
+        self.ensuredecoded()
         self._specifiedxslots = specifiedxslots
+        self.dirty = True
 
     def lastmodifiednow(self):
         self.signlevel_information.lastmodifiednow()
+        self.dirty = True
+
+    @property
+    def dirty(self):
+        return self._dirty
+
+    @dirty.setter
+    def dirty(self, dirty):
+        self._dirty = dirty
+        if dirty:
+            self._revision += 1
+
+    @property
+    def revision(self):
+        return self._revision
 
     @property
     def signtype(self):
@@ -294,7 +417,9 @@ class Sign:
 
     @signtype.setter
     def signtype(self, stype):
+        self.ensuredecoded()
         self._signtype = stype
+        self.dirty = True
 
     @property
     def xslotstructure(self):
@@ -302,7 +427,9 @@ class Sign:
 
     @xslotstructure.setter
     def xslotstructure(self, xslotstruct):
+        self.ensuredecoded()
         self._xslotstructure = xslotstruct
+        self.dirty = True
 
     def updatemodule(self, existingkey, updated_module):  # , moduletype):
         moduletype = updated_module.moduletype
@@ -377,13 +504,14 @@ def unserializemovementmodules(serialized_mvmtmodules):
     unserialized = {}
     for k in serialized_mvmtmodules.keys():
         serialmodule = serialized_mvmtmodules[k]
-        mvmttreemodel = MovementTreeModel(serialmodule.movementtree)
+        # the MovementTreeModel itself is only built if needed (see MovementModule.movementtreemodel)
+        mvmttree = compactmovementtree(serialmodule.movementtree)
         articulators = serialmodule.articulators
         inphase = serialmodule.inphase if (hasattr(serialmodule, 'inphase') and serialmodule.inphase is not None) else 0
         timingintervals = serialmodule.timingintervals
         addedinfo = serialmodule.addedinfo
         phonlocs = serialmodule.phonlocs
-        unserialized[k] = MovementModule(mvmttreemodel, articulators, timingintervals, phonlocs, addedinfo, inphase)
+        unserialized[k] = MovementModule(None, articulators, timingintervals, phonlocs, addedinfo, inphase, movementtree=mvmttree)
         unserialized[k].uniqueid = k
     return unserialized
 
@@ -402,8 +530,7 @@ def unserializelocationmodules(serialized_locnmodules):
         serialtree = serialmodule.locationtree
 
         # backward compatibility with corpora saved before Relation Module existed (June 2023)
-        # if hasattr(serialtree.locationtype, '_axis') and serialtree.locationtype.axis:
-        if serialtree.locationtype.allfalse() and "Horizontal" in serialtree.checkstates.keys() and "Vertical" in serialtree.checkstates.keys() and "Sagittal" in serialtree.checkstates.keys():
+        if isaxisofrelationtree(serialtree):
             print("converting relation")
             # then this likely was saved as an "axis of relation" location module, which is now
             # deprecated and should be converted to a relation module
@@ -456,12 +583,21 @@ def unserializelocationmodules(serialized_locnmodules):
             # self.addmodule(convertedrelationmodule)
 
         else:
-            locntreemodel = LocationTreeModel(serialmodule.locationtree)
-            unserialized[k] = LocationModule(locntreemodel, articulators, timingintervals, phonlocs, addedinfo, inphase=inphase)
+            # the LocationTreeModel itself is only built if needed (see LocationModule.locationtreemodel)
+            locntree = compactlocationtree(serialtree)
+            unserialized[k] = LocationModule(None, articulators, timingintervals, phonlocs, addedinfo, inphase=inphase, locationtree=locntree)
             unserialized[k].uniqueid = k
     return unserialized, convertedrelationmodules
 
 
+# whether serialtree (a LocationTreeSerializable) is from an "axis of relation" location module,
+# which is now deprecated and converted to a relation module when loaded
+def isaxisofrelationtree(serialtree):
+    # if hasattr(serialtree.locationtype, '_axis') and serialtree.locationtype.axis:
+    return serialtree.locationtype.allfalse() and "Horizontal" in serialtree.checkstates.keys() \
+        and "Vertical" in serialtree.checkstates.keys() and "Sagittal" in serialtree.checkstates.keys()
+
+
 def unserializerelationmodules(serialized_relmodules):
     unserialized = {}
     for k in serialized_relmodules.keys():
@@ -519,19 +655,106 @@ def unserializerelationmodules(serialized_relmodules):
     return unserialized
 
 
+# the keys a sign record (see Sign.serializerecord()) must have, in addition to 'rel modules' (or, before relation
+# modules were renamed, 'con modules')
+requiredsignrecordkeys = ['type', 'xslot structure', 'specified xslots', 'mov modules', 'loc modules', 'ori modules', 'cfg modules']
+
+
+# Check that serializedsign (as unpickled from a sign record) can be decoded, and do the parts of decoding it that
+# don't involve Qt (updating outdated paths in, and compacting, its movement and location trees), so that this can be
+# done in a worker process. Sign.decoderecord() then finishes decoding it on the main thread.
+def preparesignrecord(serializedsign, entryid):
+    missingkeys = [k for k in requiredsignrecordkeys if k not in serializedsign.keys()]
+    if 'rel modules' not in serializedsign.keys() and 'con modules' not in serializedsign.keys():
+        missingkeys.append('rel modules')
+    if missingkeys:
+        raise ValueError("Sign record for entry ID counter " + str(entryid) + " is missing: " + ", ".join(missingkeys))
+
+    for serialmodule in serializedsign['mov modules'].values():
+        serialmodule.movementtree = compactmovementtree(serialmodule.movementtree)
+    for serialmodule in serializedsign['loc modules'].values():
+        # compacting would discard the unchecked axes that identify an axis of relation tree
+        if not isaxisofrelationtree(serialmodule.locationtree):
+            serialmodule.locationtree = compactlocationtree(serialmodule.locationtree)
+    return serializedsign
+
+
+# Runs in a worker process (see Corpus.decodeall()): read and prepare the sign records at the given
+# (offset, length, crc, entry ID) locations in the indexed corpus file at path.
+def readsignrecordschunk(path, locations):
+    serializedsigns = []
+    with open(path, 'rb') as f:
+        for offset, length, crc, entryid in locations:
+            f.seek(offset)
+            recordbytes = checkrecordbytes(f.read(length), SignRecord(path, offset, length, None, crc))
+            serializedsigns.append(preparesignrecord(loadrecord(recordbytes), entryid))
+    return serializedsigns
+
+
+# Read and prepare the given SignRecords across a pool of worker processes; returns the prepared serialized signs
+# in the same order as signrecords.
+# progress (if given) is called with the number of records prepared so far as each chunk of them is done; if it raises
+# an exception (eg to cancel), chunks that haven't started yet are abandoned.
+def readsignrecordsparallel(signrecords, processes=None, progress=None):
+    processes = processes or os.cpu_count() or 1
+    # several chunks per process, so that processes that finish early can pick up more work
+    chunksize = max(1, -(-len(signrecords) // (processes * 4)))
+
+    # each chunk's records all come from the same file
+    chunks = []
+    for signrecord in signrecords:
+        location = (signrecord.offset, signrecord.length, signrecord.crc, signrecord.serializedsignlevelinfo['entryid'])
+        if chunks and chunks[-1][0] == signrecord.path and len(chunks[-1][1]) < chunksize:
+            chunks[-1][1].append(location)
+        else:
+            chunks.append((signrecord.path, [location]))
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = [executor.submit(readsignrecordschunk, path, locations) for path, locations in chunks]
+        serializedsigns = []
+        try:
+            for future in futures:
+                serializedsigns.extend(future.result())
+                if progress is not None:
+                    progress(len(serializedsigns))
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+        return serializedsigns
+
+
+# the minimum number of signs to decode for it to be worth starting up worker processes (see Corpus.decodeall())
+paralleldecodingminsigns = 1000
+
+
+# decode each of a list of (sign, prepared serialized sign or None) pairs, as returned by Corpus.prepareundecoded()
+def decodesigns(signsandserializedsigns):
+    for sign, serializedsign in signsandserializedsigns:
+        sign.decoderecord(serializedsign)
+
+
 class Corpus:
     #TODO: need a default for location_definition
     def __init__(self, signs=None, location_definition=None, path=None, serializedcorpus=None, minimumID=1, highestID=0):
+        # entry ID counter -> outdated paths that were updated, for signs migrated since loading (see add_missing_paths_sign())
+        self.migrationreport = {}
+        # indexes of this corpus's modules for narrowing down searches, by type (eg PathIndex); each is built the first
+        # time it's needed (see search.sign_index.corpusindex())
+        self.searchindexes = {}
         if serializedcorpus:
-            self.signs = set([Sign(serializedsign=s) for s in serializedcorpus['signs']])
+            self.signs = set()
             # self.location_definition = serializedcorpus['loc defn']
             self.path = serializedcorpus['path']
             self.minimumID = serializedcorpus['minimum id'] if 'minimum id' in serializedcorpus.keys() else 1
             self.highestID = serializedcorpus['highest id']
+            self.addserializedsigns(serializedcorpus['signs'])
             # check and make sure the highest ID saved is equivalent to the actual highest entry ID unless the corpus is empty 
             if len(self) > 0:
                 self.confirmhighestID("load")
-            self.add_missing_paths()  # Another backwards compatibility function for movement and location
+            # if loaded from an indexed corpus file, info about that file (see readindexedcorpus()) so that
+            # saving back to it can just append a journal entry with the changes
+            self.indexedfile = serializedcorpus.get('indexed file', None)
         else:
             self.signs = signs if signs else set()
             self.location_definition = location_definition
@@ -539,6 +762,41 @@ class Corpus:
             self.path = path
             self.minimumID = minimumID
             self.highestID = highestID
+            self.indexedfile = None
+
+    # add signs to the corpus from serializedsigns, a list of serialized signs (see Sign.serialize()) and/or SignRecords
+    # (from an indexed corpus file; these are decoded on demand)
+    # loading a corpus in the background (see MainWindow.load_corpus_binary()) does this a few signs at a time,
+    # since building the signs' modules has to happen on the GUI thread
+    def addserializedsigns(self, serializedsigns):
+        for serializedsign in serializedsigns:
+            if isinstance(serializedsign, SignRecord):
+                self.signs.add(Sign(signrecord=serializedsign, afterdecode=self.add_missing_paths_sign))
+            else:
+                sign = Sign(serializedsign=serializedsign)
+                self.signs.add(sign)
+                # Another backwards compatibility function for movement and location (only run once per sign)
+                self.add_missing_paths_sign(sign)
+
+    # decode all signs that haven't yet been decoded from their records in an indexed corpus file (see Sign.__getattr__)
+    # if parallel, and there are enough of them for it to be worthwhile, their records are read and prepared in a pool of
+    # worker processes (only building the Sign contents themselves happens here); otherwise, they're decoded one by one
+    def decodeall(self, parallel=False, processes=None):
+        undecoded, serializedsigns = self.prepareundecoded(parallel, processes)
+        decodesigns(list(zip(undecoded, serializedsigns)))
+
+    # returns the signs that haven't been decoded yet, and a list of their prepared serialized signs (see
+    # readsignrecordsparallel()) if parallel and there are enough of them for that to be worthwhile, or else of Nones
+    # (to have each sign read its own record); progress is as for readsignrecordsparallel()
+    def prepareundecoded(self, parallel=False, processes=None, progress=None):
+        undecoded = [s for s in self.signs if not s.decoded]
+        serializedsigns = [None] * len(undecoded)
+        if parallel and len(undecoded) >= paralleldecodingminsigns:
+            try:
+                serializedsigns = readsignrecordsparallel([s.signrecord for s in undecoded], processes, progress)
+            except (OSError, BrokenProcessPool) as e:
+                logging.warning("Decoding signs in parallel failed; decoding them one by one instead: " + str(e))
+        return undecoded, serializedsigns
 
     # check and make sure the highest ID saved is equivalent to the actual highest entry ID
     def confirmhighestID(self, actionname):
@@ -554,6 +812,8 @@ class Corpus:
             for s in self.signs:
                 s.signlevel_information.entryid.counter += increase_amount
             self.highestID += increase_amount
+            # every sign's entry ID has changed, so the next save has to rewrite the whole file
+            self.indexedfile = None
 
     # return the highest index in this corpus that is attached to the IDgloss given by idglosstext
     # if the idgloss doesn't exist or if it is does but it's not indexed, then 0 is returned
@@ -584,6 +844,79 @@ class Corpus:
             'highest id': self.highestID
         }
 
+    # for saving as an indexed corpus file (see writeindexedcorpus()); same as serialize() except that 'signs' is a list of
+    # (serialized sign-level info, sign record) pairs, in the same order as signs (a list of this corpus's signs)
+    # this is a snapshot of the corpus as of now, so it can be written on another thread while editing continues
+    def serializeindexed(self, signs):
+        if len(self) > 0:
+            self.confirmhighestID("save")
+        return {
+            'signs': [(s.signlevel_information.serialize(), s.snapshotrecord()) for s in signs],
+            'file stamp': newfilestamp(),
+            'path': self.path,
+            'minimum id': self.minimumID,
+            'highest id': self.highestID
+        }
+
+    # whether saving to path can be done by appending a journal entry with just the changes since the last load/save,
+    # rather than rewriting the whole file
+    def canappendjournal(self, path):
+        return self.indexedfilematches(path) \
+            and self.indexedfile['journal entries'] < maxjournalentries \
+            and self.indexedfile['length'] - self.indexedfile['base length'] < self.indexedfile['base length']
+
+    # whether path is the indexed corpus file this corpus was last loaded from or saved to, unchanged since then
+    def indexedfilematches(self, path):
+        return self.indexedfile is not None \
+            and self.indexedfile['path'] == path \
+            and fileidentity(path) == self.indexedfile['identity']
+
+    # for saving as a journal entry (see appendindexedcorpusjournal()); same as serializeindexed() except that only the
+    # signs that have changed (or been added) since the last load/save are included, in the same order as signs
+    def serializechanges(self, signs):
+        if len(self) > 0:
+            self.confirmhighestID("save")
+        currententryids = set([s.signlevel_information.entryid.counter for s in self.signs])
+        return {
+            'signs': [(s.signlevel_information.serialize(), s.snapshotrecord()) for s in signs],
+            'removed': [entryid for entryid in self.indexedfile['entry ids'] if entryid not in currententryids],
+            'file stamp': self.indexedfile['stamp'],
+            'path': self.path,
+            'minimum id': self.minimumID,
+            'highest id': self.highestID
+        }
+
+    def changedsigns(self):
+        return [s for s in self.signs if s.dirty or s.signlevel_information.entryid.counter not in self.indexedfile['entry ids']]
+
+    # update this corpus's signs and info about its indexed file after it's been saved (written in full unless
+    # isjournalentry), given the signs that were written, their revisions and this corpus's entry IDs as of when the
+    # snapshot was taken, their SignRecords in the file, and the file's stamp (see newfilestamp())
+    # signs that have changed since the snapshot was taken stay dirty, to be written by the next save
+    def savedindexed(self, path, signs, revisions, entryids, signrecords, stamp, isjournalentry):
+        for sign, revision, signrecord in zip(signs, revisions, signrecords):
+            sign.savedrecord(signrecord, revision)
+
+        identity = fileidentity(path)
+        filelength = identity[2]
+        if isjournalentry:
+            if self.indexedfile is None:
+                # entry IDs were renumbered while saving, so the next save has to rewrite the whole file anyway
+                return
+            self.indexedfile['identity'] = identity
+            self.indexedfile['length'] = filelength
+            self.indexedfile['journal entries'] += 1
+        else:
+            self.indexedfile = {
+                'path': path,
+                'identity': identity,
+                'stamp': stamp,
+                'length': filelength,
+                'base length': filelength,
+                'journal entries': 0,
+            }
+        self.indexedfile['entry ids'] = set(entryids)
+
     # return a flat list of all the glosses used in this corpus
     #   (does not provide any info about which glosses may or may not be associated with the same sign)
     def get_all_glosses(self):
@@ -637,43 +970,64 @@ class Corpus:
 
     def add_missing_paths(self):
         for sign in self.signs:
-            correctionsdict = {ModuleTypes.MOVEMENT: {},
-                               ModuleTypes.LOCATION: {},
-                               ModuleTypes.RELATION: {}}
-            entryidcounter = sign.signlevel_information.entryid.counter
-            for type in [ModuleTypes.MOVEMENT, ModuleTypes.LOCATION, ModuleTypes.RELATION]:
-                moduledict = sign.getmoduledict(type)
-
-                for count, k in enumerate(moduledict):
-                    correctionsdict[type][entryidcounter] = {}
-                    module = moduledict[k]
-
-                    if type == ModuleTypes.MOVEMENT:
-                        self.add_missing_paths_helper(entryidcounter, module.movementtreemodel, type, count, correctionsdict)
-                    elif type == ModuleTypes.LOCATION:
-                        self.add_missing_paths_helper(entryidcounter, module.locationtreemodel, type, count, correctionsdict)
-                    elif type == ModuleTypes.RELATION:
-                        if module.no_selections():
-                            label = "   EntryID counter {:<10} {:<9}".format("   " + str(entryidcounter) + " ", str(type) + str(count + 1))
-                            mssg = ": Main module has no selections. Is something missing?"
-                            logging.warning(label + mssg)
-
-                        bodyparts_dict = module.bodyparts_dict
-                        articulators, numbers = module.get_articulators_in_use()
-                        models = []
-                        for ctr in range(len(articulators)):
-                            models.append(bodyparts_dict[articulators[ctr]][numbers[ctr]].bodyparttreemodel)
-
-                        empty_module_flag = False
-                        for m in models:
-                            if len(m.get_checked_from_serialized_tree()) == 0:
-                                empty_module_flag = True
-                            self.add_missing_paths_helper(entryidcounter, m, type, count, correctionsdict, verbose=False)
-                        if empty_module_flag and module.contactrel.contact:
-                            label = "   EntryID counter {:<10} {:<9}".format("   " + str(entryidcounter) + " ", str(type) + str(count + 1))
-                            mssg = ": Module has no bodypart selections. Is something missing?"
-                            logging.warning(label + mssg)
-                          
+            # signs that haven't been decoded yet get this done when they are (see __init__)
+            if sign.decoded:
+                self.add_missing_paths_sign(sign)
+
+    # this only needs to be done once per sign: afterwards the sign is stamped with the current MIGRATION_VERSION
+    # (and marked as changed, so that the next save stores the stamp) and will be skipped on later loads
+    def add_missing_paths_sign(self, sign):
+        if sign.migrationversion >= MIGRATION_VERSION:
+            return
+
+        outdatedpaths = []
+        correctionsdict = {ModuleTypes.MOVEMENT: {},
+                           ModuleTypes.LOCATION: {},
+                           ModuleTypes.RELATION: {}}
+        entryidcounter = sign.signlevel_information.entryid.counter
+        for type in [ModuleTypes.MOVEMENT, ModuleTypes.LOCATION, ModuleTypes.RELATION]:
+            moduledict = sign.getmoduledict(type)
+
+            for count, k in enumerate(moduledict):
+                correctionsdict[type][entryidcounter] = {}
+                module = moduledict[k]
+
+                # only build the full tree model if there are stored paths that can't be found in the current options tree
+                if type == ModuleTypes.MOVEMENT:
+                    treemodel = module.movementtreemodel if module.movementtree.compare_checked_lists() else module.movementtree
+                    outdatedpaths.extend(self.add_missing_paths_helper(entryidcounter, treemodel, type, count, correctionsdict))
+                elif type == ModuleTypes.LOCATION:
+                    treemodel = module.locationtreemodel if module.locationtree.compare_checked_lists() else module.locationtree
+                    outdatedpaths.extend(self.add_missing_paths_helper(entryidcounter, treemodel, type, count, correctionsdict))
+                elif type == ModuleTypes.RELATION:
+                    if module.no_selections():
+                        label = "   EntryID counter {:<10} {:<9}".format("   " + str(entryidcounter) + " ", str(type) + str(count + 1))
+                        mssg = ": Main module has no selections. Is something missing?"
+                        logging.warning(label + mssg)
+
+                    bodyparts_dict = module.bodyparts_dict
+                    articulators, numbers = module.get_articulators_in_use()
+                    models = []
+                    for ctr in range(len(articulators)):
+                        models.append(bodyparts_dict[articulators[ctr]][numbers[ctr]].bodyparttreemodel)
+
+                    empty_module_flag = False
+                    for m in models:
+                        if len(m.get_checked_from_serialized_tree()) == 0:
+                            empty_module_flag = True
+                        outdatedpaths.extend(self.add_missing_paths_helper(entryidcounter, m, type, count, correctionsdict, verbose=False))
+                    if empty_module_flag and module.contactrel.contact:
+                        label = "   EntryID counter {:<10} {:<9}".format("   " + str(entryidcounter) + " ", str(type) + str(count + 1))
+                        mssg = ": Module has no bodypart selections. Is something missing?"
+                        logging.warning(label + mssg)
+
+        sign.migrationversion = MIGRATION_VERSION
+        sign.dirty = True
+        if outdatedpaths:
+            self.migrationreport[entryidcounter] = outdatedpaths
+            logging.info("   EntryID counter " + str(entryidcounter) + ": updated outdated paths " + ", ".join(outdatedpaths))
+
+    # returns the paths in treemodel that aren't in the current options tree (ie, that needed updating)
     def add_missing_paths_helper(self, entryidcounter, treemodel, type, count, correctionsdict, verbose=True):
         paths_missing_bc = []
         paths_not_found = []
@@ -684,6 +1038,8 @@ class Corpus:
             logging.warning(label + mssg)
 
         missing_values = treemodel.compare_checked_lists()
+        if not missing_values:
+            return []
 
         newpaths = []
 
@@ -711,9 +1067,8 @@ class Corpus:
         for p in missing_values:
             if p not in paths_missing_bc and p not in paths_not_found:
                 treemodel.uncheck_paths_from_serialized_tree(missing_values)
-    
-        
-        return 
+
+        return missing_values
 
     # Converts a string representing a movement/location path into a list of nodes
     def get_node_sequence(self, item):
@@ -840,3 +1195,20 @@ class Corpus:
                 nodes[3].replace("Mastoid process", "Behind ear")
                 paths_to_add.append(nodes)
         return paths_to_add
+
+
+# Loads the corpus in the file at path, without a GUI (see MainWindow.load_corpus_binary() for loading one with progress
+#   reporting). Signs in an indexed corpus file are only decoded when they're first needed.
+def loadcorpusfile(path):
+    if isindexedcorpusfile(path):
+        corpus = Corpus(serializedcorpus=readindexedcorpus(path))
+    else:
+        # corpora saved before 20261018 are a single pickled dict
+        with open(path, 'rb') as f:
+            serializedcorpus = renamed_load(f)
+        corpus = Corpus(serializedcorpus=dict(serializedcorpus, signs=[]))
+        corpus.addserializedsigns(serializedcorpus['signs'])
+        corpus.confirmhighestID("load")
+    # in case we're loading a corpus that was originally created on a different machine / in a different folder
+    corpus.path = path
+    return corpus
@@ -37,6 +37,52 @@ def delay_uniqueid_reset(func):
     return wrapper_delay_uniqueid_reset
 
 
+# the names of all the slots of cls (a SlottedValue subclass), including those of its base classes (but not
+#   SlottedValue's own _extra)
+@functools.lru_cache(maxsize=None)
+def slotnames(cls):
+    return tuple(name for klass in reversed(cls.__mro__) for name in klass.__dict__.get('__slots__', ())
+                 if name != '_extra')
+
+
+# Common ancestor for the small value classes (TimingPoint, AddedInfo, Direction, etc) that every sign has many of,
+#   which use __slots__ rather than a per-instance __dict__ to save memory.
+# They're pickled as a dict of attribute values, exactly as they were before they had slots, so corpora saved either way
+#   load the same (see RenameUnpickler); any attribute a class doesn't have (eg, one it no longer has, or one saved by a
+#   later version of the app) is kept aside when unpickling and pickled again along with the rest, and any it didn't
+#   have yet is left unset (so the backward compatibility checks in its properties still work).
+# Use attributes() and updateattributes() instead of __dict__ or vars(), which slotted instances don't have.
+class SlottedValue:
+    # attribute name -> value, for the attributes this was unpickled with that its class doesn't have (unset if none)
+    __slots__ = ('_extra',)
+
+    def attributes(self):
+        return {name: getattr(self, name) for name in slotnames(type(self)) if hasattr(self, name)}
+
+    def updateattributes(self, attributes):
+        names = slotnames(type(self))
+        for name, value in attributes.items():
+            if name in names:
+                object.__setattr__(self, name, value)
+
+    # the attributes this was unpickled with that its class doesn't have
+    def extraattributes(self):
+        return getattr(self, '_extra', {})
+
+    def __getstate__(self):
+        return dict(self.extraattributes(), **self.attributes())
+
+    def __setstate__(self, state):
+        if isinstance(state, tuple):
+            # (instance dict, slots dict), as pickled by default for slotted classes
+            state = state[1] or {}
+        self.updateattributes(state)
+        names = slotnames(type(self))
+        extra = {name: value for name, value in state.items() if name not in names}
+        if extra:
+            object.__setattr__(self, '_extra', extra)
+
+
 # common ancestor for timed parameter modules such as HandConfigurationModule, MovementModule, etc
 class ParameterModule:
 
@@ -238,6 +284,24 @@ class EntryID:
         return repr(self.display_string())
 
 
+# store the default for each of the entry ID display settings that qsettings (the app's QSettings) doesn't have yet, so
+#   that display_string() finds them all; counterdigits (if given) is stored as the number of counter digits regardless
+def setdefaultentryidsettings(qsettings, counterdigits=None):
+    qsettings.beginGroup('entryid')
+    qsettings.beginGroup('counter')
+    qsettings.setValue('visible', qsettings.value('visible', defaultValue=True, type=bool))
+    qsettings.setValue('order', qsettings.value('order', defaultValue=0, type=int))
+    qsettings.setValue('digits', counterdigits or qsettings.value('digits', defaultValue=4, type=int))
+    qsettings.endGroup()  # counter
+    qsettings.beginGroup('date')
+    qsettings.setValue('visible', qsettings.value('visible', defaultValue=False, type=bool))
+    qsettings.setValue('order', qsettings.value('order', defaultValue=0, type=int))
+    qsettings.setValue('format', qsettings.value('format', defaultValue='YYYY-MM', type=str))
+    qsettings.endGroup()  # date
+    qsettings.setValue('delimiter', qsettings.value('delimiter', defaultValue='_', type=str))
+    qsettings.endGroup()  # entryid
+
+
 class SignLevelInformation:
     def __init__(self, signlevel_info=None, serializedsignlevelinfo=None, parentsign=None):
         self._parentsign = parentsign
@@ -492,8 +556,12 @@ class SignLevelInformation:
 # It also stores "Added Info" (estimated, uncertain, etc) characteristics for each selected movement
 # as well as for the module overall.
 class MovementModule(ParameterModule):
-    def __init__(self, movementtreemodel, articulators, timingintervals=None, phonlocs=None, addedinfo=None, inphase=0):
+    # movementtree is a (Qt-free) MovementTreeSerializable, eg as loaded from a saved corpus. If it is given
+    # instead of a movementtreemodel, the MovementTreeModel is only built if/when something actually needs it
+    # (eg a specification dialog); abbreviations and searches work directly from the serialized tree.
+    def __init__(self, movementtreemodel, articulators, timingintervals=None, phonlocs=None, addedinfo=None, inphase=0, movementtree=None):
         self._movementtreemodel = movementtreemodel
+        self._movementtree = movementtree if movementtreemodel is None else None
         self._inphase = inphase    # TODO is "inphase" actually the best name for this attribute?
         super().__init__(articulators, timingintervals=timingintervals, phonlocs=phonlocs, addedinfo=addedinfo, moduletype=ModuleTypes.MOVEMENT)
 
@@ -503,11 +571,27 @@ class MovementModule(ParameterModule):
 
     @property
     def movementtreemodel(self):
+        if self._movementtreemodel is None and self._movementtree is not None:
+            # imported here rather than at the top of the file, because models.movement_models imports this module
+            from models.movement_models import MovementTreeModel
+            self._movementtreemodel = MovementTreeModel(self._movementtree)
+            # from now on the tree model (which might be edited) is the authoritative version
+            self._movementtree = None
         return self._movementtreemodel
 
     @movementtreemodel.setter
     def movementtreemodel(self, movementtreemodel):
         self._movementtreemodel = movementtreemodel
+        self._movementtree = None
+
+    # Either the MovementTreeSerializable this module was loaded with or, once it has been built, the MovementTreeModel.
+    # Both provide get_checked_items(), get_checked_from_serialized_tree(), and compare_checked_lists(), so use this
+    # rather than movementtreemodel for read-only access, to avoid building a tree model unnecessarily.
+    @property
+    def movementtree(self):
+        if self._movementtreemodel is not None:
+            return self._movementtreemodel
+        return self._movementtree
 
     @property
     def inphase(self):
@@ -540,7 +624,7 @@ class MovementModule(ParameterModule):
         h1h2 = {"Axis direction": "", "Plane": ""}
         rep_info = {"abbrev": "", "num": None, "min": False, "locn": []}
         
-        paths = self.movementtreemodel.get_checked_items(only_fully_checked=False, include_details=True)
+        paths = self.movementtree.get_checked_items(only_fully_checked=False, include_details=True)
         leaf_paths = []
         last_path = paths[0] if paths else None
         for path in paths: 
@@ -648,7 +732,8 @@ class MovementModule(ParameterModule):
 
 
 # this class stores info about whether an instance of the Location module represents a phonetic/phonological location
-class PhonLocations:
+class PhonLocations(SlottedValue):
+    __slots__ = ('_phonologicalloc', '_majorphonloc', '_minorphonloc', '_phoneticloc')
 
     def __init__(self, phonologicalloc=False, majorphonloc=False, minorphonloc=False, phoneticloc=False):
         self._phonologicalloc = phonologicalloc
@@ -658,9 +743,7 @@ class PhonLocations:
 
     def __eq__(self, other):
         if isinstance(other, PhonLocations):
-            self_attributes = self.__dict__
-            other_attributes = other.__dict__
-            return False not in [self_attributes[attr] == other_attributes[attr] for attr in self_attributes.keys()]
+            return self.attributes() == other.attributes()
         return False
 
     def __ne__(self, other):
@@ -725,7 +808,8 @@ class PhonLocations:
 
 # this class stores info about what kind of location type (body or signing space)
 # is used by a particular instance of the Location Module
-class LocationType:
+class LocationType(SlottedValue):
+    __slots__ = ('_body', '_signingspace', '_bodyanchored', '_purelyspatial')
 
     def __init__(self, body=False, signingspace=False, bodyanchored=False, purelyspatial=False):
         self._body = body
@@ -829,7 +913,8 @@ class LocationType:
         return "Other loctype"
 
 # Represents one specific point in time in an x-slot timing structure
-class TimingPoint:
+class TimingPoint(SlottedValue):
+    __slots__ = ('_wholepart', '_fractionalpart')
 
     def __init__(self, wholepart, fractionalpart):
         self._wholepart = wholepart
@@ -927,7 +1012,8 @@ class TimingPoint:
 # Represents an interval in time (from one TimingPoint to another) in an x-slot timing structure
 # In order to represent a "whole sign" timing interval (no matter how many x-slots long), use
 #   TimingInterval(TimingPoint(0, 0), TimingPoint(0, 1))
-class TimingInterval:
+class TimingInterval(SlottedValue):
+    __slots__ = ('_startpoint', '_endpoint')
 
     # startpt (type TimingPoint) = the point at which this xslot interval begins
     # endpt (type TimingPoint) = the point at which this xslot interval ends
@@ -1030,7 +1116,11 @@ class TimingInterval:
 
 # This class represents additional information that can be appended to many different types of entries in SLP-AA,
 #   such as to an entire module, one selection in a movement module, one surface selection in a location module, etc
-class AddedInfo:
+class AddedInfo(SlottedValue):
+    __slots__ = ('_iconic_flag', '_iconic_note', '_uncertain_flag', '_uncertain_note', '_estimated_flag', '_estimated_note',
+                 '_notspecified_flag', '_notspecified_note', '_variable_flag', '_variable_note',
+                 '_exceptional_flag', '_exceptional_note', '_incomplete_flag', '_incomplete_note',
+                 '_other_flag', '_other_note')
 
     def __init__(self,
                  iconic_flag=False, iconic_note="",
@@ -1061,11 +1151,16 @@ class AddedInfo:
 
     def __eq__(self, other):
         if isinstance(other, AddedInfo):
-            self_attributes = self.__dict__
-            other_attributes = other.__dict__
-            return False not in [self_attributes[attr] == other_attributes[attr] for attr in self_attributes.keys()]
+            return self.values() == other.values()
         return False
 
+    # all the flags and notes, via their properties (which fill in any missing from older corpora)
+    def values(self):
+        return (self.iconic_flag, self.iconic_note, self.uncertain_flag, self.uncertain_note,
+                self.estimated_flag, self.estimated_note, self.notspecified_flag, self.notspecified_note,
+                self.variable_flag, self.variable_note, self.exceptional_flag, self.exceptional_note,
+                self.incomplete_flag, self.incomplete_note, self.other_flag, self.other_note)
+
     def __ne__(self, other):
         return not self.__eq__(other)
 
@@ -1233,6 +1328,39 @@ class AddedInfo:
         return hasflag or noteslength > 0
 
 
+# The type of emptyaddedinfo, the one AddedInfo shared by the places (such as serialized trees' addedinfos) that would
+#   otherwise hold many separate AddedInfos with no flags or notes set, as almost all of them are.
+# It can't be modified: copying it (as loading a serialized tree into a tree model does) gives an ordinary AddedInfo.
+# It's pickled by reference, so that it's still shared once unpickled.
+class EmptyAddedInfo(AddedInfo):
+    __slots__ = ()
+
+    def __init__(self):
+        for name, value in AddedInfo().attributes().items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("emptyaddedinfo is shared and can't be modified; modify a copy instead")
+
+    def __copy__(self):
+        return AddedInfo()
+
+    def __deepcopy__(self, memo):
+        return AddedInfo()
+
+    def __reduce__(self):
+        return 'emptyaddedinfo'
+
+
+emptyaddedinfo = EmptyAddedInfo()
+
+
+# returns emptyaddedinfo if addedinfo has no flags or notes set (nor any attributes AddedInfo doesn't have), or else
+#   addedinfo itself
+def sharedifempty(addedinfo):
+    return emptyaddedinfo if addedinfo == emptyaddedinfo and not addedinfo.extraattributes() else addedinfo
+
+
 class Signtype:
 
     def __init__(self, specslist, addedinfo=None):
@@ -1413,8 +1541,12 @@ class BodypartInfo:
 # It also stores "Added Info" (estimated, uncertain, etc) characteristics for each selected location
 # as well as for the module overall.
 class LocationModule(ParameterModule):
-    def __init__(self, locationtreemodel, articulators, timingintervals=None, phonlocs=None, addedinfo=None, inphase=0):
+    # locationtree is a (Qt-free) LocationTreeSerializable, eg as loaded from a saved corpus. If it is given
+    # instead of a locationtreemodel, the LocationTreeModel is only built if/when something actually needs it
+    # (eg a specification dialog); abbreviations and searches work directly from the serialized tree.
+    def __init__(self, locationtreemodel, articulators, timingintervals=None, phonlocs=None, addedinfo=None, inphase=0, locationtree=None):
         self._locationtreemodel = locationtreemodel
+        self._locationtree = locationtree if locationtreemodel is None else None
         self._inphase = inphase  # TODO is "inphase" actually the best name for this attribute?
         super().__init__(articulators, timingintervals=timingintervals, phonlocs=phonlocs, addedinfo=addedinfo, moduletype=ModuleTypes.LOCATION)
 
@@ -1424,11 +1556,27 @@ class LocationModule(ParameterModule):
 
     @property
     def locationtreemodel(self):
+        if self._locationtreemodel is None and self._locationtree is not None:
+            # imported here rather than at the top of the file, because models.location_models imports this module
+            from models.location_models import LocationTreeModel
+            self._locationtreemodel = LocationTreeModel(self._locationtree)
+            # from now on the tree model (which might be edited) is the authoritative version
+            self._locationtree = None
         return self._locationtreemodel
 
     @locationtreemodel.setter
     def locationtreemodel(self, locationtreemodel):
         self._locationtreemodel = locationtreemodel
+        self._locationtree = None
+
+    # Either the LocationTreeSerializable this module was loaded with or, once it has been built, the LocationTreeModel.
+    # Both provide get_checked_items(), locationtype, defaultneutralselected, nodes_are_terminal, etc, so use this
+    # rather than locationtreemodel for read-only access, to avoid building a tree model unnecessarily.
+    @property
+    def locationtree(self):
+        if self._locationtreemodel is not None:
+            return self._locationtreemodel
+        return self._locationtree
 
     @property
     def inphase(self):
@@ -1442,8 +1590,8 @@ class LocationModule(ParameterModule):
 
     def getabbreviation(self):
         phonphon_str = self.phonlocs.getabbreviation() if self.phonlocs else ""
-        loctype_str = self.locationtreemodel.locationtype.getabbreviation()
-        is_neutral_str = "neutral" if self.locationtreemodel.defaultneutralselected else ""
+        loctype_str = self.locationtree.locationtype.getabbreviation()
+        is_neutral_str = "neutral" if self.locationtree.defaultneutralselected else ""
 
         # don't list paths if neutral checkbox is checked or "default neutral space" is a selected path
         if is_neutral_str:
@@ -1454,7 +1602,7 @@ class LocationModule(ParameterModule):
         if loctype_str == "Signing space(spatial)" and not is_neutral_str:
             # setting only_fully_checked False returns each individual node in the path (eg 'Sagittal axis', 'Sagittal axis>In front)
             # so that we can get the abbreviations of intermediate nodes
-            paths = self.locationtreemodel.get_checked_items(only_fully_checked=False, include_details=True) 
+            paths = self.locationtree.get_checked_items(only_fully_checked=False, include_details=True) 
             last_node = ""
             curr_abbrev_list = []
             # Each 'curr_node' is a dict. Keys are 'path', 'abbrev', 'details'
@@ -1477,7 +1625,7 @@ class LocationModule(ParameterModule):
 
         elif loctype_str != "Signing space(spatial)" :
             # each 'path' is a dict. Keys are 'path', 'abbrev', 'details'
-            for path in self.locationtreemodel.get_checked_items(include_details=True):
+            for path in self.locationtree.get_checked_items(include_details=True):
                 path_str = get_path_lowest_node(path['path']) if path['abbrev'] is None else path['abbrev']
                 # details_dict: keys are the subarea types ('surface', 'sub-area', or ''); 
                 # values are lists of checked subareas
@@ -2193,7 +2341,9 @@ class RelationModule(ParameterModule):
 
 
 
-class MannerRelation:
+class MannerRelation(SlottedValue):
+    __slots__ = ('_holding', '_continuous', '_intermittent', '_any')
+
     def __init__(self, holding=False, continuous=False, intermittent=False, any=False):
         self._holding = holding
         self._continuous = continuous
@@ -2352,7 +2502,9 @@ class ContactRelation:
         self._distances = distances
 
 
-class ContactType:
+class ContactType(SlottedValue):
+    __slots__ = ('_light', '_firm', '_other', '_othertext', '_any')
+
     def __init__(self, light=False, firm=False, other=False, othertext="", any=False):
         self._light = light
         self._firm = firm
@@ -2362,9 +2514,8 @@ class ContactType:
 
     def __eq__(self, other):
         if isinstance(other, ContactType):
-            self_attributes = self.__dict__
-            other_attributes = other.__dict__
-            return False not in [self_attributes[attr] == other_attributes[attr] for attr in self_attributes.keys()]
+            return self.light == other.light and self.firm == other.firm and self.other == other.other \
+                and self.othertext == other.othertext and self.any == other.any
         return False
 
     def __ne__(self, other):
@@ -2443,7 +2594,8 @@ class ContactType:
 
 # This class is used by the Relation Module to track the axis on which to measure the relation between
 # two elements (X and Y), as well as the direction of X relative to Y.
-class Direction:
+class Direction(SlottedValue):
+    __slots__ = ('_axis', '_axisselected', '_plus', '_minus', '_inline', '_any')
     HORIZONTAL = "horizontal"
     VERTICAL = "vertical"
     SAGITTAL = "sagittal"
@@ -2582,7 +2734,8 @@ class Direction:
 
 # This class is used by the Relation Module to track the axis on which to measure the relation between
 # two elements (X and Y), as well as the relative distance between those two elements.
-class Distance:
+class Distance(SlottedValue):
+    __slots__ = ('_axis', '_close', '_medium', '_far', '_any')
 
     def __init__(self, axis, close=False, medium=False, far=False, any=False):
         self._axis = axis
@@ -2785,11 +2938,23 @@ class ExtendedFingersModule(ParameterModule):
 # It also stores "Added Info" (estimated, uncertain, etc) characteristics for each slot,
 # forearm, and the hand config overall.
 class HandConfigurationModule(ParameterModule):
+    # MCP joint symbols that count as an extended finger (see finger_is_extended()), without and with 'i'
+    EXTENDED_SYMBOLS = ('H', 'E', 'e')
+    EXTENDED_SYMBOLS_I = ('H', 'E', 'e', 'i')
+
     def __init__(self, handconfiguration, overalloptions, articulators, timingintervals=None, phonlocs=None, addedinfo=None):
         self._handconfiguration = handconfiguration
         self._overalloptions = overalloptions
+        # (the hand configuration they were worked out from, mask without 'i', mask with 'i'); see extendedfingersmask()
+        self._extendedfingersmasks = None
         super().__init__(articulators, timingintervals=timingintervals, phonlocs=phonlocs, addedinfo=addedinfo, moduletype=ModuleTypes.HANDCONFIG)
 
+    # the cached extended finger masks aren't saved; they're worked out again when needed
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state.pop('_extendedfingersmasks', None)
+        return state
+
     @property
     def moduletype(self):
         return super().moduletype or ModuleTypes.HANDCONFIG
@@ -2801,6 +2966,7 @@ class HandConfigurationModule(ParameterModule):
     @handconfiguration.setter
     def handconfiguration(self, new_handconfiguration):
         self._handconfiguration = new_handconfiguration
+        self._extendedfingersmasks = None
 
     @property
     def overalloptions(self):
@@ -2826,6 +2992,24 @@ class HandConfigurationModule(ParameterModule):
             return True
         return False
 
+    # bitmask of the fingers that are extended in this hand configuration (thumb = 1, index = 2, middle = 4, ring = 8,
+    #   pinky = 16), counting 'i' as extended if i_extended
+    # it's worked out once and cached until the hand configuration changes (including by Sign.updatemodule(), which
+    #   replaces the hand configuration without going through the setter)
+    def extendedfingersmask(self, i_extended=False):
+        cached = getattr(self, '_extendedfingersmasks', None)  # modules loaded from older files don't have it
+        if cached is None or cached[0] is not self._handconfiguration:
+            config_tuple = self.config_tuple()
+            masks = []
+            for extended_symbols in [self.EXTENDED_SYMBOLS, self.EXTENDED_SYMBOLS_I]:
+                masks.append(sum(1 << finger for finger in range(5)
+                                 if self.finger_is_extended(config_tuple, extended_symbols, finger)))
+            cached = self._extendedfingersmasks = (self._handconfiguration, masks[0], masks[1])
+        return cached[2] if i_extended else cached[1]
+
+    def num_extended_fingers(self, i_extended=False):
+        return bin(self.extendedfingersmask(i_extended)).count('1')
+
     def getabbreviation(self):
         handconfighand = HandConfigurationHand(self.handconfiguration)
 
@@ -3031,7 +3215,9 @@ class HandConfigurationField:
 
 # This class represents the transcription for one single field of a hand configuration.
 # It also contains the "Added Info" (uncertain, estimated, etc) for the slot.
-class HandConfigurationSlot:
+class HandConfigurationSlot(SlottedValue):
+    __slots__ = ('_slot_number', '_symbol', '_addedinfo')
+
     def __init__(self, slot_number, symbol, addedinfo):
         self._slot_number = slot_number
         self._symbol = symbol
@@ -3039,9 +3225,7 @@ class HandConfigurationSlot:
 
     def __eq__(self, other):
         if isinstance(other, HandConfigurationSlot):
-            self_attributes = self.__dict__
-            other_attributes = other.__dict__
-            return False not in [self_attributes[attr] == other_attributes[attr] for attr in self_attributes.keys()]
+            return self.attributes() == other.attributes()
         return False
 
     def __ne__(self, other):
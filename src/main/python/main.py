@@ -1,8 +1,11 @@
 import sys
+import multiprocessing
 # import subprocess
 from gui.app import AppContext
 
 if __name__ == '__main__':
+    # needed for worker processes (eg for decoding corpora in parallel) in the frozen app
+    multiprocessing.freeze_support()
 
     appctxt = AppContext()
     exit_code = appctxt.run()
@@ -14,10 +14,11 @@ from PyQt5.Qt import (
 )
 import logging
 
-from lexicon.module_classes import LocationType, AddedInfo
+from lexicon.module_classes import LocationType, AddedInfo, emptyaddedinfo, sharedifempty
 from serialization_classes import LocationTreeSerializable, LocationTableSerializable
-from models.shared_models import TreePathsProxyModel
-from constant import HAND, ARM, LEG, CONTRA, IPSI, userdefinedroles as udr, treepathdelimiter
+from models.shared_models import TreePathsProxyModel, clonetemplaterows
+from models.path_registry import pathregistry
+from constant import HAND, ARM, LEG, CONTRA, IPSI, MIGRATION_VERSION, userdefinedroles as udr, treepathdelimiter
 
 
 # radio button vs checkbox
@@ -544,6 +545,133 @@ locn_options_purelyspatial = LocnOptionsNode("purelyspatial_options_root", child
 ])
 
 
+# ensure that any info stored in these LocationTreeSerializable (or json dict) dicts under older keys (paths),
+# is updated to reflect the newer text for those outdated keys
+# dicts is a list of the checkstates, addedinfos, and detailstables dicts, in that order
+def locationtreebackwardcompatibility(dicts):
+    # backward compatibility: As of 20230631, entries with "other hand>whole hand" will be moved to "other hand" with surfaces and subareas preserved
+    if ("Other hand"+treepathdelimiter+ "Whole hand" in dicts[0]):
+        if (dicts[0]["Other hand" + treepathdelimiter + "Whole hand"] == Qt.Checked):
+            for stored_dict in dicts:
+                stored_dict["Whole hand"] = stored_dict["Other hand" + treepathdelimiter + "Whole hand"]
+        for stored_dict in dicts:
+            stored_dict.pop("Other hand" + treepathdelimiter + "Whole hand")
+    # backward compatibility: As of 20230918, rename "Other hand" back to "Whole hand"
+    if ("Other hand" in dicts[0]):
+        if (dicts[0]["Other hand"] == Qt.Checked):
+            for stored_dict in dicts:
+                stored_dict["Whole hand"] = stored_dict["Other hand"] 
+        for stored_dict in dicts:
+            stored_dict.pop("Other hand")
+
+    for stored_dict in dicts:
+        pairstoadd = {}
+        keystoremove = []
+        for k in stored_dict.keys():
+            if "H1 is in front of H2" in k:
+                pairstoadd[k.replace("H1 is in front of H2", "H1 is more distal than H2")] = stored_dict[k]
+                keystoremove.append(k)
+            if "H1 is behind H2" in k:
+                pairstoadd[k.replace("H1 is behind H2", "H1 is more proximal than H2")] = stored_dict[k]
+                keystoremove.append(k)
+            if "Nostrils" in k:  # all other body locations are named with the singular
+                pairstoadd[k.replace("Nostrils", "Nostril")] = stored_dict[k]
+                keystoremove.append(k)
+
+        for oldkey in keystoremove:
+            stored_dict.pop(oldkey)
+
+        for newkey in pairstoadd.keys():
+            stored_dict[newkey] = pairstoadd[newkey]
+
+
+# Paths of the location options trees, in the same (preorder) order in which LocationTreeModel.populate()
+# builds its tree items. Each path maps to a tuple of (position in tree, abbreviation).
+# Used to query serialized location trees without having to build a LocationTreeModel.
+_locationoptionspaths = {}
+
+
+def locationoptionspaths(locationtype):
+    if locationtype is None:
+        return {}
+    elif locationtype.usesbodylocations():
+        structure = locn_options_body
+    elif locationtype.purelyspatial:
+        structure = locn_options_purelyspatial
+    else:
+        return {}
+
+    if structure.display_name not in _locationoptionspaths:
+        pathsdict = {}
+        collectoptionspaths(structure, "", pathsdict)
+        _locationoptionspaths[structure.display_name] = pathsdict
+    return _locationoptionspaths[structure.display_name]
+
+
+def collectoptionspaths(structure, pathsofar, pathsdict):
+    for child in structure.children:
+        if child.display_name == subgroup:
+            # subgroups don't contribute a level to the path
+            collectoptionspaths(child, pathsofar, pathsdict)
+        else:
+            pathtext = pathsofar + child.display_name
+            pathsdict[pathregistry.intern(pathtext)] = (len(pathsdict), child.tooltip)
+            collectoptionspaths(child, pathtext + treepathdelimiter, pathsdict)
+
+
+# Prepare a LocationTreeSerializable (eg from a saved corpus) to be held by a location module in place of
+# a LocationTreeModel: update outdated paths, discard entries for unselected paths that carry no information,
+# and share the path registry's copy of each remaining path.
+def compactlocationtree(serializedlocntree):
+    if serializedlocntree.migrationversion < MIGRATION_VERSION:
+        locationtreebackwardcompatibility([serializedlocntree.checkstates, serializedlocntree.addedinfos, serializedlocntree.detailstables])
+        serializedlocntree.migrationversion = MIGRATION_VERSION
+    serializedlocntree.checkstates = {pathregistry.intern(pathtext): checkstate for pathtext, checkstate in serializedlocntree.checkstates.items()
+                                      if checkstate != Qt.Unchecked}
+    serializedlocntree.addedinfos = {pathregistry.intern(pathtext): sharedifempty(addedinfo) for pathtext, addedinfo in serializedlocntree.addedinfos.items()
+                                     if pathtext in serializedlocntree.checkstates or addedinfo != emptyaddedinfo}
+    serializedlocntree.detailstables = {pathregistry.intern(pathtext): locntable for pathtext, locntable in serializedlocntree.detailstables.items()
+                                        if pathtext in serializedlocntree.checkstates or locntable.hascheckedvalues()}
+    return serializedlocntree
+
+
+# The full form of a compacted LocationTreeSerializable (see compactlocationtree()): an entry for every path in the
+# options tree, just as a LocationTreeModel is serialized, eg for a "max" export.
+def expandlocationtree(serializedlocntree):
+    return LocationTreeSerializable(LocationTreeModel(LocationTreeSerializable(serializedlocntree)))
+
+
+# Template tree models, built once (per options structure or body part type) by walking the options structure.
+# populate() then fills each new tree model by copying a template, which is much faster than building every
+# tree item (and its details table) from scratch. Templates must never be modified.
+_locationtemplatetrees = {}
+_bodyparttemplatetrees = {}
+
+
+def locationtemplatetree(structure):
+    if structure.display_name not in _locationtemplatetrees:
+        templatetree = LocationTreeModel()
+        templatetree.populate(templatetree.invisibleRootItem(), structure=structure, pathsofar="")
+        _locationtemplatetrees[structure.display_name] = templatetree
+    return _locationtemplatetrees[structure.display_name]
+
+
+def bodyparttemplatetree(bodyparttype):
+    if bodyparttype not in _bodyparttemplatetrees:
+        if bodyparttype == HAND:
+            locn_options = deepcopy(locn_options_hand)
+        elif bodyparttype == ARM:
+            locn_options = deepcopy(locn_options_arm)
+        elif bodyparttype == LEG:
+            locn_options = deepcopy(locn_options_leg)
+        else:
+            locn_options = LocnOptionsNode()
+        templatetree = BodypartTreeModel(bodyparttype)
+        LocationTreeModel.populate(templatetree, templatetree.invisibleRootItem(), structure=LocnOptionsNode(children=[locn_options]), pathsofar="")
+        _bodyparttemplatetrees[bodyparttype] = templatetree
+    return _bodyparttemplatetrees[bodyparttype]
+
+
 class LocationTreeModel(QStandardItemModel):
 
     def __init__(self, serializedlocntree=None, jsondict=None, **kwargs):
@@ -580,7 +708,7 @@ class LocationTreeModel(QStandardItemModel):
         elif jsondict is not None:
             self.jsondict = jsondict
             if 'locationtype' in self.jsondict.keys():
-                self.locationtype.__dict__.update(self.jsondict['locationtype'])
+                self.locationtype.updateattributes(self.jsondict["locationtype"])
             if 'multiple_selection_allowed' in self.jsondict.keys():
                 self._multiple_selection_allowed = self.jsondict['multiple_selection_allowed']
             else:
@@ -599,8 +727,11 @@ class LocationTreeModel(QStandardItemModel):
 
     # ensure that any info stored in this LocationTreeSerializable (or json dict) under older keys (paths),
     # is updated to reflect the newer text for those outdated keys
+    # (a LocationTreeSerializable already stamped with the current MIGRATION_VERSION is left as it is)
     def backwardcompatibility(self):
         if self.serializedlocntree is not None:
+            if self.serializedlocntree.migrationversion >= MIGRATION_VERSION:
+                return
             dicts = [self.serializedlocntree.checkstates, self.serializedlocntree.addedinfos, self.serializedlocntree.detailstables]
         elif self.jsondict is not None:
             dicts = []
@@ -610,40 +741,9 @@ class LocationTreeModel(QStandardItemModel):
         else:
             return
 
-        # backward compatibility: As of 20230631, entries with "other hand>whole hand" will be moved to "other hand" with surfaces and subareas preserved
-        if ("Other hand"+treepathdelimiter+ "Whole hand" in dicts[0]):
-            if (dicts[0]["Other hand" + treepathdelimiter + "Whole hand"] == Qt.Checked):
-                for stored_dict in dicts:
-                    stored_dict["Whole hand"] = stored_dict["Other hand" + treepathdelimiter + "Whole hand"]
-            for stored_dict in dicts:
-                stored_dict.pop("Other hand" + treepathdelimiter + "Whole hand")
-        # backward compatibility: As of 20230918, rename "Other hand" back to "Whole hand"
-        if ("Other hand" in dicts[0]):
-            if (dicts[0]["Other hand"] == Qt.Checked):
-                for stored_dict in dicts:
-                    stored_dict["Whole hand"] = stored_dict["Other hand"] 
-            for stored_dict in dicts:
-                stored_dict.pop("Other hand")
-
-        for stored_dict in dicts:
-            pairstoadd = {}
-            keystoremove = []
-            for k in stored_dict.keys():
-                if "H1 is in front of H2" in k:
-                    pairstoadd[k.replace("H1 is in front of H2", "H1 is more distal than H2")] = stored_dict[k]
-                    keystoremove.append(k)
-                if "H1 is behind H2" in k:
-                    pairstoadd[k.replace("H1 is behind H2", "H1 is more proximal than H2")] = stored_dict[k]
-                    keystoremove.append(k)
-                if "Nostrils" in k:  # all other body locations are named with the singular
-                    pairstoadd[k.replace("Nostrils", "Nostril")] = stored_dict[k]
-                    keystoremove.append(k)
-
-            for oldkey in keystoremove:
-                stored_dict.pop(oldkey)
-
-            for newkey in pairstoadd.keys():
-                stored_dict[newkey] = pairstoadd[newkey]
+        locationtreebackwardcompatibility(dicts)
+        if self.serializedlocntree is not None:
+            self.serializedlocntree.migrationversion = MIGRATION_VERSION
 
     def uncheck_paths_from_serialized_tree(self, paths_to_uncheck):
         for path in paths_to_uncheck:
@@ -695,7 +795,10 @@ class LocationTreeModel(QStandardItemModel):
                             self.checked.append(pathtext)
                     if pathtext in self.serializedlocntree.addedinfos.keys():
                         treechild.addedinfo = copy(self.serializedlocntree.addedinfos[pathtext])
-                    if pathtext in self.serializedlocntree.detailstables.keys():
+                    # (a table with nothing checked wouldn't change the newly-populated one, so don't bother
+                    # making this item's own copy of the template's details table)
+                    if pathtext in self.serializedlocntree.detailstables.keys() \
+                            and self.serializedlocntree.detailstables[pathtext].hascheckedvalues():
                         treechild.detailstable.updatefromserialtable(self.serializedlocntree.detailstables[pathtext])
                     self.setvaluesfromserializedtree(treechild)
 
@@ -842,11 +945,11 @@ class LocationTreeModel(QStandardItemModel):
             # base case (leaf node); don't build any more nodes
             pass
         elif structure.children == [] and pathsofar == "":
-            # no parameters; build a tree from the default options structure
+            # no parameters; copy the tree built from the default options structure
             if self._locationtype.usesbodylocations():
-                self.populate(parentnode, structure=locn_options_body, pathsofar="")
+                clonetemplaterows(locationtemplatetree(locn_options_body).invisibleRootItem(), parentnode)
             elif self._locationtype.purelyspatial:
-                self.populate(parentnode, structure=locn_options_purelyspatial, pathsofar="")
+                clonetemplaterows(locationtemplatetree(locn_options_purelyspatial).invisibleRootItem(), parentnode)
         elif structure.children != []:
             # internal node with substructure
             numentriesatthislevel = len(structure.children)
@@ -930,16 +1033,8 @@ class BodypartTreeModel(LocationTreeModel):
             # base case (leaf node); don't build any more nodes
             pass
         elif structure.children == [] and pathsofar == "":
-            # no parameters; build a tree from the default structure
-            if self.bodyparttype == HAND:
-                locn_options = deepcopy(locn_options_hand)
-            elif self.bodyparttype == ARM:
-                locn_options = deepcopy(locn_options_arm)
-            elif self.bodyparttype == LEG:
-                locn_options = deepcopy(locn_options_leg)
-            else:
-                locn_options = LocnOptionsNode()
-            super().populate(parentnode, structure=LocnOptionsNode(children=[locn_options]), pathsofar="")
+            # no parameters; copy the tree built from the default structure
+            clonetemplaterows(bodyparttemplatetree(self.bodyparttype).invisibleRootItem(), parentnode)
         elif structure.children != []:
             # internal node with substructure
 
@@ -952,6 +1047,8 @@ class BodypartTreeModel(LocationTreeModel):
     # is updated to reflect the newer text for those outdated keys
     def backwardcompatibility(self):
         if self.serializedlocntree is not None:
+            if self.serializedlocntree.migrationversion >= MIGRATION_VERSION:
+                return
             dicts = [self.serializedlocntree.checkstates, self.serializedlocntree.addedinfos, self.serializedlocntree.detailstables]
         elif self.jsondict is not None:
             dicts = []
@@ -969,6 +1066,8 @@ class BodypartTreeModel(LocationTreeModel):
                 for stored_dict in dicts:
                     stored_dict["Whole hand" + treepathdelimiter + val] = stored_dict[val]
                     stored_dict.pop(val)
+        if self.serializedlocntree is not None:
+            self.serializedlocntree.migrationversion = MIGRATION_VERSION
 
 
 class LocationListModel(QStandardItemModel):
@@ -1125,6 +1224,12 @@ class LocationTableModel(QAbstractTableModel):
 
         return None
     
+    def copy(self):
+        tablecopy = LocationTableModel(ishandloc=None)
+        tablecopy.col_labels = list(self.col_labels)
+        tablecopy.col_contents = [[list(row) for row in col] for col in self.col_contents]
+        return tablecopy
+
     def get_checked_values(self):
         details_dict = {key: [] for key in self.col_labels}
         for i, detail in enumerate(self.col_labels):
@@ -1178,10 +1283,22 @@ class LocationListItem(QStandardItem):
 class LocationTreeItem(QStandardItem):
 
     def __init__(self, txt="", listit=None, mutuallyexclusive=False, ishandloc=nh,
-                 surfaces=None, subareas=None, addedinfo=None, serializedlocntreeitem=None):
-        super().__init__()
-
-        if serializedlocntreeitem:
+                 surfaces=None, subareas=None, addedinfo=None, serializedlocntreeitem=None, templateitem=None):
+        if templateitem is not None:
+            # copies the text, check state and data roles of the template item
+            super().__init__(templateitem)
+        else:
+            super().__init__()
+        self._detailstable = None
+        self._templatedetailstable = None
+
+        if templateitem is not None:
+            # see clone()
+            self._addedinfo = AddedInfo()
+            self._ishandloc = templateitem.ishandloc
+            self._templatedetailstable = templateitem.readonlydetailstable
+            self.listitem = None
+        elif serializedlocntreeitem:
             self.setEditable(serializedlocntreeitem['editable'])
             self.setText(serializedlocntreeitem['text'])
             self.setCheckable(serializedlocntreeitem['checkable'])
@@ -1229,6 +1346,26 @@ class LocationTreeItem(QStandardItem):
     def __repr__(self):
         return '<LocationTreeItem: ' + repr(self.text()) + '>'
 
+    # copy this item (but not its children) from a template tree; see clonetemplaterows()
+    # the copy shares the template's details table until something asks for the copy's own (modifiable) one
+    def clone(self):
+        return LocationTreeItem(templateitem=self)
+
+    @property
+    def detailstable(self):
+        if self._detailstable is None and self._templatedetailstable is not None:
+            self._detailstable = self._templatedetailstable.copy()
+        return self._detailstable
+
+    @detailstable.setter
+    def detailstable(self, detailstable):
+        self._detailstable = detailstable
+
+    # for read-only access (eg serializing), without copying a details table shared with the template tree
+    @property
+    def readonlydetailstable(self):
+        return self._detailstable if self._detailstable is not None else self._templatedetailstable
+
     def serialize(self):
         return {
             'editable': self.isEditable(),
@@ -1242,7 +1379,7 @@ class LocationTreeItem(QStandardItem):
             'ishandloc': self._ishandloc,
             'displayrole': self.data(Qt.DisplayRole),
             'addedinfo': self._addedinfo,
-            'detailstable': LocationTableSerializable(self.detailstable)
+            'detailstable': LocationTableSerializable(self.readonlydetailstable)
             # 'listitem': self.listitem.serialize()  TODO KV why not? the constructor uses it...
         }
 
@@ -19,9 +19,10 @@ from PyQt5.QtWidgets import (
     QMessageBox
 )
 
-from lexicon.module_classes import AddedInfo
-from models.shared_models import TreePathsProxyModel
-from constant import CONTRA, IPSI, userdefinedroles as udr, treepathdelimiter
+from lexicon.module_classes import AddedInfo, emptyaddedinfo, sharedifempty
+from models.shared_models import TreePathsProxyModel, clonetemplaterows
+from models.path_registry import pathregistry
+from constant import CONTRA, IPSI, MIGRATION_VERSION, userdefinedroles as udr, treepathdelimiter
 from constant import (specifytotalcycles_str, numberofreps_str, rb, cb, nc, ed_1, ed_2, ed_3, fx, subgroup, custom_abbrev)
 
 specifytotalcycles_str = "Specify total number of cycles"
@@ -842,12 +843,21 @@ defaultMvmtTree = MvmtOptionsNode(children=[
 
 class MovementTreeItem(QStandardItem):
 
-    def __init__(self, txt="", nodeID=-1, listit=None, mutuallyexclusive=False, nocontrol=False, addedinfo=None, serializedmvmtitem=None):
-        super().__init__()
+    def __init__(self, txt="", nodeID=-1, listit=None, mutuallyexclusive=False, nocontrol=False, addedinfo=None, serializedmvmtitem=None, templateitem=None):
+        if templateitem is not None:
+            # copies the text, check state and data roles of the template item
+            super().__init__(templateitem)
+        else:
+            super().__init__()
 
         self.setEditable(False)
 
-        if serializedmvmtitem:
+        if templateitem is not None:
+            # see clone()
+            self._addedinfo = AddedInfo()
+            self._nodeID = templateitem.nodeID
+            self.listitem = None
+        elif serializedmvmtitem:
             self.setText(serializedmvmtitem['text'])
             self.setCheckable(serializedmvmtitem['checkable'] and not serializedmvmtitem['nocontrolrole'])
             self.setCheckState(serializedmvmtitem['checkstate'])
@@ -887,6 +897,10 @@ class MovementTreeItem(QStandardItem):
     def __repr__(self):
         return '<MovementTreeItem: ' + repr(self.text()) + '>'
 
+    # copy this item (but not its children) from a template tree; see clonetemplaterows()
+    def clone(self):
+        return MovementTreeItem(templateitem=self)
+
     def setData(self, value, role=Qt.DisplayRole):
         super().setData(value, role)
 
@@ -1120,6 +1134,162 @@ class MovementListModel(QStandardItemModel):
         self.treemodel = treemod
 
 
+# ensure that any info stored in this MovementTreeSerializable under older keys (paths) is updated
+# to reflect the newer text for those outdated keys; returns the (possibly reconstructed) user-specified values
+# (trees already stamped with the current MIGRATION_VERSION are left as they are)
+def movementtreebackwardcompatibility(serializedmvmttree):
+    if getattr(serializedmvmttree, 'migrationversion', 0) >= MIGRATION_VERSION:
+        return serializedmvmttree.userspecifiedvalues
+
+    hadtoaddusv = False
+    userspecifiedvalues = {}
+    if hasattr(serializedmvmttree, 'userspecifiedvalues'):
+        userspecifiedvalues = serializedmvmttree.userspecifiedvalues
+    else:
+        hadtoaddusv = True
+
+    dicts = serializedmvmttree.checkstates, serializedmvmttree.addedinfos  # self.numvals, self.stringvals,
+
+    # 20230707: "trill" is now suboption of "repetition"; previously they were at the same level
+    old_trill_path = "Movement characteristics" + treepathdelimiter + "Trill"
+    stored_dict = serializedmvmttree.checkstates
+    if (old_trill_path in stored_dict):
+        # If old Trill / Trilled was selected, the new Trilled is selected and anything for single/repeated is gone.
+        if (stored_dict[old_trill_path + treepathdelimiter + "Trilled"] == Qt.Checked):
+            stored_dict["Movement characteristics" + treepathdelimiter + "Repetition"] = Qt.Unchecked
+            stored_dict["Movement characteristics" + treepathdelimiter + "Repetition" + treepathdelimiter + "Trilled"] = Qt.Checked
+            if old_trill_path+treepathdelimiter+ "Trilled" in serializedmvmttree.addedinfos:
+                serializedmvmttree.addedinfos["Movement characteristics" + treepathdelimiter + "Repetition" + treepathdelimiter + "Trilled"] = serializedmvmttree.addedinfos[old_trill_path + treepathdelimiter + "Trilled"]
+                serializedmvmttree.addedinfos.pop(old_trill_path + treepathdelimiter + "Trilled")
+            stored_dict.pop(old_trill_path + treepathdelimiter + "Trilled")
+        # If old Trill / Not trilled was selected, the new Trilled is not selected and anything for single/repeated stays.
+        elif (stored_dict[old_trill_path + treepathdelimiter + "Not trilled"] == Qt.Checked):
+            stored_dict["Movement characteristics" + treepathdelimiter + "Repetition" + treepathdelimiter + "Trilled"] = Qt.Unchecked
+            if old_trill_path+treepathdelimiter+ "Not trilled" in serializedmvmttree.addedinfos:
+                serializedmvmttree.addedinfos.pop(old_trill_path + treepathdelimiter + "Not trilled")
+            stored_dict.pop(old_trill_path + treepathdelimiter + "Not trilled")
+        stored_dict.pop(old_trill_path)
+
+
+    for stored_dict in dicts:
+        pairstoadd = {}
+        keystoremove = []
+        for k in stored_dict.keys():
+
+            # 1. "H1 and H2 move in different directions" (under either axis driectin or plane, in perceptual shape)
+            #   --> "H1 and H2 move in opposite directions"
+            # 2. Then later... "H1 and H2 move in opposite directions" (under axis direction only)
+            #   --> "H1 and H2 move toward each other" (along with an independent addition of "... away ...")
+            # 3. 20230523: Under "Movement type>Perceptual Shape>Shape" and "Movement type>Joint-specific movements"
+            #   ... "None of these" --> "Other" (user-specifiable)
+            if "H1 and H2 move in different directions" in k:
+                if "Axis direction" in k:
+                    pairstoadd[k.replace("in different directions", "toward each other")] = stored_dict[k]
+                    keystoremove.append(k)
+                elif "Place" in k:
+                    pairstoadd[k.replace("different", "opposite")] = stored_dict[k]
+                    keystoremove.append(k)                
+            elif "H1 and H2 move in opposite directions" in k and "Axis direction" in k:
+                pairstoadd[k.replace("in opposite directions", "toward each other")] = stored_dict[k]
+                keystoremove.append(k)
+            elif "None of these" in k and ("Perceptual shape" in k or "Joint-specific movements" in k):
+                pairstoadd[k.replace("None of these", "Other")] = stored_dict[k]
+                keystoremove.append(k)
+
+            if hadtoaddusv:
+
+                if k.endswith(specifytotalcycles_str) or k.endswith(numberofreps_str):
+                    pairstoadd[k.replace(numberofreps_str, specifytotalcycles_str)] = stored_dict[k]
+                    keystoremove.append(k)
+
+                elif "This number is a minimum" in k:
+                    pairstoadd[k.replace(treepathdelimiter + "#" + treepathdelimiter, treepathdelimiter)] = stored_dict[k]
+                    keystoremove.append(k)
+
+                elif (specifytotalcycles_str + treepathdelimiter in k or numberofreps_str + treepathdelimiter in k):
+                    # then we're looking at the item that stores info about the specified number of repetitions
+                    newkey = k.replace(numberofreps_str, specifytotalcycles_str)
+                    newkey = newkey[:newkey.index(specifytotalcycles_str + treepathdelimiter) + len(specifytotalcycles_str)]
+                    remainingtext = ""
+                    if specifytotalcycles_str in k:
+                        remainingtext = k[k.index(specifytotalcycles_str + treepathdelimiter) + len(specifytotalcycles_str + treepathdelimiter):]
+                    elif numberofreps_str in k:
+                        remainingtext = k[k.index(specifytotalcycles_str + treepathdelimiter) + len(numberofreps_str + treepathdelimiter):]
+
+                    if len(remainingtext) > 0 and treepathdelimiter not in remainingtext and remainingtext != "#":
+                        numcycles = remainingtext
+                        userspecifiedvalues[newkey] = numcycles
+
+        for oldkey in keystoremove:
+            stored_dict.pop(oldkey)
+
+        for newkey in pairstoadd.keys():
+            stored_dict[newkey] = pairstoadd[newkey]
+
+    serializedmvmttree.userspecifiedvalues = userspecifiedvalues
+    serializedmvmttree.migrationversion = MIGRATION_VERSION
+    return userspecifiedvalues
+
+
+# Paths of the default movement options tree, in the same (preorder) order in which MovementTreeModel.populate()
+# builds its tree items. Each path maps to a tuple of (position in tree, abbreviation).
+# Used to query serialized movement trees without having to build a MovementTreeModel.
+_movementoptionspaths = {}
+
+
+def movementoptionspaths():
+    if not _movementoptionspaths:
+        collectoptionspaths(defaultMvmtTree, "", _movementoptionspaths)
+    return _movementoptionspaths
+
+
+def collectoptionspaths(structure, pathsofar, pathsdict):
+    for child in structure.children:
+        if child.display_name == subgroup:
+            # subgroups don't contribute a level to the path
+            collectoptionspaths(child, pathsofar, pathsdict)
+        else:
+            pathtext = pathsofar + child.display_name
+            pathsdict[pathregistry.intern(pathtext)] = (len(pathsdict), child.tooltip)
+            collectoptionspaths(child, pathtext + treepathdelimiter, pathsdict)
+
+
+# Prepare a MovementTreeSerializable (eg from a saved corpus) to be held by a movement module in place of
+# a MovementTreeModel: update outdated paths, discard entries for unselected paths that carry no information,
+# and share the path registry's copy of each remaining path.
+def compactmovementtree(serializedmvmttree):
+    serializedmvmttree.userspecifiedvalues = movementtreebackwardcompatibility(serializedmvmttree)
+    serializedmvmttree.checkstates = {pathregistry.intern(pathtext): checkstate for pathtext, checkstate in serializedmvmttree.checkstates.items()
+                                      if checkstate != Qt.Unchecked}
+    serializedmvmttree.addedinfos = {pathregistry.intern(pathtext): sharedifempty(addedinfo) for pathtext, addedinfo in serializedmvmttree.addedinfos.items()
+                                     if pathtext in serializedmvmttree.checkstates or addedinfo != emptyaddedinfo}
+    serializedmvmttree.userspecifiedvalues = {pathregistry.intern(pathtext): usv for pathtext, usv in serializedmvmttree.userspecifiedvalues.items()
+                                              if pathtext in serializedmvmttree.checkstates or usv}
+    return serializedmvmttree
+
+
+# The full form of a compacted MovementTreeSerializable (see compactmovementtree()): an entry for every path in the
+# options tree, just as a MovementTreeModel is serialized, eg for a "max" export.
+def expandmovementtree(serializedmvmttree):
+    # imported here rather than at the top of the file, because serialization_classes imports this module
+    from serialization_classes import MovementTreeSerializable
+    return MovementTreeSerializable(MovementTreeModel(MovementTreeSerializable(serializedmvmttree)))
+
+
+# Template tree models, built once per options structure by walking that structure. populate() then fills
+# each new tree model by copying a template, which is much faster than building every tree item from scratch.
+# Templates must never be modified.
+_movementtemplatetrees = {}  # keyed by id(optionstree); each template keeps its options tree alive
+
+
+def movementtemplatetree(optionstree):
+    if id(optionstree) not in _movementtemplatetrees:
+        templatetree = MovementTreeModel(optionstree=optionstree)
+        templatetree.populate(templatetree.invisibleRootItem(), structure=optionstree, pathsofar="")
+        _movementtemplatetrees[id(optionstree)] = templatetree
+    return _movementtemplatetrees[id(optionstree)]
+
+
 class MovementTreeModel(QStandardItemModel):
 
     def __init__(self, serializedmvmttree=None, optionstree=defaultMvmtTree, **kwargs):
@@ -1182,92 +1352,7 @@ class MovementTreeModel(QStandardItemModel):
             return {}
 
     def backwardcompatibility(self):
-        hadtoaddusv = False
-        userspecifiedvalues = {}
-        if hasattr(self.serializedmvmttree, 'userspecifiedvalues'):
-            userspecifiedvalues = self.serializedmvmttree.userspecifiedvalues
-        else:
-            hadtoaddusv = True
-
-        dicts = self.serializedmvmttree.checkstates, self.serializedmvmttree.addedinfos  # self.numvals, self.stringvals,
-
-        # 20230707: "trill" is now suboption of "repetition"; previously they were at the same level
-        old_trill_path = "Movement characteristics" + treepathdelimiter + "Trill"
-        stored_dict = self.serializedmvmttree.checkstates
-        if (old_trill_path in stored_dict):
-            # If old Trill / Trilled was selected, the new Trilled is selected and anything for single/repeated is gone.
-            if (stored_dict[old_trill_path + treepathdelimiter + "Trilled"] == Qt.Checked):
-                stored_dict["Movement characteristics" + treepathdelimiter + "Repetition"] = Qt.Unchecked
-                stored_dict["Movement characteristics" + treepathdelimiter + "Repetition" + treepathdelimiter + "Trilled"] = Qt.Checked
-                if old_trill_path+treepathdelimiter+ "Trilled" in self.serializedmvmttree.addedinfos:
-                    self.serializedmvmttree.addedinfos["Movement characteristics" + treepathdelimiter + "Repetition" + treepathdelimiter + "Trilled"] = self.serializedmvmttree.addedinfos[old_trill_path + treepathdelimiter + "Trilled"]
-                    self.serializedmvmttree.addedinfos.pop(old_trill_path + treepathdelimiter + "Trilled")
-                stored_dict.pop(old_trill_path + treepathdelimiter + "Trilled")
-            # If old Trill / Not trilled was selected, the new Trilled is not selected and anything for single/repeated stays.
-            elif (stored_dict[old_trill_path + treepathdelimiter + "Not trilled"] == Qt.Checked):
-                stored_dict["Movement characteristics" + treepathdelimiter + "Repetition" + treepathdelimiter + "Trilled"] = Qt.Unchecked
-                if old_trill_path+treepathdelimiter+ "Not trilled" in self.serializedmvmttree.addedinfos:
-                    self.serializedmvmttree.addedinfos.pop(old_trill_path + treepathdelimiter + "Not trilled")
-                stored_dict.pop(old_trill_path + treepathdelimiter + "Not trilled")
-            stored_dict.pop(old_trill_path)
-
-
-        for stored_dict in dicts:
-            pairstoadd = {}
-            keystoremove = []
-            for k in stored_dict.keys():
-
-                # 1. "H1 and H2 move in different directions" (under either axis driectin or plane, in perceptual shape)
-                #   --> "H1 and H2 move in opposite directions"
-                # 2. Then later... "H1 and H2 move in opposite directions" (under axis direction only)
-                #   --> "H1 and H2 move toward each other" (along with an independent addition of "... away ...")
-                # 3. 20230523: Under "Movement type>Perceptual Shape>Shape" and "Movement type>Joint-specific movements"
-                #   ... "None of these" --> "Other" (user-specifiable)
-                if "H1 and H2 move in different directions" in k:
-                    if "Axis direction" in k:
-                        pairstoadd[k.replace("in different directions", "toward each other")] = stored_dict[k]
-                        keystoremove.append(k)
-                    elif "Place" in k:
-                        pairstoadd[k.replace("different", "opposite")] = stored_dict[k]
-                        keystoremove.append(k)                
-                elif "H1 and H2 move in opposite directions" in k and "Axis direction" in k:
-                    pairstoadd[k.replace("in opposite directions", "toward each other")] = stored_dict[k]
-                    keystoremove.append(k)
-                elif "None of these" in k and ("Perceptual shape" in k or "Joint-specific movements" in k):
-                    pairstoadd[k.replace("None of these", "Other")] = stored_dict[k]
-                    keystoremove.append(k)
-
-                if hadtoaddusv:
-
-                    if k.endswith(specifytotalcycles_str) or k.endswith(numberofreps_str):
-                        pairstoadd[k.replace(numberofreps_str, specifytotalcycles_str)] = stored_dict[k]
-                        keystoremove.append(k)
-
-                    elif "This number is a minimum" in k:
-                        pairstoadd[k.replace(treepathdelimiter + "#" + treepathdelimiter, treepathdelimiter)] = stored_dict[k]
-                        keystoremove.append(k)
-
-                    elif (specifytotalcycles_str + treepathdelimiter in k or numberofreps_str + treepathdelimiter in k):
-                        # then we're looking at the item that stores info about the specified number of repetitions
-                        newkey = k.replace(numberofreps_str, specifytotalcycles_str)
-                        newkey = newkey[:newkey.index(specifytotalcycles_str + treepathdelimiter) + len(specifytotalcycles_str)]
-                        remainingtext = ""
-                        if specifytotalcycles_str in k:
-                            remainingtext = k[k.index(specifytotalcycles_str + treepathdelimiter) + len(specifytotalcycles_str + treepathdelimiter):]
-                        elif numberofreps_str in k:
-                            remainingtext = k[k.index(specifytotalcycles_str + treepathdelimiter) + len(numberofreps_str + treepathdelimiter):]
-
-                        if len(remainingtext) > 0 and treepathdelimiter not in remainingtext and remainingtext != "#":
-                            numcycles = remainingtext
-                            userspecifiedvalues[newkey] = numcycles
-
-            for oldkey in keystoremove:
-                stored_dict.pop(oldkey)
-
-            for newkey in pairstoadd.keys():
-                stored_dict[newkey] = pairstoadd[newkey]
-
-        return userspecifiedvalues
+        return movementtreebackwardcompatibility(self.serializedmvmttree)
 
     def uncheck_paths_from_serialized_tree(self, paths_to_uncheck):
         for path in paths_to_uncheck:
@@ -1477,9 +1562,9 @@ class MovementTreeModel(QStandardItemModel):
             # base case (leaf node); don't build any more nodes
             pass
         elif structure.children == [] and pathsofar == "":
-            # no parameters; build a tree from the default structure
+            # no parameters; copy the tree built from the default structure
             # TODO define a default structure somewhere (see constant.py)
-            self.populate(parentnode, structure=self.optionstree, pathsofar="")
+            clonetemplaterows(movementtemplatetree(self.optionstree).invisibleRootItem(), parentnode)
         elif structure.children != []:
             # internal node with substructure
 
@@ -0,0 +1,50 @@
+import sys
+import threading
+
+
+# Maps each tree path (eg "Head>Face>Cheek/nose") to a small integer ID, and keeps a single interned copy of each
+#   path string. Serialized trees key their dicts by these interned strings, so that the thousands of modules in a
+#   corpus share one copy of each path and dict lookups and equality tests mostly reduce to identity checks; search
+#   compares sets of path IDs rather than sets of strings.
+# IDs are assigned in the order paths are first seen, so they are only meaningful within one run of the program (and
+#   one process): they are never saved, and saved corpora still store the path strings themselves.
+class PathRegistry:
+
+    def __init__(self):
+        self._ids = {}
+        self._paths = []
+        # paths may be registered from worker threads (eg while loading a corpus in the background)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._paths)
+
+    # the ID of pathtext, registering it if it hasn't been seen before
+    def pathid(self, pathtext):
+        pathid = self._ids.get(pathtext)
+        if pathid is None:
+            with self._lock:
+                pathid = self._ids.get(pathtext)
+                if pathid is None:
+                    pathid = len(self._paths)
+                    pathtext = sys.intern(pathtext)
+                    self._paths.append(pathtext)
+                    self._ids[pathtext] = pathid
+        return pathid
+
+    # the registry's (interned) copy of pathtext
+    def intern(self, pathtext):
+        return self._paths[self.pathid(pathtext)]
+
+    def path(self, pathid):
+        return self._paths[pathid]
+
+    def pathids(self, pathtexts):
+        return frozenset(self.pathid(pathtext) for pathtext in pathtexts)
+
+    # a copy of pathsdict (keyed by path text) whose keys are the registry's copies of the paths
+    def internkeys(self, pathsdict):
+        return {self.intern(pathtext): value for pathtext, value in pathsdict.items()}
+
+
+pathregistry = PathRegistry()
@@ -39,3 +39,13 @@ class TreePathsProxyModel(QSortFilterProxyModel):
         elif "select" in sortbytext:
             self.setSortRole(Qt.UserRole+udr.timestamprole)
             self.sort(0)
+
+
+# used by both Location and Movement to populate a tree model by copying the rows of a template tree
+# (see LocationTreeItem.clone() and MovementTreeItem.clone()), rather than building each item from scratch
+def clonetemplaterows(templatenode, parentnode):
+    for r in range(templatenode.rowCount()):
+        rowcopy = [templatenode.child(r, c).clone() for c in range(templatenode.columnCount())
+                   if templatenode.child(r, c) is not None]
+        clonetemplaterows(templatenode.child(r, 0), rowcopy[0])
+        parentnode.appendRow(rowcopy)
@@ -0,0 +1,664 @@
+from lexicon.module_classes import ModuleTypes, HandConfigurationHand
+from lexicon.predefined_handshape import HandshapeEmpty
+from models.path_registry import pathregistry
+from search.helper_functions import signtype_matches_target, signlevelinfo_matches_target
+from constant import TargetTypes
+
+# Search targets compiled into predicates. Everything a search needs to know about a target (its checked paths and
+# details, hand configuration tuple, finger selections, etc) is worked out once, when the target is compiled at the
+# start of a search, rather than again for every sign the target is compared with. Compiled targets don't refer to any
+# Qt models, and aren't changed after they're built.
+#
+# Every compiled target has matches(signdata), which says whether the sign that signdata (a SignData) is for matches
+# the target (taking negation into account). Targets for modules also have filter(modulelist, signdata), which returns
+# the subset of modulelist (some of the sign's modules) that match, and countstages(stagecounts), which has them count
+# the modules each stage of their filter rules out when a search is being profiled (see search/search_profile.py).
+
+
+# slots in a hand configuration tuple that are the same for every hand configuration, so never need to be compared
+fixedhandconfigslots = [6, 7, 14, 19, 24, 29]
+
+
+class SignData:
+    """ A sign, and the things about it that compiled targets compare: its modules, hand configuration tuples, checked
+        paths, etc. Each is only worked out from the sign the first time a target needs it, so comparing one SignData
+        with several targets (eg all the targets of a "match any" search; see matchingsignsforeach()) doesn't work
+        anything out more than once. A SignData is only for the comparisons being made now; it mustn't be kept once
+        the sign might have changed.
+    """
+    __slots__ = ('sign', '_modules', '_derived')
+
+    def __init__(self, sign):
+        self.sign = sign
+        # module type -> list of the sign's modules of that type
+        self._modules = {}
+        # (what, id(module) or None) -> what was worked out
+        self._derived = {}
+
+    def modules(self, moduletype):
+        modules = self._modules.get(moduletype)
+        if modules is None:
+            modules = self._modules[moduletype] = list(self.sign.getmoduledict(moduletype).values())
+        return modules
+
+    def _derive(self, key, derive):
+        if key not in self._derived:
+            self._derived[key] = derive()
+        return self._derived[key]
+
+    def signtypespecs(self):
+        return self._derive(('signtype', None),
+                            lambda: self.sign.signtype.convertspecstodict() if self.sign.signtype else {})
+
+    def configtuple(self, module):
+        return self._derive(('config tuple', id(module)), module.config_tuple)
+
+    def handconfigurationhand(self, module):
+        return self._derive(('hand', id(module)), lambda: HandConfigurationHand(module.handconfiguration))
+
+    def movementpathids(self, module):
+        return self._derive(('movement paths', id(module)),
+                            lambda: pathregistry.pathids(module.movementtree.get_checked_items()))
+
+    # {path: details tuple} for a location module's checked paths; see modulepathdetails()
+    def locationpathdetails(self, module, only_fully_checked):
+        return self._derive(('location paths', only_fully_checked, id(module)), lambda: modulepathdetails(
+            module.locationtree.get_checked_items(only_fully_checked=only_fully_checked, include_details=True)))
+
+    # {path: details tuple} for the checked paths in a relation module's body part tree for articulator (eg 'H1')
+    def bodypartpathdetails(self, module, articulator):
+        return self._derive(('body part paths', articulator, id(module)), lambda: modulepathdetails(
+            module.get_treemodel_from_articulator_label(articulator).get_checked_items(only_fully_checked=False, include_details=True)))
+
+
+class CompiledXslotTarget:
+    __slots__ = ('min_xslots', 'max_xslots', 'negative')
+
+    def __init__(self, target_module, negative=False):
+        self.min_xslots = target_module.min_xslots
+        self.max_xslots = target_module.max_xslots
+        self.negative = negative
+
+    # there's no difference between minimal and exact matchtypes for this target type
+    def matches(self, signdata):
+        numxslots = int(signdata.sign.xslotstructure.number)
+        return self.negative ^ (self.min_xslots <= numxslots <= self.max_xslots)
+
+
+class CompiledSignLevelInfoTarget:
+    __slots__ = ('target_sli', 'matchtype', 'negative')
+
+    def __init__(self, target_module, matchtype='minimal', negative=False):
+        self.target_sli = target_module
+        self.matchtype = matchtype
+        self.negative = negative
+
+    # TODO: handle Notes (AdditionalInfo)
+    def matches(self, signdata):
+        return self.negative ^ signlevelinfo_matches_target(signdata.sign.signlevel_information, self.target_sli, self.matchtype)
+
+
+class CompiledSignTypeTarget:
+    __slots__ = ('target_specs_dict', 'matchtype', 'negative')
+
+    def __init__(self, target_module, matchtype='minimal', negative=False):
+        self.target_specs_dict = target_module.convertspecstodict()
+        self.matchtype = matchtype
+        self.negative = negative
+
+    # TODO: handle Notes (AdditionalInfo)
+    def matches(self, signdata):
+        return self.negative ^ signtype_matches_target(signdata.signtypespecs(), self.target_specs_dict, self.matchtype)
+
+
+class CompiledModuleTarget:
+    """ Base class for compiled module targets. """
+    __slots__ = ('matchtype', 'negative', 'stagecounts')
+
+    # the type of module the target is compared with
+    moduletype = None
+
+    def __init__(self, matchtype='minimal', negative=False):
+        self.matchtype = matchtype
+        self.negative = negative
+        # stage name -> number of modules it's ruled out, if the target is being profiled (see countstages())
+        self.stagecounts = None
+
+    # count the modules that each stage of filter() rules out in stagecounts (a Counter) from now on
+    def countstages(self, stagecounts):
+        self.stagecounts = stagecounts
+
+    # returns after (what's left of the modules in before once the stage with the given name has filtered them), and
+    #   counts the modules the stage ruled out if the target is being profiled
+    def stage(self, name, before, after, terminate_early=False):
+        if self.stagecounts is not None:
+            if terminate_early and after:
+                # (the modules after the first one that got through weren't compared)
+                self.stagecounts[name] += next(i for i, m in enumerate(before) if m is after[0])
+            else:
+                self.stagecounts[name] += len(before) - len(after)
+        return after
+
+    def filter(self, modulelist, signdata, terminate_early=False):
+        raise NotImplementedError
+
+    def anymodulematches(self, signdata):
+        return bool(self.filter(signdata.modules(self.moduletype), signdata, terminate_early=True))
+
+    def matches(self, signdata):
+        return self.negative ^ self.anymodulematches(signdata)
+
+
+class CompiledParameterTarget(CompiledModuleTarget):
+    """ Base class for compiled targets whose modules are filtered by articulators and phonlocs before anything else.
+
+        Articulators: if matchtype is 'minimal':
+            A target with no articulators specified matches all modules.
+            A target with articulators specified matches modules where articulators match exactly.
+            A target with articulators specified and no inphase specified matches modules where articulators match exactly.
+            A target with inphase specifications matches modules where the target inphase specs are a subset of the module inphase specs. (e.g. if target is 'connected', modules that are both 'connected' and 'in phase' will also be matched).
+        Phonlocs: if matchtype is 'minimal':
+            A target with no phonlocs specified matches all modules.
+            A target with phonlocs specifications matches modules where the target specs are a subset of the module specs.
+    """
+    __slots__ = ('anyarticulators', 'articulators', 'inphase', 'anyphonlocs', 'phonlocs', 'phonlocattrs')
+
+    def __init__(self, target_module, matchtype='minimal', negative=False):
+        super().__init__(matchtype, negative)
+        # module.articulators is (Articulator: str, {1: bool, 2: bool})
+        # module.inphase:
+        # 0: not specifiable; 1: in phase; 2: out of phase; 3: connected; 4: connected & in phase; 5: connected & out of phase (impossible)
+        # (see getphase() in modulespecification_dialog)
+        self.anyarticulators = not target_module.has_articulators() and matchtype == 'minimal'
+        self.articulators = target_module.articulators
+        self.inphase = target_module.inphase if hasattr(target_module, "inphase") else 0
+        self.anyphonlocs = target_module.phonlocs.allfalse() and matchtype == 'minimal'
+        self.phonlocs = target_module.phonlocs
+        # just the attribute names that are true in the target. For minimal matching, we don't care about unchecked attributes.
+        self.phonlocattrs = tuple(attr for attr, val in target_module.phonlocs.attributes().items() if val)
+
+    def inphase_matches(self, m_inphase):
+        if self.matchtype == 'exact':
+            return m_inphase == self.inphase
+        return (m_inphase == self.inphase
+                or self.inphase == 1 and m_inphase == 4
+                or self.inphase == 2 and m_inphase == 5
+                or self.inphase == 3 and m_inphase in [4, 5])
+
+    def filter_by_articulators(self, modulelist):
+        if self.anyarticulators:
+            return modulelist
+        return [m for m in modulelist
+                if m.articulators == self.articulators and self.inphase_matches(m.inphase if hasattr(m, "inphase") else 0)]
+
+    def filter_by_phonlocs(self, modulelist):
+        if self.anyphonlocs:
+            return modulelist
+        if self.matchtype == 'exact':
+            return [m for m in modulelist if m.phonlocs == self.phonlocs]
+        return [m for m in modulelist if all(m.phonlocs[attr] for attr in self.phonlocattrs)]
+
+    # the modules in modulelist whose articulators and phonlocs (and anything else that's specified in the same way
+    # for several module types) match
+    def prefilter(self, modulelist):
+        modulelist = self.stage('articulators', modulelist, self.filter_by_articulators(modulelist))
+        return self.stage('phonlocs', modulelist, self.filter_by_phonlocs(modulelist))
+
+
+class CompiledMovementTarget(CompiledParameterTarget):
+    __slots__ = ('pathids',)
+
+    moduletype = ModuleTypes.MOVEMENT
+
+    def __init__(self, target_module, matchtype='minimal', negative=False):
+        super().__init__(target_module, matchtype, negative)
+        # compared as sets of path IDs, which are cheaper to build and compare than sets of path strings
+        self.pathids = pathregistry.pathids(target_module.movementtree.get_checked_items())
+
+    # TODO negative movement targets are compared the same way as positive ones
+    def matches(self, signdata):
+        return self.anymodulematches(signdata)
+
+    def filter(self, modulelist, signdata, terminate_early=False):
+        """
+        Filter a list of movement modules, returning a subset that matches the target movement module.
+        Args:
+            modulelist: list of movement modules (list is not modified)
+            signdata: SignData for the sign the modules are from
+            terminate_early: bool. True if we only need to know whether `modulelist` has at least one matching module.
+        Returns:
+            list. Returns the subset of `modulelist` that match the target.
+        """
+        matching_modules = self.prefilter(modulelist)
+        # Filter for modules that match target paths
+        if matching_modules and self.pathids:
+            # TODO matching_modules = m for m in ... if module_matches_xslottype(module.timingintervals, target_module.timingintervals, xslottype, sign.xslotstructure, self.matchtype):
+            # TODO minimal vs exact, and terminate_early
+            matching_modules = self.stage('paths', matching_modules,
+                                          [m for m in matching_modules if self.pathids <= signdata.movementpathids(m)])
+        return matching_modules
+
+
+class CompiledLocationTarget(CompiledParameterTarget):
+    """ If matchtype is 'minimal':
+            A target with no loctype specified matches modules with any loctype.
+            A target with only 'signing space' specified also matches modules with 'body-anchored' or 'purely spatial'.
+    """
+    __slots__ = ('anyloctype', 'locationtype', 'loctypeattrs', 'nodes_are_terminal', 'paths')
+
+    moduletype = ModuleTypes.LOCATION
+
+    def __init__(self, target_module, matchtype='minimal', negative=False):
+        super().__init__(target_module, matchtype, negative)
+        locationtype = target_module.locationtree.locationtype
+        self.anyloctype = locationtype.allfalse() and matchtype == 'minimal'
+        self.locationtype = locationtype
+        self.loctypeattrs = tuple(attr for attr, val in locationtype.attributes().items() if val)
+        self.nodes_are_terminal = target_module.locationtree.nodes_are_terminal
+        self.paths = compiletargetpaths(target_module.locationtree.get_checked_items(only_fully_checked=True, include_details=True))
+
+    def filter_by_loctype(self, modulelist):
+        if self.anyloctype:
+            return modulelist
+        if self.matchtype == 'exact':
+            return [m for m in modulelist if m.locationtree.locationtype == self.locationtype]
+        return [m for m in modulelist if all(getattr(m.locationtree.locationtype, attr) for attr in self.loctypeattrs)]
+
+    def prefilter(self, modulelist):
+        modulelist = super().prefilter(modulelist)
+        return self.stage('loctype', modulelist, self.filter_by_loctype(modulelist))
+
+    # TODO negative location targets are compared the same way as positive ones
+    def matches(self, signdata):
+        return self.anymodulematches(signdata)
+
+    def filter(self, modulelist, signdata, terminate_early=False):
+        """
+        Filter a list of location modules, returning a subset that matches the target location module.
+        Args:
+            modulelist: list of location modules (list is not modified)
+            signdata: SignData for the sign the modules are from
+            terminate_early: bool. True if we only need to know whether `modulelist` has at least one matching module.
+        Returns:
+            list. Returns the subset of `modulelist` that match the target. If `terminate_early` is True and target paths are specified, the list contains only the first module in `modulelist` that matches the target. If matchtype is `exact`, matching modules cannot contain any details or selections not specified in the target.
+        """
+        matching_modules = self.prefilter(modulelist)
+        if matching_modules and self.paths:
+            matching_modules = self.stage('paths', matching_modules, filter_modules_by_paths(
+                matching_modules, self.paths,
+                lambda m: signdata.locationpathdetails(m, self.nodes_are_terminal),
+                self.matchtype, terminate_early), terminate_early)
+        return matching_modules
+
+
+class CompiledRelationTarget(CompiledModuleTarget):
+    __slots__ = ('relationx', 'relationy', 'contact', 'anycontacttype', 'contacttype', 'anymanner', 'manner',
+                 'anydirection', 'xy_linked', 'xy_crossed', 'directions', 'anydistance', 'distanceindices', 'paths')
+
+    moduletype = ModuleTypes.RELATION
+
+    def __init__(self, target_module, matchtype='minimal', negative=False):
+        super().__init__(matchtype, negative)
+        self.relationx = target_module.relationx.displaystr()
+        self.relationy = target_module.relationy.displaystr()
+
+        contactrel = target_module.contactrel
+        # None if unspecified; False if "no contact" is specified
+        self.contact = contactrel.contact
+        self.anycontacttype = bool(contactrel.contact) and contactrel.contacttype.any
+        # None if contact type doesn't need to match exactly
+        self.contacttype = contactrel.contacttype if contactrel.contact and contactrel.has_contacttype() else None
+        self.anymanner = bool(contactrel.contact) and contactrel.manner.any
+        # None if manner doesn't need to match exactly
+        self.manner = contactrel.manner if contactrel.contact and contactrel.has_manner() else None
+
+        self.anydirection = len(target_module.directions) == 1 and target_module.directions[0].any
+        self.xy_linked = target_module.xy_linked
+        self.xy_crossed = target_module.xy_crossed
+        # (axis number, the direction if it has to match exactly or else None) for each axis selected in the target
+        self.directions = tuple((i, direction if target_module.has_direction(i) else None)
+                                for i, direction in enumerate(target_module.directions) if direction.axisselected)
+
+        # distance only counts if the target doesn't specify contact
+        self.anydistance = not contactrel.contact and len(contactrel.distances) == 1 and contactrel.distances[0].any
+        self.distanceindices = () if contactrel.contact \
+            else tuple(i for i, distance in enumerate(contactrel.distances) if distance.has_selection())
+
+        # articulator label ('H1', 'H2', 'Arm1', 'Arm2', 'Leg1', 'Leg2') -> target paths for that articulator
+        self.paths = {articulator: compiletargetpaths(targetpaths)
+                      for articulator, targetpaths in target_module.get_paths().items()}
+
+    # TODO negative relation targets are compared the same way as positive ones
+    def matches(self, signdata):
+        return self.anymodulematches(signdata)
+
+    def filter(self, modulelist, signdata, terminate_early=False):
+        """
+        Filter a list of relation modules, returning a subset that matches the target relation module.
+        Args:
+            modulelist: list of relation modules (list is not modified).
+            signdata: SignData for the sign the modules are from
+            terminate_early: bool. True if we only need to know whether `modulelist` has at least one matching module.
+        Returns:
+            list. Returns the subset of `modulelist` that match the target. If matchtype is `exact`, matching modules cannot contain any details or selections not specified in the target.
+        """
+        before = modulelist
+        # All relation_x possibilities are mutually exclusive, so check if target relation_x matches at least one relation_x in the list
+        if self.relationx != "":
+            modulelist = [m for m in modulelist if self.relationx == m.relationx.displaystr()]
+        # If target relation_y is "Existing module", this can also match "existing module - locn" or "existing module - mvmt".
+        # Otherwise, relation_y possibilities are mutually exclusive.
+        if modulelist and self.relationy != "":
+            if self.relationy == "Y: existing module":
+                modulelist = [m for m in modulelist if self.relationy in m.relationy.displaystr()]
+            else:
+                modulelist = [m for m in modulelist if self.relationy == m.relationy.displaystr()]
+        modulelist = before = self.stage('relation x/y', before, modulelist)
+        if not modulelist: return []
+
+        # If target contact is only "Contact", this needs to match contact type suboptions (light, firm, other)
+        # If target contact is "No contact", must match signs where contact is not specified or empty (?)
+        # Manner options are mutually exclusive.
+        if self.contact is False:
+            modulelist = [m for m in modulelist if m.contactrel.contact == False]
+        elif self.contact is not None:
+            if self.anycontacttype:
+                modulelist = [m for m in modulelist if m.contactrel.has_contacttype()]
+            elif self.contacttype is not None: # module must match contacttype exactly
+                modulelist = [m for m in modulelist if m.contactrel.contacttype == self.contacttype]
+            if not modulelist: return self.stage('contact', before, [])
+
+            if self.anymanner:
+                modulelist = [m for m in modulelist if m.contactrel.has_manner()]
+            elif self.manner is not None: # module must match manner (and have some contact / contacttype)
+                modulelist = [m for m in modulelist if m.contactrel.manner == self.manner]
+            else: # only "contact" specified, so module must have some contact / contacttype
+                modulelist = [m for m in modulelist if m.contactrel.contact]
+        modulelist = before = self.stage('contact', before, modulelist)
+        if not modulelist: return []
+
+        # direction:
+        if self.anydirection:
+            modulelist = [m for m in modulelist if m.has_any_direction()]
+        else:
+            if self.xy_linked:
+                modulelist = [m for m in modulelist if m.xy_linked]
+            if self.xy_crossed:
+                modulelist = [m for m in modulelist if m.xy_crossed]
+            for i, direction in self.directions:
+                if direction is not None: # match exactly because suboption is selected
+                    modulelist = [m for m in modulelist if m.directions[i] == direction]
+                else: # only axis is selected, so match if any suboption is selected
+                    modulelist = [m for m in modulelist if m.has_direction(i)]
+        modulelist = before = self.stage('direction', before, modulelist)
+        if not modulelist: return []
+
+        # distance:
+        if self.anydistance:
+            modulelist = [m for m in modulelist if m.has_any_distance()]
+        else:
+            for i in self.distanceindices:
+                modulelist = [m for m in modulelist if m.contactrel.distances[i].has_selection()]
+        modulelist = before = self.stage('distance', before, modulelist)
+        if not modulelist: return []
+
+        # paths: the target's paths for each articulator are only checked if the modules being filtered use that
+        # articulator (and, when matching minimally, a target with no paths for it matches any paths)
+        articulators_in_use = set(articulator for m in modulelist for articulator in m.get_articulators_in_use(as_string=True))
+        for articulator, targetpaths in self.paths.items():
+            if articulator in articulators_in_use and (targetpaths or self.matchtype == 'exact'):
+                modulelist = filter_modules_by_paths(
+                    modulelist, targetpaths,
+                    lambda m: signdata.bodypartpathdetails(m, articulator),
+                    self.matchtype)
+                if not modulelist: break
+        return self.stage('paths', before, modulelist)
+
+
+class CompiledOrientationTarget(CompiledParameterTarget):
+    __slots__ = ('palm', 'root', 'directions')
+
+    moduletype = ModuleTypes.ORIENTATION
+    NUM_DIRECTIONS = 3
+
+    def __init__(self, target_module, matchtype='minimal', negative=False):
+        super().__init__(target_module, matchtype, negative)
+        self.palm = tuple(target_module.palm)
+        self.root = tuple(target_module.root)
+        # for minimal matching: (attribute name, axis number, the direction if it has to match exactly or else None) for
+        # each direction selected in the target; an unselected direction can have any selection
+        directions = []
+        for attr_name in ['root', 'palm']:
+            target_dir = getattr(target_module, attr_name)
+            for i in range(self.NUM_DIRECTIONS):
+                if target_dir[i].has_subselection():
+                    # target includes an axis and a subselection, which need to be matched exactly (even with minimal matchtype)
+                    directions.append((attr_name, i, target_dir[i]))
+                elif target_dir[i].axisselected:
+                    # target has axis but no subselection. When matching minimally, signs can match with or without subselections.
+                    directions.append((attr_name, i, None))
+        self.directions = tuple(directions)
+
+    def filter(self, modulelist, signdata, terminate_early=False):
+        matching_modules = self.prefilter(modulelist)
+        if not matching_modules:
+            return []
+        before = matching_modules
+        if self.matchtype != 'minimal': # exact matchtype
+            matching_modules = [m for m in matching_modules
+                                if all(m.palm[i] == self.palm[i] and m.root[i] == self.root[i] for i in range(self.NUM_DIRECTIONS))]
+        else:
+            for attr_name, i, direction in self.directions:
+                if direction is not None:
+                    matching_modules = [m for m in matching_modules if getattr(m, attr_name)[i] == direction]
+                else:
+                    matching_modules = [m for m in matching_modules if getattr(m, attr_name)[i].axisselected]
+                if not matching_modules:
+                    break
+        return self.stage('directions', before, matching_modules)
+
+
+class CompiledHandConfigTarget(CompiledParameterTarget):
+    """ If matchtype is 'minimal':
+            A target with 'forearm' unchecked matches modules with any value of 'forearm'.
+            A target with an empty handshape matches all hand configs.
+            A target with a custom hand config tuple specified matches modules where the target specs are a subset of the module specs.
+            Otherwise, match exactly.
+    """
+    __slots__ = ('forearm', 'anyhandshape', 'hand', 'configtuple', 'positions')
+
+    moduletype = ModuleTypes.HANDCONFIG
+
+    def __init__(self, target_module, matchtype='minimal', negative=False):
+        super().__init__(target_module, matchtype, negative)
+        self.forearm = target_module.overalloptions['forearm']
+        target_tuple = target_module.config_tuple()
+        self.anyhandshape = matchtype == 'minimal' and target_tuple == HandshapeEmpty.canonical
+        self.hand = HandConfigurationHand(target_module.handconfiguration)
+        self.configtuple = target_tuple
+        # (position, symbol) for each slot that's specified in the target
+        self.positions = tuple((i, target_tuple[i]) for i in range(33)
+                               if i not in fixedhandconfigslots and target_tuple[i] != "")
+
+    def filter(self, modulelist, signdata, terminate_early=False):
+        modulelist = self.prefilter(modulelist)
+        modulelist = self.stage('forearm', modulelist, [
+            m for m in modulelist
+            if m.overalloptions['forearm'] == self.forearm or (self.matchtype == 'minimal' and not self.forearm)])
+        if not modulelist or self.anyhandshape:
+            return modulelist
+        matching_modules = []
+        for m in modulelist:
+            sign_tuple = signdata.configtuple(m)
+            # (hands with different symbols can't be equal, so the whole hands, which include each slot's added info,
+            #   are only compared if the symbols are all the same)
+            if sign_tuple == self.configtuple and signdata.handconfigurationhand(m) == self.hand:
+                matching_modules.append(m)
+            elif self.matchtype == 'minimal':
+                # Searching for a custom tuple (not a predefined shape)
+                if all(sign_tuple[i] == symbol for i, symbol in self.positions):
+                    matching_modules.append(m)
+        return self.stage('handshape', modulelist, matching_modules)
+
+
+class CompiledExtendedFingersTarget(CompiledParameterTarget):
+    """ This filter is always exact. """
+    __slots__ = ('i_extended', 'matchingmasks')
+
+    moduletype = ModuleTypes.HANDCONFIG
+
+    def __init__(self, target_module, matchtype='minimal', negative=False):
+        super().__init__(target_module, matchtype, negative)
+        self.i_extended = target_module.i_extended
+        # target extended vs nonextended fingers, where thumb=0, index=1, etc
+        fingers = list(target_module.finger_selections.values())
+        extended_fingers = [i for i, value in enumerate(fingers) if value == "Extended"]
+        nonextended_fingers = [i for i, value in enumerate(fingers) if value == "Not extended"]
+        # the "Number of extended fingers" that were selected (any number matches if none were)
+        extended_numbers = [num for num, is_selected in target_module.num_extended_selections.items() if is_selected]
+        # every extended fingers mask (see HandConfigurationModule.extendedfingersmask()) that matches the target
+        self.matchingmasks = frozenset(
+            mask for mask in range(32)
+            if (not extended_numbers or bin(mask).count('1') in extended_numbers)  # TODO
+            and all(mask & (1 << finger) for finger in extended_fingers)
+            and not any(mask & (1 << finger) for finger in nonextended_fingers))
+
+    def filter(self, modulelist, signdata, terminate_early=False):
+        modulelist = self.prefilter(modulelist)
+        return self.stage('extended fingers', modulelist,
+                          [m for m in modulelist if m.extendedfingersmask(self.i_extended) in self.matchingmasks])
+
+
+class CompiledAnchoredRelationTarget:
+    """ A mov+rel or loc+rel target: a relation module target, and a movement or location target that the relation's
+        anchor module has to match.
+    """
+    __slots__ = ('anchortype', 'relation', 'anchor')
+
+    def __init__(self, ttype, target_module, associatedrelnmodule, matchtype='minimal'):
+        if ttype == TargetTypes.LOC_REL:
+            self.anchortype = ModuleTypes.LOCATION
+            self.anchor = CompiledLocationTarget(target_module, matchtype)
+        else:
+            self.anchortype = ModuleTypes.MOVEMENT
+            self.anchor = CompiledMovementTarget(target_module, matchtype)
+        self.relation = CompiledRelationTarget(associatedrelnmodule, matchtype)
+
+    # (the relation's and the anchor's stages are counted together)
+    def countstages(self, stagecounts):
+        self.relation.countstages(stagecounts)
+        self.anchor.countstages(stagecounts)
+
+    # the relation modules of the sign (that signdata is for) that are anchored to a module of the right type
+    def anchoredrelations(self, signdata):
+        return [m for m in signdata.modules(ModuleTypes.RELATION) if m.relationy.linkedmoduletype == self.anchortype]
+
+    def matches(self, signdata):
+        return bool(self.filter(self.anchoredrelations(signdata), signdata, terminate_early=True))
+
+    def filter(self, modulelist, signdata, terminate_early=False):
+        if not modulelist:
+            return []
+        matching_relation_modules = self.relation.filter(modulelist, signdata, terminate_early=terminate_early)
+        if not matching_relation_modules:
+            return []
+        anchormodules = signdata.sign.getmoduledict(self.anchortype)
+        # TODO: terminate early?
+        return self.anchor.filter([anchormodules[m.relationy.linkedmoduleids[0]] for m in matching_relation_modules], signdata)
+
+
+def compiletargetpaths(checkeditems):
+    """ Convert a list of checked items (output from treemodel.get_checked_items(include_details=True)) into a tuple of
+        (path, details_tuple, details_sets) triples for filter_modules_by_paths(), where details_tuple is
+        tuple(tuple(surfaces), tuple(subareas)), and details_sets is the same as sets.
+    """
+    paths = []
+    for p in checkeditems:
+        details_tuple = tuple(tuple(selecteddetails) for selecteddetails in p['details'].get_checked_values().values())
+        paths.append((p['path'], details_tuple, tuple(frozenset(details) for details in details_tuple)))
+    return tuple(paths)
+
+
+# {path: details tuple} for a module's checked items (from treemodel.get_checked_items(include_details=True)), where the
+#   details tuple is as in compiletargetpaths()
+# (paths aren't repeated within a module, so each path is only there once)
+def modulepathdetails(checkeditems):
+    return {p['path']: tuple(tuple(selecteddetails) for selecteddetails in p['details'].get_checked_values().values())
+            for p in checkeditems}
+
+
+def filter_modules_by_paths(modules, target_paths, pathdetailsof, matchtype='minimal', terminate_early=False):
+    """
+    Filter a list of location or relation modules by selected paths. This doesn't check for matching loctypes (e.g. body vs body-anchored), phonlocs, articulators, xslottypes, etc.
+    Args:
+        modules: list of location modules (list is not modified)
+        target_paths: target paths to match, from compiletargetpaths()
+        pathdetailsof: function returning the module's paths that are to be compared with the target paths, as from modulepathdetails()
+        matchtype: 'minimal' or 'exact'
+        terminate_early: bool. True if we only need to know whether `modules` has at least one matching module.
+
+    Returns:
+        list. Returns the subset of `modules` with modules that contain all the paths and details tables in `target_paths`. If `terminate_early` is True, the list contains only the first module in `modules` that matches `target_paths`. If matchtype is `exact`, matching modules cannot contain any other paths or details tables.
+    """
+    exact_paths = frozenset((path, details_tuple) for path, details_tuple, _ in target_paths)
+    matching_modules = []
+    for module in modules:
+        # module_details is {path_name: ((surfaces), (subareas))}. Paths aren't repeated within a module, so keys are unique.
+        # This is NOT the case for target_paths
+        # (we might have e.g. two instances of the same target path, but with different details)
+        module_details = pathdetailsof(module)
+        if len(module_details) < len(target_paths): # all paths specified in the target need to be present in the module for it to match, regardless of matchtype
+            continue
+
+        if matchtype == 'exact':
+            # to match exactly, a module must contain _only_ the target paths and no other paths
+            module_matches = set(module_details.items()) == exact_paths
+        else:
+            module_matches = True
+            for path, details_tuple, details_sets in target_paths:
+                module_path_details = module_details.get(path)
+                if module_path_details is None:
+                    module_matches = False
+                    break # all target_paths need to match.
+                if details_tuple != module_path_details: # check for at least a minimal match
+                    if not all(details_sets[i] <= set(module_path_details[i]) for i in range(len(details_sets))):
+                        module_matches = False
+                        break
+        if module_matches:
+            matching_modules.append(module)
+            if terminate_early:
+                return matching_modules
+    return matching_modules
+
+
+def compiletarget(ttype, target_module, associatedrelnmodule=None, matchtype='minimal', negative=False):
+    """ Compile a search target (as described by a row of a SearchModel) for comparing with signs.
+    Args:
+        ttype: the target's type (TargetTypes or ModuleTypes)
+        target_module: the module built in the Search window (or XslotTarget, SignLevelInformation, Signtype)
+        associatedrelnmodule: for mov+rel and loc+rel targets, the relation module built in the Search window
+        matchtype: 'minimal' or 'exact'
+        negative: bool. True if signs match when they don't match the target.
+    """
+    if ttype == TargetTypes.XSLOT:
+        return CompiledXslotTarget(target_module, negative)
+    elif ttype == TargetTypes.SIGNLEVELINFO:
+        return CompiledSignLevelInfoTarget(target_module, matchtype, negative)
+    elif ttype == TargetTypes.SIGNTYPEINFO:
+        return CompiledSignTypeTarget(target_module, matchtype, negative)
+    elif ttype == ModuleTypes.HANDCONFIG:
+        # extended fingers targets are stored with the hand configuration type, since they're compared with hand configuration modules
+        if target_module.moduletype == TargetTypes.EXTENDEDFINGERS:
+            return CompiledExtendedFingersTarget(target_module, matchtype, negative)
+        return CompiledHandConfigTarget(target_module, matchtype, negative)
+    elif ttype == ModuleTypes.ORIENTATION:
+        return CompiledOrientationTarget(target_module, matchtype, negative)
+    elif ttype == ModuleTypes.MOVEMENT:
+        return CompiledMovementTarget(target_module, matchtype, negative)
+    elif ttype == ModuleTypes.LOCATION:
+        return CompiledLocationTarget(target_module, matchtype, negative)
+    elif ttype == ModuleTypes.RELATION:
+        return CompiledRelationTarget(target_module, matchtype, negative)
+    elif ttype in [TargetTypes.LOC_REL, TargetTypes.MOV_REL]:
+        return CompiledAnchoredRelationTarget(ttype, target_module, associatedrelnmodule, matchtype)
+    raise ValueError("can't search for targets of type " + str(ttype))
@@ -0,0 +1,142 @@
+from collections import defaultdict
+
+from lexicon.module_classes import ModuleTypes
+from search.compiled_targets import fixedhandconfigslots, CompiledExtendedFingersTarget
+from search.sign_index import SignIndex
+from constant import TargetTypes
+
+# the positions in a hand configuration tuple that differ between hand configurations
+variablehandconfigslots = [i for i in range(33) if i not in fixedhandconfigslots]
+
+
+def slotsbitmap(slots):
+    bits = bytearray((max(slots) >> 3) + 1 if slots else 0)
+    for slot in slots:
+        bits[slot >> 3] |= 1 << (slot & 7)
+    return int.from_bytes(bits, 'little')
+
+
+def bitmapslots(bitmap):
+    return [slot for slot, bit in enumerate(reversed(bin(bitmap)[2:])) if bit == '1']
+
+
+# An index over a corpus's hand configuration modules, for narrowing down hand configuration searches: each module is
+#   given a slot number, and each (position, symbol) in a module's hand configuration tuple maps to a bitmap (an int) of
+#   the slots whose modules have that symbol in that position. Minimal matching for a partly-specified hand
+#   configuration is then an AND of a bitmap per specified position, rather than a comparison with every module's tuple.
+#   Whole tuples (eg predefined handshapes, see lexicon/predefined_handshape.py) are looked up directly, and so are
+#   the modules' extended fingers masks (see HandConfigurationModule.extendedfingersmask()), which answer extended
+#   finger searches and give a histogram of how many modules have which fingers extended.
+# As with the path index, the candidates are always a superset of the signs that really match (articulators, forearm,
+#   etc are left to CompiledHandConfigTarget), and the index is kept in sync with the corpus by update().
+class HandshapeIndex(SignIndex):
+
+    def __init__(self):
+        super().__init__()
+        # slot -> (id(sign), module unique ID), or None if the slot is free
+        self._slotmodules = []
+        self._freeslots = []
+        # (position, symbol) -> set of slots
+        self._postings = defaultdict(set)
+        # (position, symbol) -> bitmap of the same slots, made when first needed and forgotten when the slots change
+        self._bitmaps = {}
+        # hand configuration tuple -> set of slots
+        self._tuples = defaultdict(set)
+        # (i_extended, extended fingers mask) -> set of slots
+        self._fingermasks = defaultdict(set)
+
+    # returns the slots, tuples and extended fingers masks (without and with 'i') of the sign's hand configuration modules
+    def indexsign(self, signid, sign):
+        indexed = []
+        for uniqueid, module in sign.getmoduledict(ModuleTypes.HANDCONFIG).items():
+            if self._freeslots:
+                slot = self._freeslots.pop()
+                self._slotmodules[slot] = (signid, uniqueid)
+            else:
+                slot = len(self._slotmodules)
+                self._slotmodules.append((signid, uniqueid))
+            config_tuple = module.config_tuple()
+            for position in variablehandconfigslots:
+                if config_tuple[position] != "":
+                    key = (position, config_tuple[position])
+                    self._postings[key].add(slot)
+                    self._bitmaps.pop(key, None)
+            self._tuples[config_tuple].add(slot)
+            masks = (module.extendedfingersmask(False), module.extendedfingersmask(True))
+            for i_extended, mask in enumerate(masks):
+                self._fingermasks[(bool(i_extended), mask)].add(slot)
+            indexed.append((slot, config_tuple, masks))
+        return indexed
+
+    def unindexsign(self, signid, indexed):
+        for slot, config_tuple, masks in indexed:
+            for position in variablehandconfigslots:
+                if config_tuple[position] != "":
+                    key = (position, config_tuple[position])
+                    self._postings[key].discard(slot)
+                    self._bitmaps.pop(key, None)
+                    if not self._postings[key]:
+                        del self._postings[key]
+            self._tuples[config_tuple].discard(slot)
+            if not self._tuples[config_tuple]:
+                del self._tuples[config_tuple]
+            for i_extended, mask in enumerate(masks):
+                key = (bool(i_extended), mask)
+                self._fingermasks[key].discard(slot)
+                if not self._fingermasks[key]:
+                    del self._fingermasks[key]
+            self._slotmodules[slot] = None
+            self._freeslots.append(slot)
+
+    def _bitmap(self, key):
+        bitmap = self._bitmaps.get(key)
+        if bitmap is None:
+            bitmap = self._bitmaps[key] = slotsbitmap(self._postings.get(key, ()))
+        return bitmap
+
+    # slots of the modules whose hand configuration tuples have all of the given (position, symbol)s
+    def slotsmatchingall(self, keys):
+        keys = sorted(keys, key=lambda key: len(self._postings.get(key, ())))
+        bitmap = self._bitmap(keys[0])
+        for key in keys[1:]:
+            if not bitmap:
+                break
+            bitmap &= self._bitmap(key)
+        return bitmapslots(bitmap)
+
+    # slots of the modules whose hand configuration tuple is config_tuple
+    def slotswithtuple(self, config_tuple):
+        return self._tuples.get(tuple(config_tuple), ())
+
+    # extended fingers mask -> number of hand configuration modules in the corpus with that mask
+    def fingermaskhistogram(self, i_extended=False):
+        return {mask: len(slots) for (maskiext, mask), slots in self._fingermasks.items() if maskiext == i_extended}
+
+    # slots of the modules whose extended fingers mask is one of masks
+    def slotswithfingermasks(self, masks, i_extended=False):
+        slots = set()
+        for mask in masks:
+            slots.update(self._fingermasks.get((i_extended, mask), ()))
+        return slots
+
+    # IDs of the signs that could match target_module (a hand configuration or extended fingers target), or None if the
+    #   index can't narrow them down (eg because the target doesn't specify a handshape)
+    def candidatesigns(self, target_module, matchtype='minimal'):
+        if target_module.moduletype == TargetTypes.EXTENDEDFINGERS:
+            # extended fingers targets always match exactly, whatever matchtype is
+            matchingmasks = CompiledExtendedFingersTarget(target_module).matchingmasks
+            if len(matchingmasks) == 32:
+                return None
+            slots = self.slotswithfingermasks(matchingmasks, bool(target_module.i_extended))
+            return set(self._slotmodules[slot][0] for slot in slots)
+        target_tuple = target_module.config_tuple()
+        keys = [(position, target_tuple[position]) for position in variablehandconfigslots if target_tuple[position] != ""]
+        if matchtype == 'exact':
+            # matching exactly means having the same hand configuration, so the same tuple
+            slots = self.slotswithtuple(target_tuple)
+        elif not keys:
+            # an empty hand configuration matches any hand configuration minimally
+            return None
+        else:
+            slots = self.slotsmatchingall(keys)
+        return set(self._slotmodules[slot][0] for slot in slots)
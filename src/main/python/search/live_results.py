@@ -0,0 +1,74 @@
+from search.compiled_targets import SignData
+from search.sign_index import SignIndex
+
+# Keeping a search's results up to date as the corpus it searched is edited, without searching it again: like the
+# search indexes (see SignIndex), LiveSearchResults only looks at the signs that have been added, changed (ie whose
+# revision has gone up) or removed since it was last brought up to date, and compares just those with the search's
+# compiled targets.
+
+
+class LiveSearchResults(SignIndex):
+    """ The signs in a corpus that match each of a search's result sets, kept up to date incrementally.
+
+        resultsets is {result name: list of PlanStep}, with a result name for each row of the search's results (each
+        target's name for a "match any" search, or the tuple of all of them for "match all"); a sign is in a result
+        set if it passes all of its steps. Call seed() with the results the search found, and then updatefrom() after
+        the corpus changes.
+    """
+
+    def __init__(self, resultsets):
+        super().__init__()
+        self.resultsets = resultsets
+        # result name -> {id(sign): sign} for the matching signs
+        self.matching = {name: {} for name in resultsets}
+        # (result name, id(sign)) -> (sign, True if it was added or False if removed) since the last updatefrom()
+        self._changes = {}
+
+    # start from the results of the search (resultsdict, as from SearchModel.search_corpus()) of signs, rather than
+    #   comparing every sign with the targets again
+    def seed(self, signs, resultsdict):
+        matchednames = {}
+        for name, matching in self.matching.items():
+            for signlevelinfo in resultsdict[name]['signs']:
+                sign = signlevelinfo.parentsign
+                matching[id(sign)] = sign
+                matchednames.setdefault(id(sign), []).append(name)
+        for sign in signs:
+            self._indexedsigns[id(sign)] = (sign, sign.revision, tuple(matchednames.get(id(sign), ())))
+
+    # the result names whose sets the sign is in
+    def indexsign(self, signid, sign):
+        signdata = SignData(sign)
+        matchednames = tuple(name for name, steps in self.resultsets.items()
+                             if all(step.check(signdata) for step in steps))
+        for name in matchednames:
+            self.matching[name][signid] = sign
+            self._change(name, signid, sign, True)
+        return matchednames
+
+    def unindexsign(self, signid, matchednames):
+        for name in matchednames:
+            self._change(name, signid, self.matching[name].pop(signid), False)
+
+    def _change(self, name, signid, sign, added):
+        previous = self._changes.get((name, signid))
+        if previous is not None and previous[1] != added:
+            # removed and then added again (ie changed, but still matching), or the other way around
+            self._changes[(name, signid)] = (sign, None)
+        else:
+            self._changes[(name, signid)] = (sign, added)
+
+    def updatefrom(self, signs):
+        """ Bring the results up to date with signs (the corpus's signs as they are now).
+        Returns:
+            list of (result name, sign, change) for each sign that's been added to (change is True) or removed from
+            (False) a result set, or that's changed but is still in it (None)
+        """
+        self._changes = {}
+        self.update(signs)
+        changes = [(name, sign, added) for (name, _), (sign, added) in self._changes.items()]
+        self._changes = {}
+        return changes
+
+    def frequency(self, name):
+        return len(self.matching[name])
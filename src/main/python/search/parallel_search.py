@@ -0,0 +1,195 @@
+import logging
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from lexicon.lexicon_classes import Corpus, Sign
+from lexicon.module_classes import SignLevelInformation
+from search.compiled_targets import SignData
+from serialization_classes import SignRecord, readindexedcorpus, readfilestamp, fileidentity
+from constant import TargetTypes
+
+# Comparing a search's candidate signs with its targets (see QueryPlan) across a pool of worker processes.
+# Signs can't be sent to another process as they are (their movement, location and relation modules hold Qt models),
+# so each worker decodes the signs it's given from their records in the corpus's indexed file, the same way the main
+# process does when a sign is first needed, and keeps them for later searches. Each sign always goes to the same worker
+# (by entry ID), so that over a session each worker only ever decodes its own share of the corpus. Signs that have
+# changed since the corpus was last loaded or saved (and so have no up-to-date record) are compared in the main process.
+# The matching signs are returned in the same order as the plan's candidates whatever the number of workers, so a
+# parallel search always gives exactly the same results as a serial one.
+
+
+# the minimum number of candidate signs for it to be worth comparing them in worker processes
+parallelsearchminsigns = 1000
+
+
+# (in a worker process) the signs decoded from one indexed corpus file, as of when it had a particular file stamp
+# saving either appends to an indexed corpus file or writes a new one with a new file stamp (see newfilestamp()), so a
+#   record doesn't change as long as its file keeps the same stamp; inode numbers can be reused once a file is replaced,
+#   so they won't do. A file written before there were file stamps is identified by its (inode, modification time, size)
+#   instead (see filekey()).
+class WorkerCorpusFile:
+
+    def __init__(self, path, key):
+        if key != filekey(path, readfilestamp(path)):
+            raise ValueError(path + " has been replaced since its signs were read")
+        self.path = path
+        self.key = key
+        # (offset, length) -> [Sign decoded from the record there, its serialized sign-level info]
+        self.signs = {}
+        # (offset, length) -> serialized sign-level info for the record there, from the file's index (read when needed)
+        self.signlevelinfos = {}
+        # for bringing signs from older corpus files up to date; see Corpus.add_missing_paths_sign()
+        self.corpus = Corpus()
+
+    # serializedsignlevelinfo is the sign's current sign-level info, or None if it doesn't matter (in which case,
+    #   a newly decoded sign gets whatever the file's index has)
+    def sign(self, offset, length, crc, serializedsignlevelinfo=None):
+        signandinfo = self.signs.get((offset, length))
+        if signandinfo is None:
+            if serializedsignlevelinfo is None:
+                serializedsignlevelinfo = self.indexedsignlevelinfo(offset, length)
+            sign = Sign(signrecord=SignRecord(self.path, offset, length, serializedsignlevelinfo, crc),
+                        afterdecode=self.corpus.add_missing_paths_sign)
+            sign.decoderecord()
+            signandinfo = self.signs[(offset, length)] = [sign, serializedsignlevelinfo]
+        elif serializedsignlevelinfo is not None and serializedsignlevelinfo != signandinfo[1]:
+            # the sign-level info isn't part of the record, and can change without it
+            signandinfo[0].signlevel_information = SignLevelInformation(serializedsignlevelinfo=serializedsignlevelinfo)
+            signandinfo[1] = serializedsignlevelinfo
+        return signandinfo[0]
+
+    def indexedsignlevelinfo(self, offset, length):
+        if (offset, length) not in self.signlevelinfos:
+            # (read again if it's not there, since journal entries might have been added since it was last read)
+            self.signlevelinfos = {(signrecord.offset, signrecord.length): signrecord.serializedsignlevelinfo
+                                   for signrecord in readindexedcorpus(self.path)['signs']}
+        return self.signlevelinfos[(offset, length)]
+
+
+# the most corpus files a worker process keeps the decoded signs of (eg when a search goes through many corpora one
+#   after another; see SearchModel.search_corpora()); the one used least recently is let go of first
+maxworkerfiles = 4
+
+# in each worker process: path -> WorkerCorpusFile, in order of when each was last used
+_workerfiles = OrderedDict()
+
+
+# what identifies the version of the indexed corpus file at path that records with the given file stamp were read from
+def filekey(path, stamp):
+    return stamp if stamp is not None else fileidentity(path)
+
+
+# Runs in a worker process: for each of the signs whose records are at the given (offset, length, crc, serialized
+# sign-level info or None) locations in the indexed corpus file at path (as identified by key; see filekey()), whether
+# it passes every one of steps ((target type, compiled target) pairs); sign-level info only needs to be given if one of
+# the steps compares it.
+def searchsignrecordschunk(path, key, locations, steps):
+    corpusfile = _workerfiles.get(path)
+    if corpusfile is None or corpusfile.key != key:
+        corpusfile = _workerfiles[path] = WorkerCorpusFile(path, key)
+    _workerfiles.move_to_end(path)
+    while len(_workerfiles) > maxworkerfiles:
+        _workerfiles.popitem(last=False)
+    checks = [target.matches for _, target in steps]
+    return [all(check(signdata) for check in checks)
+            for signdata in (SignData(corpusfile.sign(*location)) for location in locations)]
+
+
+# A pool of worker processes for parallel searches. Each worker is a separate single-process pool, so that the same
+# partition of a corpus's signs can be sent to the same worker every time.
+class SearchWorkers:
+
+    def __init__(self, processes=None):
+        self.processes = processes or os.cpu_count() or 1
+        self._executors = [None] * self.processes
+
+    def executor(self, partition):
+        if self._executors[partition] is None:
+            self._executors[partition] = ProcessPoolExecutor(max_workers=1)
+        return self._executors[partition]
+
+    def partition(self, sign):
+        return sign.signlevel_information.entryid.counter % self.processes
+
+    def shutdown(self):
+        for executor in self._executors:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+        self._executors = [None] * self.processes
+
+    def matchingsigns(self, plan, progress=None):
+        """ The signs in plan.candidates that pass all of plan's steps, in the same order as plan.candidates.
+
+            Signs with up-to-date records are split by partition (and then by file) into one chunk per worker, and the
+            rest are compared here while the workers work through their chunks. progress is as for
+            matchingsignsforeach(), but is only called once the signs compared here, and then each chunk, are done.
+        """
+        steps = [(step.ttype, step.target) for step in plan.steps]
+        withsignlevelinfo = any(ttype == TargetTypes.SIGNLEVELINFO for ttype, _ in steps)
+        # (partition, path, file stamp) -> (signs, their record locations)
+        chunks = {}
+        localsigns = []
+        for sign in plan.candidates:
+            record = sign.contentsrecord
+            if record is None:
+                localsigns.append(sign)
+                continue
+            signs, locations = chunks.setdefault((self.partition(sign), record.path, record.stamp), ([], []))
+            signs.append(sign)
+            locations.append((record.offset, record.length, record.crc,
+                              sign.signlevel_information.serialize() if withsignlevelinfo else None))
+
+        futures = [(signs, self.executor(partition).submit(searchsignrecordschunk, path, filekey(path, stamp),
+                                                            locations, steps))
+                   for (partition, path, stamp), (signs, locations) in chunks.items()]
+        matching = set(id(sign) for sign in localsigns if plan.matches(sign))
+        done = len(localsigns)
+        try:
+            for signs, future in futures:
+                if progress is not None:
+                    progress(done, len(matching))
+                matching.update(id(sign) for sign, matches in zip(signs, future.result()) if matches)
+                done += len(signs)
+            if progress is not None:
+                progress(done, len(matching))
+        except BaseException:
+            for _, future in futures:
+                future.cancel()
+            raise
+        return [sign for sign in plan.candidates if id(sign) in matching]
+
+
+# processes -> SearchWorkers, kept from one search to the next
+_searchworkers = {}
+
+
+def searchworkers(processes=None):
+    processes = processes or os.cpu_count() or 1
+    if processes not in _searchworkers:
+        _searchworkers[processes] = SearchWorkers(processes)
+    return _searchworkers[processes]
+
+
+def shutdownsearchworkers():
+    for workers in _searchworkers.values():
+        workers.shutdown()
+    _searchworkers.clear()
+
+
+# the signs in plan.candidates that pass all of plan's steps, in the same order as plan.candidates, compared in a pool
+# of worker processes if there are at least minsigns of them (and in this process if not, or if the pool fails)
+# progress is as for matchingsignsforeach()
+def matchingsignsparallel(plan, processes=None, minsigns=None, progress=None):
+    if minsigns is None:
+        minsigns = parallelsearchminsigns
+    if len(plan.candidates) < minsigns or not plan.steps:
+        return plan.matchingsigns(progress)
+    workers = searchworkers(processes)
+    try:
+        return workers.matchingsigns(plan, progress)
+    except (OSError, BrokenProcessPool) as e:
+        logging.warning("Searching in parallel failed; searching in this process instead: " + str(e))
+        workers.shutdown()
+        return plan.matchingsigns(progress)
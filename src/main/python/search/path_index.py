@@ -0,0 +1,131 @@
+from collections import defaultdict
+
+from lexicon.module_classes import ModuleTypes
+from models.path_registry import pathregistry
+from search.sign_index import SignIndex
+from constant import TargetTypes, HAND, ARM, LEG
+
+# (label, body part, number) for each articulator whose body parts a relation module can specify; the labels are as
+#   used by RelationModule.get_articulators_in_use(as_string=True) and RelationModule.get_paths()
+relationarticulators = [(("H" if bodypart == HAND else bodypart) + str(number), bodypart, number)
+                        for bodypart in [HAND, ARM, LEG] for number in [1, 2]]
+
+# the types of targets whose candidate signs can be narrowed down with a PathIndex
+indexedtargettypes = [ModuleTypes.MOVEMENT, ModuleTypes.LOCATION, ModuleTypes.RELATION, TargetTypes.LOC_REL,
+                      TargetTypes.MOV_REL]
+
+
+# An inverted index over a corpus's movement, location and relation modules: each checked path (and each value checked
+#   in a location or body part path's details table) maps to the (sign, module) pairs that contain it. Searching for a
+#   movement, location or relation target intersects the lists for the target's paths to get a (usually small) set of
+#   candidate signs, and only those go on to be compared with the targets themselves (see SearchModel.search_corpus()).
+# The candidates are always a superset of the signs that really match, so the index only ever saves work; it never
+#   changes search results.
+class PathIndex(SignIndex):
+
+    def __init__(self):
+        super().__init__()
+        # key -> set of (id(sign), module unique ID)
+        self._postings = defaultdict(set)
+
+    # returns the keys the sign's modules were indexed under
+    def indexsign(self, signid, sign):
+        keys = []
+        for moduletype, keysfunction in [(ModuleTypes.MOVEMENT, movementmodulekeys),
+                                         (ModuleTypes.LOCATION, locationmodulekeys),
+                                         (ModuleTypes.RELATION, relationmodulekeys)]:
+            for uniqueid, module in sign.getmoduledict(moduletype).items():
+                for key in keysfunction(module):
+                    self._postings[key].add((signid, uniqueid))
+                    keys.append((key, uniqueid))
+        return keys
+
+    def unindexsign(self, signid, keys):
+        for key, uniqueid in keys:
+            posting = self._postings[key]
+            posting.discard((signid, uniqueid))
+            if not posting:
+                del self._postings[key]
+
+    # the (sign ID, module ID) pairs for modules indexed under every one of keys
+    def _modulesmatchingall(self, keys):
+        keys = sorted(keys, key=lambda key: len(self._postings.get(key, ())))
+        modules = set(self._postings.get(keys[0], ()))
+        for key in keys[1:]:
+            if not modules:
+                break
+            modules &= self._postings.get(key, set())
+        return modules
+
+    def _signsfor(self, key):
+        return set(signid for signid, _ in self._postings.get(key, ()))
+
+    # IDs of the signs that could match target_module (of type ttype), or None if the index can't narrow them down
+    #   (eg because the target has no paths selected, or is of a type that isn't indexed)
+    def candidatesigns(self, ttype, target_module):
+        if ttype in [ModuleTypes.MOVEMENT, TargetTypes.MOV_REL]:
+            keys = movementmodulekeys(target_module)
+        elif ttype in [ModuleTypes.LOCATION, TargetTypes.LOC_REL]:
+            keys = locationmodulekeys(target_module, only_fully_checked=True)
+        elif ttype == ModuleTypes.RELATION:
+            return self._relationcandidatesigns(target_module)
+        else:
+            return None
+        if not keys:
+            return None
+        # a movement or location module only matches if it has all of the target's paths (and details) itself
+        return set(signid for signid, _ in self._modulesmatchingall(keys))
+
+    # unlike for movement and location, whether a relation module has to match the target's paths for an articulator
+    #   depends on whether the other relation modules being filtered use that articulator (see
+    #   CompiledRelationTarget.filter()), so a sign stays a candidate if any of its relation modules has the path or
+    #   doesn't use the articulator at all
+    def _relationcandidatesigns(self, target_module):
+        candidates = None
+        for label, targetpaths in target_module.get_paths().items():
+            if not targetpaths:
+                continue
+            signsnotusing = self._signsfor((ModuleTypes.RELATION, label))
+            for p in targetpaths:
+                for key in pathkeys((ModuleTypes.RELATION, label), p['path'], p['details']):
+                    signs = self._signsfor(key) | signsnotusing
+                    candidates = signs if candidates is None else candidates & signs
+        return candidates
+
+
+# the keys a path (and, if given, its details table) is indexed under; prefix identifies the type of module the path
+#   is from (and, for relation modules, which articulator)
+def pathkeys(prefix, pathtext, detailstable=None):
+    pathid = pathregistry.pathid(pathtext)
+    keys = [prefix + (pathid,)]
+    if detailstable is not None:
+        for column, selecteddetails in enumerate(detailstable.get_checked_values().values()):
+            keys.extend(prefix + (pathid, column, detail) for detail in selecteddetails)
+    return keys
+
+
+def movementmodulekeys(module):
+    return [(ModuleTypes.MOVEMENT, pathregistry.pathid(pathtext)) for pathtext in module.movementtree.get_checked_items()]
+
+
+# modules are indexed under their partially checked paths too, since some searches match those
+def locationmodulekeys(module, only_fully_checked=False):
+    keys = []
+    for p in module.locationtree.get_checked_items(only_fully_checked=only_fully_checked, include_details=True):
+        keys.extend(pathkeys((ModuleTypes.LOCATION,), p['path'], p['details']))
+    return keys
+
+
+# a relation module is indexed under (RELATION, label) for each articulator it doesn't use; the paths of all its body
+#   part trees are indexed whether or not it uses the articulator, since searches can check them either way
+def relationmodulekeys(module):
+    inuse = module.get_articulators_in_use(as_string=True)
+    keys = [(ModuleTypes.RELATION, label) for label, _, _ in relationarticulators if label not in inuse]
+    for label, bodypart, number in relationarticulators:
+        bodypartinfo = module.bodyparts_dict.get(bodypart, {}).get(number)
+        treemodel = bodypartinfo.bodyparttreemodel if bodypartinfo is not None else None
+        if treemodel is None:
+            continue
+        for p in treemodel.get_checked_items(only_fully_checked=False, include_details=True):
+            keys.extend(pathkeys((ModuleTypes.RELATION, label), p['path'], p['details']))
+    return keys
@@ -0,0 +1,228 @@
+from collections import Counter
+
+from lexicon.module_classes import ModuleTypes
+from search.compiled_targets import SignData
+from search.sign_index import SignIndex, corpusindex
+from constant import TargetTypes
+
+# Planning a search: deciding which signs to look at (the candidates from the path and handshape indexes) and in what
+# order to compare each of them with the targets. Every target has to match for a sign to match, so the comparisons can
+# be made in any order without changing the results; the planner puts them in the order that's expected to rule signs
+# out soonest for the least work. A comparison's cost is estimated from its type and how many modules it has to look at
+# in an average sign, and the fraction of signs that pass it from the number of candidates the indexes found for it
+# (ie how common its paths or handshape are), or from how many signs have modules of its type at all.
+# A "match any" search has one plan per target; matchingsignsforeach() runs them all in a single pass over the corpus,
+# so that what's worked out about a sign for one target (its hand configurations, checked paths, etc.; see SignData)
+# is reused for the others.
+
+
+# the types of modules (and so targets) that SignStatistics counts
+countedmoduletypes = [ModuleTypes.HANDCONFIG, ModuleTypes.ORIENTATION, ModuleTypes.MOVEMENT, ModuleTypes.LOCATION,
+                      ModuleTypes.RELATION]
+
+# the type of module each type of module target is compared with
+comparedmoduletypes = {moduletype: moduletype for moduletype in countedmoduletypes}
+comparedmoduletypes[TargetTypes.LOC_REL] = ModuleTypes.RELATION
+comparedmoduletypes[TargetTypes.MOV_REL] = ModuleTypes.RELATION
+
+# rough relative cost of comparing a target of each type with a sign (for sign-level targets) or with one module
+checkcosts = {
+    TargetTypes.XSLOT: 1,
+    TargetTypes.SIGNLEVELINFO: 2,
+    TargetTypes.SIGNTYPEINFO: 3,
+    ModuleTypes.HANDCONFIG: 2,
+    ModuleTypes.ORIENTATION: 2,
+    ModuleTypes.MOVEMENT: 3,
+    ModuleTypes.LOCATION: 5,
+    ModuleTypes.RELATION: 8,
+    TargetTypes.LOC_REL: 10,
+    TargetTypes.MOV_REL: 10,
+}
+
+# fraction of signs guessed to match a target of each type, when the indexes say nothing about it; for module
+#   targets, it's the fraction of the signs that have a module of that type
+defaultpassrates = {
+    TargetTypes.XSLOT: 0.5,
+    TargetTypes.SIGNLEVELINFO: 0.2,
+    TargetTypes.SIGNTYPEINFO: 0.3,
+}
+defaultmodulepassrate = 0.5
+
+# the number of signs compared between calls to a search's progress function (see matchingsignsforeach())
+progresssigns = 50
+
+
+# Counts of each type of module in a corpus, kept up to date in the same way as its search indexes (see SignIndex).
+class SignStatistics(SignIndex):
+
+    def __init__(self):
+        super().__init__()
+        # module type -> number of signs with at least one module of that type
+        self.signswith = Counter()
+        # module type -> number of modules of that type in all the signs
+        self.modulecounts = Counter()
+
+    # returns the number of modules of each type in the sign
+    def indexsign(self, signid, sign):
+        counts = {moduletype: len(sign.getmoduledict(moduletype)) for moduletype in countedmoduletypes}
+        self._add(counts, 1)
+        return counts
+
+    def unindexsign(self, signid, counts):
+        self._add(counts, -1)
+
+    def _add(self, counts, increment):
+        for moduletype, count in counts.items():
+            self.modulecounts[moduletype] += increment * count
+            if count:
+                self.signswith[moduletype] += increment
+
+    # fraction of the signs that have at least one module of type moduletype
+    def fractionwith(self, moduletype):
+        return self.signswith[moduletype] / len(self) if len(self) else 1.0
+
+    def modulespersign(self, moduletype):
+        return self.modulecounts[moduletype] / len(self) if len(self) else 0.0
+
+
+# One target's comparison with a sign, as part of a QueryPlan.
+class PlanStep:
+    __slots__ = ('ttype', 'name', 'target', 'negative', 'numcandidates', 'passrate', 'cost', 'check')
+
+    def __init__(self, ttype, name, target, negative=False, numcandidates=None):
+        self.ttype = ttype
+        self.name = name
+        self.target = target  # compiled; see search/compiled_targets.py
+        self.negative = negative
+        # the number of signs the indexes left as candidates for this target, or None if they couldn't narrow them down
+        self.numcandidates = numcandidates
+        # estimated fraction of signs that pass the check, and its cost; see estimate()
+        self.passrate = 1.0
+        self.cost = checkcosts.get(ttype, 1)
+        # function(signdata) that says whether the sign passes
+        self.check = target.matches
+
+    def estimate(self, numsigns, statistics=None):
+        moduletype = comparedmoduletypes.get(self.ttype)
+        if moduletype is None:
+            passrate = defaultpassrates.get(self.ttype, defaultmodulepassrate)
+        else:
+            self.cost = checkcosts.get(self.ttype, 1) * (1 + statistics.modulespersign(moduletype))
+            passrate = statistics.fractionwith(moduletype) * defaultmodulepassrate
+        if self.numcandidates is not None and numsigns:
+            # the indexes' candidates are all the signs that could pass
+            passrate = self.numcandidates / numsigns
+        elif self.negative and self.ttype in [TargetTypes.XSLOT, TargetTypes.SIGNLEVELINFO, TargetTypes.SIGNTYPEINFO,
+                                              ModuleTypes.HANDCONFIG, ModuleTypes.ORIENTATION]:
+            # (movement, location and relation targets are compared the same way whether they're negative or not)
+            passrate = 1 - passrate
+        self.passrate = passrate
+
+    # steps are run in increasing order of rank, which puts cheap checks that rule out a lot of signs first
+    @property
+    def rank(self):
+        if self.passrate >= 1:
+            return float('inf')
+        return self.cost / (1 - self.passrate)
+
+    def describe(self):
+        candidates = "" if self.numcandidates is None else ", {} candidate signs".format(self.numcandidates)
+        return "{}{} ({}): passes ~{:.0%}, cost ~{:.1f}{}".format(
+            "NOT " if self.negative else "", self.name, self.ttype, self.passrate, self.cost, candidates)
+
+
+# The signs to look at for a search, and the order to compare them with its targets in. A sign matches if it's one of
+#   the candidates and passes every step.
+class QueryPlan:
+
+    def __init__(self, candidates, steps, numsigns, candidateids=None):
+        self.candidates = candidates
+        self.steps = steps
+        self.numsigns = numsigns
+        # set of IDs (id(sign)) of the candidates, or None if every sign is a candidate
+        self.candidateids = candidateids
+
+    def iscandidate(self, sign):
+        return self.candidateids is None or id(sign) in self.candidateids
+
+    def matches(self, sign):
+        return self.passes(SignData(sign))
+
+    # whether the sign that signdata is for passes every step (whether or not it's a candidate)
+    def passes(self, signdata):
+        for step in self.steps:
+            if not step.check(signdata):
+                return False
+        return True
+
+    # progress is as for matchingsignsforeach()
+    def matchingsigns(self, progress=None):
+        if progress is None:
+            return [sign for sign in self.candidates if self.matches(sign)]
+        matching = []
+        for i, sign in enumerate(self.candidates, start=1):
+            if self.matches(sign):
+                matching.append(sign)
+            if i % progresssigns == 0 or i == len(self.candidates):
+                progress(i, len(matching))
+        return matching
+
+    def describe(self):
+        lines = ["{} of {} signs are candidates; targets compared in this order:".format(len(self.candidates), self.numsigns)]
+        lines.extend("  {}. {}".format(i, step.describe()) for i, step in enumerate(self.steps, start=1))
+        return "\n".join(lines)
+
+    def __str__(self):
+        return self.describe()
+
+
+def planquery(corpus, steps, candidates=None):
+    """ Put together a QueryPlan for a search of corpus.
+    Args:
+        corpus: the Corpus being searched
+        steps: list of PlanStep, one per target, in the order the targets were given
+        candidates: set of IDs (id(sign)) of the only signs that could match, or None if any sign could
+    Returns:
+        QueryPlan. Its candidates are in the same order as corpus.signs, and its steps are in order of rank (steps with
+        the same rank keep the order they were given in).
+    """
+    signs = corpus.signs
+    if candidates is not None:
+        signs = [sign for sign in signs if id(sign) in candidates]
+    if len(steps) > 1:
+        # the statistics are only needed (and so only gathered) if there's more than one target to put in order
+        statistics = None
+        if any(step.ttype in comparedmoduletypes for step in steps):
+            statistics = corpusindex(corpus, SignStatistics)
+        for step in steps:
+            step.estimate(len(corpus.signs), statistics)
+        steps = sorted(steps, key=lambda step: step.rank)
+    return QueryPlan(signs, steps, len(corpus.signs), candidates)
+
+
+def matchingsignsforeach(signs, plans, progress=None):
+    """ The matching signs for each of several plans for searches of the same corpus, found in a single pass over it.
+    Args:
+        signs: the corpus's signs, in the same order as the plans' candidates
+        plans: list of QueryPlan
+        progress: function(number of signs looked at so far, number of matches found so far) called every
+            progresssigns signs (and after the last one), or None
+    Returns:
+        list with the matching signs for each plan, in the same order as plans (and each in the same order as signs)
+    """
+    results = [[] for _ in plans]
+    plansandresults = [(plan, matching) for plan, matching in zip(plans, results) if plan.candidates]
+    if not plansandresults:
+        return results
+    for i, sign in enumerate(signs, start=1):
+        signdata = None
+        for plan, matching in plansandresults:
+            if not plan.iscandidate(sign):
+                continue
+            if signdata is None:
+                signdata = SignData(sign)
+            if plan.passes(signdata):
+                matching.append(sign)
+        if progress is not None and (i % progresssigns == 0 or i == len(signs)):
+            progress(i, sum(len(matching) for matching in results))
+    return results
@@ -0,0 +1,150 @@
+import hashlib
+import itertools
+import pickle
+import sys
+from collections import OrderedDict
+
+from search.sign_index import SignIndex, corpusindex
+
+# Caching which signs match each search target, so that running a search again (typically with only one of its targets
+# changed) only has to compare the corpus with the targets that are new. Each target's matching signs are cached on
+# their own, keyed by the corpus, its revision (see CorpusRevision) and a fingerprint of the compiled target (see
+# targetfingerprint()). A "match all" search's results are cached as a whole (see combinedfingerprint()); when they're
+# not there, the cached sets of any of its targets narrow down the signs the rest are compared with.
+# Any change to the corpus's signs gives it a new revision, so cached results are never used once a sign has been
+# added, edited or removed; they're dropped as soon as a search sees the new revision.
+
+
+# default limit on the (estimated) memory used by cached results, in bytes
+resultcachemaxbytes = 64 * 2**20
+
+# estimated memory used by each sign in a cached result (an int in a frozenset)
+bytespercachedsign = 48
+
+_corpustokens = itertools.count(1)
+
+
+# A counter that goes up whenever any of a corpus's signs is added, changed (ie its revision goes up) or removed,
+#   kept up to date in the same way as its search indexes (see SignIndex).
+class CorpusRevision(SignIndex):
+
+    def __init__(self):
+        super().__init__()
+        # identifies the corpus for as long as it exists (unlike id(corpus), which can be reused once it's gone)
+        self.corpustoken = next(_corpustokens)
+        self.revision = 0
+
+    def indexsign(self, signid, sign):
+        self.revision += 1
+
+    def unindexsign(self, signid, indexed):
+        self.revision += 1
+
+
+# (corpus token, revision) for corpus as it is now
+def corpusrevision(corpus):
+    index = corpusindex(corpus, CorpusRevision)
+    return index.corpustoken, index.revision
+
+
+# a fingerprint of a compiled target (of type ttype) that's the same for any two targets that match the same signs
+#   (two targets that are the same but were compiled differently might have different fingerprints, which just means
+#   one won't use the other's cached results)
+def targetfingerprint(ttype, target):
+    return hashlib.sha1(pickle.dumps((ttype, target), protocol=pickle.HIGHEST_PROTOCOL)).hexdigest()
+
+
+# a fingerprint for a "match all" search of the targets with the given fingerprints (the same as the target's own if
+#   there's only one, since then they match the same signs)
+def combinedfingerprint(fingerprints):
+    if len(fingerprints) == 1:
+        return fingerprints[0]
+    return hashlib.sha1(" ".join(["all"] + sorted(fingerprints)).encode()).hexdigest()
+
+
+# Least-recently-used cache of the signs that match search targets; see the comment at the top of this module.
+class SearchResultCache:
+
+    def __init__(self, maxbytes=None):
+        self.maxbytes = resultcachemaxbytes if maxbytes is None else maxbytes
+        # (corpus token, revision, target fingerprint) -> (frozenset of id(sign) for the matching signs, estimated size),
+        #   least recently used first
+        self._entries = OrderedDict()
+        # corpus token -> the latest revision of it that a result has been looked up or cached for
+        self._revisions = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def enabled(self):
+        return self.maxbytes > 0
+
+    # the IDs of the signs that matched the target with the given fingerprint in the corpus at (corpus token,
+    #   revision), or None if they're not cached
+    def get(self, corpusrevision, fingerprint):
+        corpustoken, revision = corpusrevision
+        self._checkrevision(corpustoken, revision)
+        key = (corpustoken, revision, fingerprint)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, corpusrevision, fingerprint, signids):
+        corpustoken, revision = corpusrevision
+        self._checkrevision(corpustoken, revision)
+        key = (corpustoken, revision, fingerprint)
+        self._remove(key)
+        signids = frozenset(signids)
+        size = sys.getsizeof(signids) + bytespercachedsign * len(signids)
+        if size > self.maxbytes:
+            return
+        self._entries[key] = (signids, size)
+        self.bytes += size
+        self._evict()
+
+    # drop the cached results for the corpus with the given token (or for every corpus, if it's None)
+    def invalidate(self, corpustoken=None):
+        for key in [key for key in self._entries if corpustoken is None or key[0] == corpustoken]:
+            self._remove(key)
+
+    def setmaxbytes(self, maxbytes):
+        self.maxbytes = maxbytes
+        self._evict()
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'entries': len(self),
+                'bytes': self.bytes, 'max bytes': self.maxbytes}
+
+    def _checkrevision(self, corpustoken, revision):
+        if self._revisions.get(corpustoken, revision) != revision:
+            # the corpus has changed since its results were cached
+            self.invalidate(corpustoken)
+        self._revisions[corpustoken] = revision
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[1]
+
+    def _evict(self):
+        while self.bytes > self.maxbytes and self._entries:
+            _, (_, size) = self._entries.popitem(last=False)
+            self.bytes -= size
+            self.evictions += 1
+
+
+# the cache shared by all searches
+_searchresultcache = SearchResultCache()
+
+
+def searchresultcache():
+    return _searchresultcache
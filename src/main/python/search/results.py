@@ -12,7 +12,7 @@ from PyQt5.QtGui import (
     QIcon,
     QKeySequence
 )
-from PyQt5.QtCore import QModelIndex, Qt, QSize
+from PyQt5.QtCore import QModelIndex, Qt, QSize, QAbstractTableModel
 from PyQt5.Qt import (
     QStandardItem,
     QStandardItemModel, 
@@ -23,6 +23,7 @@ from PyQt5.Qt import (
 )
 
 from gui.panel import SignLevelMenuPanel, SignSummaryPanel
+from array import array
 from collections import defaultdict
 import logging, os, json, csv, sys
 import xml.etree.ElementTree as ET
@@ -40,10 +41,22 @@ class ResultHeaders:
     IDGLOSS = 7
 
 class ResultsView(QWidget):
-    def __init__(self, resultsdict, mainwindow, **kwargs):
+    # liveresults is a LiveSearchResults (see search/live_results.py) for keeping the results up to date as the corpus
+    #   changes (see handle_corpus_changed()), or None if they're not to be
+    # profile is the SearchProfile (see search/search_profile.py) for the search, shown in its own tab, or None
+    # corpuschanged is the signal that says the corpus has changed (see MainWindow.corpus_changed), if liveresults is
+    #   given; the results are only kept up to date until the window is closed, when it's deleted
+    def __init__(self, resultsdict, mainwindow, liveresults=None, profile=None, corpuschanged=None, **kwargs):
         super().__init__(**kwargs)
+        # a window of its own, even if it has a parent
+        self.setWindowFlags(self.windowFlags() | Qt.Window)
+        self.setAttribute(Qt.WA_DeleteOnClose)
         self.setWindowTitle("Search Results")
         self.resultsdict = resultsdict
+        self.liveresults = liveresults
+        self.corpuschanged = corpuschanged if liveresults is not None else None
+        if self.corpuschanged is not None:
+            self.corpuschanged.connect(self.handle_corpus_changed)
         self.mainwindow = mainwindow
         self.corpus = self.mainwindow.corpus
         self.individualresultspath = None
@@ -61,6 +74,9 @@ class ResultsView(QWidget):
         self.summary_table_view.setModel(self.summarymodel)
         self.summary_table_view.setItemDelegate(self.listdelegate)
         self.summary_table_view.setEditTriggers(QTableView.NoEditTriggers)
+        # clicking a column header sorts by it (see ResultsTableModel.sort()); the rows start in the order they were found
+        self.summary_table_view.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.summary_table_view.setSortingEnabled(True)
         summarylayout = QVBoxLayout()
         summarylayout.addWidget(self.create_toolbar("summary"))
         summarylayout.addWidget(self.summary_table_view)
@@ -74,6 +90,8 @@ class ResultsView(QWidget):
         self.individual_table_view.setItemDelegate(self.listdelegate)
         self.individual_table_view.doubleClicked.connect(self.handle_result_doubleclicked)
         self.individual_table_view.setEditTriggers(QTableView.NoEditTriggers) # disable edit via clicking table
+        self.individual_table_view.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.individual_table_view.setSortingEnabled(True)
  
         individuallayout = QVBoxLayout()
         individuallayout.addWidget(self.create_toolbar("individual"))
@@ -84,10 +102,62 @@ class ResultsView(QWidget):
         self.tab_widget.addTab(self.summarytab, "Summary")
         self.tab_widget.addTab(self.individualtab, "Individual results")
 
+        if profile is not None:
+            self.profiletab = QWidget()
+            self.profile_table_view = QTableView()
+            self.profilemodel = SearchProfileModel(profile)
+            self.profile_table_view.setModel(self.profilemodel)
+            self.profile_table_view.setEditTriggers(QTableView.NoEditTriggers)
+            self.profile_table_view.horizontalHeader().setStretchLastSection(True)
+            profilelayout = QVBoxLayout()
+            profilelayout.addWidget(QLabel(profile.summary()))
+            profilelayout.addWidget(self.profile_table_view)
+            self.profiletab.setLayout(profilelayout)
+            self.tab_widget.addTab(self.profiletab, "Search profile")
+
+        # how long each corpus took, for searches of more than one (see add_results())
+        self.timing_label = QLabel()
+        self.timing_label.setVisible(False)
+
         self.showMaximized()
         main_layout.addWidget(self.tab_widget)
+        main_layout.addWidget(self.timing_label)
         self.setLayout(main_layout)    
 
+    def closeEvent(self, event):
+        if self.corpuschanged is not None:
+            self.corpuschanged.disconnect(self.handle_corpus_changed)
+            self.corpuschanged = None
+        super().closeEvent(event)
+
+    # bring the results up to date with the corpus: only the signs that have been added, edited or removed since the
+    #   results were last brought up to date are compared with the targets again, and the rows for them are added,
+    #   updated or removed (and the frequencies updated) in place
+    def handle_corpus_changed(self):
+        if self.liveresults is None:
+            return
+        changes = self.liveresults.updatefrom(self.corpus.signs)
+        for name, sign, change in changes:
+            resultrow = self.resultsdict[name]
+            if change is None:
+                self.individualmodel.update_result(name, resultrow, sign)
+            elif change:
+                self.individualmodel.add_result(name, resultrow, sign.signlevel_information)
+            else:
+                self.individualmodel.remove_result(name, resultrow, sign)
+        for name in set(name for name, _, _ in changes):
+            self.summarymodel.set_frequency(name, self.resultsdict[name]["corpuspath"], self.liveresults.frequency(name))
+
+    # add the results of searching another corpus (from SearchModel.search_corpora()) to both tables, along with how
+    #   long it took
+    def add_results(self, resultsdict, corpuspath, loadseconds, searchseconds):
+        self.summarymodel.populate(resultsdict)
+        self.individualmodel.populate(resultsdict)
+        timing = "{}: loaded in {:.2f} s, searched in {:.2f} s".format(
+            os.path.basename(corpuspath), loadseconds, searchseconds)
+        self.timing_label.setText("\n".join(filter(None, [self.timing_label.text(), timing])))
+        self.timing_label.setVisible(True)
+
     def create_toolbar(self, label):
         toolbar = QToolBar(f'{label} toolbar', parent=self)
         toolbar.setIconSize(QSize(16, 16))
@@ -115,18 +185,12 @@ class ResultsView(QWidget):
             model = self.summarymodel
             self.summaryresultspath = directory
         if ".json" in selected_filter:
-            formatted = model.format_results()
-            with open(directory, 'w') as f:
-                json.dump(formatted, f)
+            fileformat = "json"
         elif ".xml" in selected_filter:
-            xml = model.format_results_as_xml()
-            xml.write(directory, encoding="utf-8")
+            fileformat = "xml"
         else:
-            with open(directory, 'w', newline='') as tsvfile:
-                writer = csv.writer(tsvfile, delimiter='\t', lineterminator='\n')
-                writer.writerow(model.headers)
-                for row in range(model.rowCount()):
-                    writer.writerow([model.entry(row, col) for col in range(model.columnCount())])
+            fileformat = "tsv"
+        write_results(model, directory, fileformat)
 
         folder, _ = os.path.split(file_name)
         if folder:
@@ -161,6 +225,12 @@ class ResultsView(QWidget):
             self.save_results_to_file(file_name, tab_label, selected_filter)
 
     def handle_result_doubleclicked(self, index):
+        corpusname = self.individualmodel.entry(index.row(), ResultHeaders.CORPUS)
+        if self.corpus is None or self.individualmodel.corpus_path(index.row()) != self.corpus.path:
+            # (the other corpora in a search of several aren't kept once they've been searched)
+            QMessageBox.information(self, "Search result", "Only results from the open corpus can be viewed here; open "
+                                    + corpusname + " to view this one.")
+            return
         entryid = self.individualmodel.entry_id(index.row())
         for s in self.corpus.signs:
             if s.signlevel_information.entryid == entryid:
@@ -185,6 +255,24 @@ class ResultsView(QWidget):
         
         
 
+# Writes the results in model (a ResultSummaryModel or IndividualSummaryModel) to the file at path, as fileformat:
+#   "json", "xml", or "tsv" (anything else is also written as tsv)
+def write_results(model, path, fileformat):
+    if fileformat == "json":
+        formatted = model.format_results()
+        with open(path, 'w') as f:
+            json.dump(formatted, f)
+    elif fileformat == "xml":
+        xml = model.format_results_as_xml()
+        xml.write(path, encoding="utf-8")
+    else:
+        with open(path, 'w', newline='') as tsvfile:
+            writer = csv.writer(tsvfile, delimiter='\t', lineterminator='\n')
+            writer.writerow(model.headers)
+            for row in range(model.rowCount()):
+                writer.writerow([model.entry(row, col) for col in range(model.columnCount())])
+
+
 class ListDelegate(QStyledItemDelegate):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -194,15 +282,125 @@ class ListDelegate(QStyledItemDelegate):
             return display_text
         return super().displayText(value, locale)
 
-class ResultSummaryModel(QStandardItemModel):
+# Results tables don't have an item per cell: each row is kept as an index into a list of ResultSets (and, for the
+# individual results, a matching sign's entry ID counter) in compact arrays, and what's shown in each cell is only worked
+# out when the view asks for it. So even a broad search over a large corpus, with tens of thousands of matches, doesn't
+# take long to show.
+
+
+# The results for one target (or, for a "match all" search, for all the targets together) in one corpus; resultrow is
+#   the target's value in the resultsdict from SearchModel.search_corpus(). The corpus is told apart from others by its
+#   path (two corpora searched together can have the same file name); its file name is only for showing.
+class ResultSet:
+    __slots__ = ('targetname', 'corpus', 'corpuspath', 'display', 'negative')
+
+    def __init__(self, targetname, resultrow):
+        self.targetname = targetname
+        self.corpus = resultrow["corpus"]
+        self.corpuspath = resultrow["corpuspath"]
+        self.display = resultrow["display"]
+        self.negative = resultrow["negative"]
+
+    # what's shown in column col, which is one of the columns that both results tables start with
+    def value(self, col):
+        if col == ResultHeaders.CORPUS:
+            return self.corpus
+        elif col == ResultHeaders.NAME:
+            return self.targetname
+        elif col == ResultHeaders.VALUES:
+            return self.display
+        return self.negative
+
+
+# what a value in a results table is sorted by: lists and tuples as ListDelegate shows them, and strings regardless of case
+def sortkey(value):
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        value = '; '.join(str(v) for v in value)
+    return value.casefold() if isinstance(value, str) else value
+
+
+# Base class for the results tables; subclasses keep their rows, and implement entry() (what's shown in a cell) and
+#   sortkeys() and reorder() (for sorting).
+class ResultsTableModel(QAbstractTableModel):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.headers = []
+        self.resultsets = []
+        # (target name, corpus path) -> index in resultsets of the latest result set for them
+        self.resultsetindices = {}
+
+    def newresultset(self, targetname, resultrow):
+        self.resultsets.append(ResultSet(targetname, resultrow))
+        self.resultsetindices[(targetname, resultrow["corpuspath"])] = len(self.resultsets) - 1
+        return len(self.resultsets) - 1
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole and 0 <= section < len(self.headers):
+            return self.headers[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if index.isValid() and role == Qt.DisplayRole:
+            return self.entry(index.row(), index.column())
+        return None
+
+    def entry(self, row, col):
+        raise NotImplementedError
+
+    # the key to sort each row by for column, in row order
+    def sortkeys(self, column):
+        raise NotImplementedError
+
+    # put the rows in the order given by permutation (the current row numbers, in their new order)
+    def reorder(self, permutation):
+        raise NotImplementedError
+
+    # (sorts are stable, so a column can be sorted by after another; a column of -1 leaves the rows as they are)
+    def sort(self, column, order=Qt.AscendingOrder):
+        if not 0 <= column < len(self.headers):
+            return
+        keys = self.sortkeys(column)
+        permutation = sorted(range(len(keys)), key=keys.__getitem__, reverse=order == Qt.DescendingOrder)
+        self.layoutAboutToBeChanged.emit()
+        newrows = [0] * len(permutation)
+        for newrow, oldrow in enumerate(permutation):
+            newrows[oldrow] = newrow
+        self.reorder(permutation)
+        oldindexes = self.persistentIndexList()
+        self.changePersistentIndexList(oldindexes, [self.index(newrows[index.row()], index.column())
+                                                    for index in oldindexes])
+        self.layoutChanged.emit()
+
+
+class ResultSummaryModel(ResultsTableModel):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
         self.headers = ["Corpus", "Target Name(s)", "Target Value(s)", "Result Type(s)", "Frequency"]
-        self.setHorizontalHeaderLabels(self.headers)
-    
+        # each row's result set (index in resultsets)
+        self._rowresultsets = array('i')
+        # each result set's frequency
+        self._frequencies = array('q')
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rowresultsets)
+
     def entry(self, row, col):
-        return self.index(row, col).data(Qt.DisplayRole)
+        resultsetindex = self._rowresultsets[row]
+        if col == ResultHeaders.FREQUENCY:
+            return self._frequencies[resultsetindex]
+        return self.resultsets[resultsetindex].value(col)
+
+    def sortkeys(self, column):
+        return [sortkey(self.entry(row, column)) for row in range(self.rowCount())]
+
+    def reorder(self, permutation):
+        self._rowresultsets = array('i', (self._rowresultsets[row] for row in permutation))
 
     def format_results(self):
         """
@@ -232,12 +430,12 @@ class ResultSummaryModel(QStandardItemModel):
         # now, create an xml/json-friendly structure
         formatted_results = [] 
         for name in target_dict:
-            reference_row = target_dict[name][corpus][0] # just grab the first row under this target name so that we can get the target values and result types later
+            reference_row = next(iter(target_dict[name].values()))[0] # just grab the first row under this target name so that we can get the target values and result types later
             results = []
             for corpus in target_dict[name]:
                 this_result = {
                     self.headers[ResultHeaders.CORPUS]: corpus,
-                    "Frequency": self.entry(row, ResultHeaders.FREQUENCY)
+                    "Frequency": self.entry(target_dict[name][corpus][0], ResultHeaders.FREQUENCY)
                 }
                 results.append(this_result)
 
@@ -283,33 +481,98 @@ class ResultSummaryModel(QStandardItemModel):
         return ET.ElementTree(root)
     
     def populate(self, resultsdict): 
+        if not resultsdict:
+            return
+        self.beginInsertRows(QModelIndex(), self.rowCount(), self.rowCount() + len(resultsdict) - 1)
         for targetname in resultsdict:
             resultrow = resultsdict[targetname]
-            name = QStandardItem()
-            name.setData(targetname, Qt.DisplayRole)
-            values = QStandardItem()
-            values.setData(resultrow["display"], Qt.DisplayRole)
-            corpus = QStandardItem()
-            corpus.setData(resultrow["corpus"], Qt.DisplayRole)
-            resulttypes = QStandardItem()
-            resulttypes.setData(resultrow["negative"], Qt.DisplayRole)
-            frequency = QStandardItem()
-            frequency.setData(len(resultrow["signs"]), Qt.DisplayRole)
-
-            self.appendRow([corpus, name, values, resulttypes, frequency])
-
-class IndividualSummaryModel(QStandardItemModel):
+            self._rowresultsets.append(self.newresultset(targetname, resultrow))
+            self._frequencies.append(len(resultrow["signs"]))
+        self.endInsertRows()
+
+    def set_frequency(self, targetname, corpuspath, frequency):
+        resultsetindex = self.resultsetindices[(targetname, corpuspath)]
+        self._frequencies[resultsetindex] = frequency
+        row = self._rowresultsets.index(resultsetindex)
+        self.dataChanged.emit(self.index(row, ResultHeaders.FREQUENCY), self.index(row, ResultHeaders.FREQUENCY))
+
+# One row per target of a search, with the times and counts from its SearchProfile (see search/search_profile.py).
+class SearchProfileModel(QStandardItemModel):
+    def __init__(self, profile, **kwargs):
+        super().__init__(**kwargs)
+
+        self.headers = ["Target Name", "Result Type", "Candidates", "Compared", "Passed", "Time (ms)", "Modules Ruled Out"]
+        self.setHorizontalHeaderLabels(self.headers)
+        for targetprofile in profile.targets:
+            name = ("NOT " if targetprofile.negative else "") + str(targetprofile.name)
+            if targetprofile.cached:
+                values = [name, targetprofile.ttype, "cached", "", "", "", ""]
+            else:
+                values = [name, targetprofile.ttype, targetprofile.candidatesdisplay(), str(targetprofile.compared),
+                          str(targetprofile.passed), "{:.1f}".format(targetprofile.seconds * 1000),
+                          targetprofile.stagesdisplay()]
+            self.appendRow([QStandardItem(str(value)) for value in values])
+
+    def entry(self, row, col):
+        return self.index(row, col).data(Qt.DisplayRole)
+
+
+class IndividualSummaryModel(ResultsTableModel):
+    # the SignLevelInformation attribute shown in each of the columns after the entry ID
+    entrycolumns = {ResultHeaders.GLOSS: 'gloss', ResultHeaders.LEMMA: 'lemma', ResultHeaders.IDGLOSS: 'idgloss'}
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
         self.headers = ["Corpus", "Target Name(s)",  "Target Value(s)", "Result Type(s)", "Entry ID", "Gloss(es)", "Lemma", "ID Gloss"]
-        self.setHorizontalHeaderLabels(self.headers)
-    
+        # each row's result set (index in resultsets) and the entry ID counter of its sign
+        self._rowresultsets = array('i')
+        self._rowcounters = array('q')
+        # corpus path -> {entry ID counter: SignLevelInformation} for the signs in the results (each only once, however
+        #   many targets it matches)
+        self.entries = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rowresultsets)
+
+    def corpus_path(self, row):
+        return self.resultsets[self._rowresultsets[row]].corpuspath
+
+    def signlevelinfo(self, row):
+        return self.entries[self.corpus_path(row)][self._rowcounters[row]]
+
     def entry_id(self, row):
-        return self.index(row, ResultHeaders.ID).data(Qt.UserRole)
+        return self.signlevelinfo(row).entryid
     
     def entry(self, row, col):
-        return self.index(row, col).data(Qt.DisplayRole)
+        if col < ResultHeaders.ID:
+            return self.resultsets[self._rowresultsets[row]].value(col)
+        sli = self.signlevelinfo(row)
+        if col == ResultHeaders.ID:
+            return sli.entryid.display_string()
+        return getattr(sli, self.entrycolumns[col])
+
+    def data(self, index, role=Qt.DisplayRole):
+        if index.isValid() and role == Qt.UserRole and index.column() == ResultHeaders.ID:
+            return self.entry_id(index.row())
+        return super().data(index, role)
+
+    # (target names and the like are worked out once per result set, and sign-level info once per sign)
+    def sortkeys(self, column):
+        if column < ResultHeaders.ID:
+            resultsetkeys = [sortkey(resultset.value(column)) for resultset in self.resultsets]
+            return [resultsetkeys[resultsetindex] for resultsetindex in self._rowresultsets]
+        if column == ResultHeaders.ID:
+            return list(self._rowcounters)
+        attr = self.entrycolumns[column]
+        entrykeys = {corpuspath: {counter: sortkey(getattr(sli, attr)) for counter, sli in entries.items()}
+                     for corpuspath, entries in self.entries.items()}
+        return [entrykeys[self.resultsets[resultsetindex].corpuspath][counter]
+                for resultsetindex, counter in zip(self._rowresultsets, self._rowcounters)]
+
+    def reorder(self, permutation):
+        self._rowresultsets = array('i', (self._rowresultsets[row] for row in permutation))
+        self._rowcounters = array('q', (self._rowcounters[row] for row in permutation))
     
     def format_results(self):
         """
@@ -344,7 +607,7 @@ class IndividualSummaryModel(QStandardItemModel):
         # now, create an xml/json-friendly structure
         formatted_results = [] 
         for name in target_dict:
-            reference_row = target_dict[name][corpus][0] # just grab the first row under this target name so that we can get the target values and result types later
+            reference_row = next(iter(target_dict[name].values()))[0] # just grab the first row under this target name so that we can get the target values and result types later
             results = []
             for corpus in target_dict[name]:
                 this_result = {
@@ -403,29 +666,75 @@ class IndividualSummaryModel(QStandardItemModel):
                         match_elem.set(attrib, v)
         return ET.ElementTree(root)
 
-
-
-
-
     def populate(self, resultsdict):
+        numrows = sum(len(resultrow["signs"]) for resultrow in resultsdict.values())
+        if not numrows:
+            return
+        self.beginInsertRows(QModelIndex(), self.rowCount(), self.rowCount() + numrows - 1)
         for targetname in resultsdict:
             resultrow = resultsdict[targetname]
+            resultsetindex = self.newresultset(targetname, resultrow)
+            entries = self.entries.setdefault(resultrow["corpuspath"], {})
             for sli in resultrow["signs"]: # signlevelinformation objects
-                name = QStandardItem()
-                name.setData(targetname, Qt.DisplayRole)
-                values = QStandardItem()
-                values.setData(resultrow["display"], Qt.DisplayRole)
-                corpus = QStandardItem()
-                corpus.setData(resultrow["corpus"], Qt.DisplayRole)
-                resulttypes = QStandardItem()
-                resulttypes.setData(resultrow["negative"], Qt.DisplayRole)
-                entryid = QStandardItem()
-                entryid.setData(sli.entryid, Qt.UserRole)
-                entryid.setData(sli.entryid.display_string(), Qt.DisplayRole)
-                gloss = QStandardItem()
-                gloss.setData(sli.gloss, Qt.DisplayRole)
-                lemma = QStandardItem()
-                lemma.setData(sli.lemma, Qt.DisplayRole)
-                idgloss = QStandardItem()
-                idgloss.setData(sli.idgloss, Qt.DisplayRole)
-                self.appendRow([corpus, name, values, resulttypes, entryid, gloss, lemma, idgloss])
\ No newline at end of file
+                counter = sli.entryid.counter
+                entries[counter] = sli
+                self._rowresultsets.append(resultsetindex)
+                self._rowcounters.append(counter)
+        self.endInsertRows()
+
+    def add_result(self, targetname, resultrow, sli):
+        resultsetindex = self.resultsetindices.get((targetname, resultrow["corpuspath"]))
+        if resultsetindex is None:
+            resultsetindex = self.newresultset(targetname, resultrow)
+        self.entries.setdefault(resultrow["corpuspath"], {})[sli.entryid.counter] = sli
+        self.beginInsertRows(QModelIndex(), self.rowCount(), self.rowCount())
+        self._rowresultsets.append(resultsetindex)
+        self._rowcounters.append(sli.entryid.counter)
+        self.endInsertRows()
+
+    # the entry ID counter that sign's results in the corpus at corpuspath are under (which is its current one, unless
+    #   it's changed since they were added), or None if there aren't any
+    def sign_counter(self, corpuspath, sign):
+        entries = self.entries.get(corpuspath, {})
+        counter = sign.signlevel_information.entryid.counter
+        sli = entries.get(counter)
+        if sli is not None and sli.parentsign is sign:
+            return counter
+        return next((counter for counter, sli in entries.items() if sli.parentsign is sign), None)
+
+    # the row for sign in the results for targetname in resultrow's corpus, or -1 if there isn't one
+    def result_row(self, targetname, resultrow, sign):
+        resultsetindex = self.resultsetindices.get((targetname, resultrow["corpuspath"]))
+        counter = self.sign_counter(resultrow["corpuspath"], sign)
+        if resultsetindex is None or counter is None:
+            return -1
+        for row, (rowresultset, rowcounter) in enumerate(zip(self._rowresultsets, self._rowcounters)):
+            if rowresultset == resultsetindex and rowcounter == counter:
+                return row
+        return -1
+
+    # show the sign's current sign-level info in its row
+    def update_result(self, targetname, resultrow, sign):
+        row = self.result_row(targetname, resultrow, sign)
+        if row < 0:
+            return
+        corpuspath = resultrow["corpuspath"]
+        counter = self._rowcounters[row]
+        newcounter = sign.signlevel_information.entryid.counter
+        entries = self.entries[corpuspath]
+        del entries[counter]
+        entries[newcounter] = sign.signlevel_information
+        if newcounter != counter:
+            # (the sign's rows for other targets are moved to its new counter too)
+            for otherrow, rowresultset in enumerate(self._rowresultsets):
+                if self._rowcounters[otherrow] == counter and self.resultsets[rowresultset].corpuspath == corpuspath:
+                    self._rowcounters[otherrow] = newcounter
+        self.dataChanged.emit(self.index(row, 0), self.index(row, self.columnCount() - 1))
+
+    def remove_result(self, targetname, resultrow, sign):
+        row = self.result_row(targetname, resultrow, sign)
+        if row >= 0:
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self._rowresultsets[row]
+            del self._rowcounters[row]
+            self.endRemoveRows()
\ No newline at end of file
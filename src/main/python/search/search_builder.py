@@ -31,9 +31,11 @@ from PyQt5.QtWidgets import (
     QStyledItemDelegate,
     QAction,
 )
+from gui.background_job import BackgroundJob, runjob
 from gui.decorator import check_unsaved_search_targets
 from gui.undo_command import TranscriptionUndoCommand
 from search.results import ResultsView
+from search.search_profile import SearchProfile
 import logging
 from gui.xslotspecification_view import XslotSelectorDialog, XslotStructure
 from constant import TargetTypes, HAND, ARM, LEG
@@ -42,7 +44,7 @@ from PyQt5.QtCore import Qt, pyqtSignal, QObject, pyqtSlot
 from lexicon.lexicon_classes import Sign, SignLevelInformation
 from gui.panel import SignLevelMenuPanel
 from lexicon.module_classes import AddedInfo, TimingInterval, TimingPoint, ParameterModule, ModuleTypes, XslotStructure, RelationModule
-from search.search_models import SearchModel, TargetHeaders, SearchValuesItem
+from search.search_models import SearchModel, TargetHeaders, SearchValuesItem, load_search_binary
 from gui.signlevelinfospecification_view import SignlevelinfoSelectorDialog, SignLevelInformation
 from search.search_classes import *
 class SearchWindow(QMainWindow):
@@ -121,6 +123,13 @@ class SearchWindow(QMainWindow):
         action_saveas.triggered.connect(self.on_action_save_as)
         file_menu.addAction(action_saveas)
 
+        file_menu.addSeparator()
+
+        # search other corpora
+        action_searchcorpora = QAction('Search corpus files...', self)
+        action_searchcorpora.triggered.connect(self.on_action_search_corpora)
+        file_menu.addAction(action_searchcorpora)
+
         settings_menu = menu_bar.addMenu('Settings')
 
     def on_action_load(self):
@@ -201,8 +210,9 @@ class SearchWindow(QMainWindow):
         # search_param_window.setGeometry(int(2*w/3), int(1/2*h), int(1*w/3), int(1/2*h))
 
         
-    def handle_search_clicked(self, type):
-        
+    # sets the search model's parameters from the search parameters view, and returns whether they're all there
+    #   (showing a warning if not)
+    def set_search_params(self, type):
         mssg = ""
         if self.search_params_view.match_type is None: 
             mssg += "Missing match type."
@@ -212,15 +222,62 @@ class SearchWindow(QMainWindow):
             mssg += "\nNothing to search"
         if mssg != "":
             QMessageBox.critical(self, "Warning", mssg)
-        else:
-            self.searchmodel.searchtype = type
-            self.searchmodel.matchtype = self.search_params_view.match_type
-            self.searchmodel.matchdegree = self.search_params_view.match_degree
-
-            resultsdict = self.searchmodel.search_corpus(self.corpus)
-            self.results_view = ResultsView(resultsdict, mainwindow=self)
+            return False
+        self.searchmodel.searchtype = type
+        self.searchmodel.matchtype = self.search_params_view.match_type
+        self.searchmodel.matchdegree = self.search_params_view.match_degree
+        return True
+
+    # the search runs in the background, showing its progress (and able to be cancelled); the results window also shows
+    #   where the search's time went (see search/search_profile.py)
+    # the search reads the corpus's signs and the targets, so the whole app is blocked until it's finished
+    def handle_search_clicked(self, type):
+        if self.set_search_params(type):
+            profile = SearchProfile()
+            job = runjob(BackgroundJob(lambda job: self.searchmodel.search_corpus(self.corpus, job=job, profile=profile)),
+                         "Searching", parent=self, applicationmodal=True)
+            job.deleteLater()
+            if job.cancelled:
+                return
+            elif job.error is not None:
+                QMessageBox.critical(self, "Error searching corpus", "The search could not be finished:\n" + str(job.error))
+                return
+            resultsdict = job.result
+            liveresults = self.searchmodel.live_results(self.corpus, resultsdict)
+            # (kept up to date as signs are edited in the main window, which it belongs to so that it stays open until
+            #   it's closed, whatever happens to this search window)
+            self.results_view = ResultsView(resultsdict, mainwindow=self, liveresults=liveresults, profile=profile,
+                                            corpuschanged=self.app_ctx.main_window.corpus_changed,
+                                            parent=self.app_ctx.main_window)
             self.results_view.show()
-        
+
+    # search the corpus files the user picks (rather than the open corpus), one at a time in the background, adding
+    #   each one's results to a new results window as soon as it's been searched
+    def on_action_search_corpora(self):
+        if not self.set_search_params("new"):
+            return
+        file_names, _ = QFileDialog.getOpenFileNames(self,
+                                                     self.tr('Select Corpora to Search'),
+                                                     self.app_settings['storage']['recent_folder'],
+                                                     self.tr('SLP-AA Corpus (*.slpaa)'))
+        if not file_names:
+            return
+        mainwindow = self.app_ctx.main_window
+        self.results_view = ResultsView({}, mainwindow=self, parent=mainwindow)
+        self.results_view.show()
+
+        def search_corpora(job):
+            for i, (corpuspath, resultsdict, loadseconds, searchseconds) in enumerate(self.searchmodel.search_corpora(
+                    file_names, lambda path: mainwindow.load_corpus_binary(path, job),
+                    searchcorpus=lambda corpus: self.searchmodel.search_corpus(corpus, job=job))):
+                job.inmainthread(self.results_view.add_results, resultsdict, corpuspath, loadseconds, searchseconds)
+                job.startphase("Searched " + str(i + 1) + " of " + str(len(file_names)) + " corpora")
+
+        job = runjob(BackgroundJob(search_corpora), "Searching corpora", parent=self, applicationmodal=True)
+        job.deleteLater()
+        if job.error is not None:
+            QMessageBox.critical(self, "Error searching corpora", "The search could not be finished:\n" + str(job.error))
+
 
 
 
@@ -244,11 +301,7 @@ class SearchWindow(QMainWindow):
         self.unsaved_changes = False
     
     def load_search_binary(self, path):
-        with open(path, 'rb') as f:
-            searchmodel = SearchModel(serializedsearchmodel=pickle.load(f))
-            # in case we're loading a corpus that was originally created on a different machine / in a different folder
-            searchmodel.path = path
-            return searchmodel
+        return load_search_binary(path)
     
     def handle_slot_edit(self, slot, old_prop, new_prop):
         undo_command = TranscriptionUndoCommand(slot, old_prop, new_prop)
@@ -1,4 +1,4 @@
-import io, os
+import io, os, pickle, time
 
 
 import copy 
@@ -15,17 +15,28 @@ from PyQt5.QtWidgets import QStyledItemDelegate, QMessageBox
 
 from PyQt5.QtCore import QModelIndex, Qt
 from gui.panel import SignLevelMenuPanel
+from gui.background_job import ForegroundJob
+from lexicon.lexicon_classes import decodesigns
 from lexicon.module_classes import (AddedInfo, TimingInterval, TimingPoint, ParameterModule, 
                                     ModuleTypes, BodypartInfo, MovementModule, LocationModule, RelationModule,
                                     HandConfigurationHand, PREDEFINED_MAP)
 from constant import TargetTypes, HAND, ARM, LEG, HandConfigSlots
 import logging
 
-from models.movement_models import MovementTreeModel
-from models.location_models import LocationTreeModel, BodypartTreeModel
+from models.movement_models import compactmovementtree
+from models.location_models import BodypartTreeModel, compactlocationtree
 from serialization_classes import LocationModuleSerializable, MovementModuleSerializable, RelationModuleSerializable
 from search.helper_functions import *
 from search.search_classes import SearchTargetItem
+from search.sign_index import corpusindex
+from search.path_index import PathIndex, indexedtargettypes
+from search.handshape_index import HandshapeIndex
+from search.compiled_targets import compiletarget
+from search.query_planner import PlanStep, planquery, matchingsignsforeach
+from search.parallel_search import matchingsignsparallel
+from search.result_cache import searchresultcache, corpusrevision, targetfingerprint, combinedfingerprint
+from search.live_results import LiveSearchResults
+from search.search_profile import SearchProfile
 
 
 
@@ -54,6 +65,8 @@ class SearchModel(QStandardItemModel):
         self._matchtype = None # exact / minimal
         self._matchdegree = None # any / all
         self._searchtype = None # new / add
+        # target name -> the QueryPlan (see search/query_planner.py) used for it in the last search_corpus(), for debugging
+        self.searchplans = {}
 
         self.sign = sign
 
@@ -142,10 +155,28 @@ class SearchModel(QStandardItemModel):
                 rows.append(row)
         return rows
 
-    def search_corpus(self, corpus): # TODO potentially add a rows_to_skip for adding on to existing results table
+    # if processes is given, signs are compared with the targets in that many worker processes (see
+    #   search/parallel_search.py); the results are the same either way
+    # job is the BackgroundJob this is running in, if any: the signs that haven't been decoded yet are decoded on the GUI
+    #   thread first (since decoding builds Qt models), and the rest of the search happens on the job's thread, reporting
+    #   how many signs have been compared and matches found, and stopping if the job is cancelled
+    # profile is a SearchProfile (see search/search_profile.py) to record per-target times and counts in, or None
+    def search_corpus(self, corpus, processes=None, job=None, profile=None): # TODO potentially add a rows_to_skip for adding on to existing results table
+        start = time.perf_counter()
         corpusname = os.path.split(corpus.path)[1]
         selected_rows = self.get_selected_rows()       
         resultsdict = {}
+        # target name -> the QueryPlan used to search for it (for debugging)
+        self.searchplans = {}
+        if job is not None and not all(sign.decoded for sign in corpus.signs):
+            job.startphase("Reading signs", sum(1 for sign in corpus.signs if not sign.decoded))
+            undecoded, serializedsigns = corpus.prepareundecoded(parallel=True, processes=processes, progress=job.setprogress)
+            job.inmainthreadbatches("Decoding signs", decodesigns, list(zip(undecoded, serializedsigns)))
+        job = job or ForegroundJob()
+        if profile is not None:
+            profile.numsigns = len(corpus.signs)
+            # (a profiled search compares every sign in this process; see SearchProfile)
+            processes = None
         
 
         if self.matchdegree == 'all':
@@ -161,188 +192,228 @@ class SearchModel(QStandardItemModel):
                 else:
                     negative_rows.append("Positive")
             target_name = tuple(self.target_name(row) for row in selected_rows)
-            matchingsigns = []
-            for sign in corpus.signs:
-                if self.sign_matches_target(sign, target_dict):
-                    matchingsigns.append(sign.signlevel_information)
-            resultsdict[target_name] = {"corpus": corpusname, "display": display_vals,"signs": matchingsigns, "negative": negative_rows}
+            cache = searchresultcache()
+            signids = cachedids = compiledsteps = None
+            if cache.enabled:
+                # the whole search's results if they're cached; otherwise, the targets whose own results are cached
+                #   (eg from a "match any" search) narrow down the candidates, and the rest are planned as usual
+                compiledsteps = {row: self.plan_step(self.target_type(row), row) for row in selected_rows}
+                steps = list(compiledsteps.values())
+                fingerprints = [targetfingerprint(step.ttype, step.target) for step in steps]
+                revision = corpusrevision(corpus)
+                signids = cache.get(revision, combinedfingerprint(fingerprints))
+                if signids is not None:
+                    if profile is not None:
+                        for step in steps:
+                            profile.cachedstep(step, len(corpus.signs))
+                else:
+                    target_dict = defaultdict(list)
+                    for row, step, fingerprint in zip(selected_rows, steps, fingerprints):
+                        ids = cache.get(revision, fingerprint)
+                        if ids is None:
+                            target_dict[step.ttype].append(row)
+                            continue
+                        cachedids = ids if cachedids is None else cachedids & ids
+                        if profile is not None:
+                            profile.cachedstep(step, len(corpus.signs))
+                    if not target_dict:
+                        signids = cachedids
+            if signids is None:
+                plan = self.plan_search(corpus, target_dict, profile, cachedids, compiledsteps)
+                self.searchplans[target_name] = plan
+                logging.debug("search plan for %s:\n%s", target_name, plan)
+                if profile is not None:
+                    for step in plan.steps:
+                        profile.profilestep(step, len(corpus.signs))
+                job.startphase("Searching", len(plan.candidates))
+                signs = self.matching_signs(plan, processes, searchprogress(job))
+                signids = frozenset(id(sign) for sign in signs)
+            else:
+                signs = [sign for sign in corpus.signs if id(sign) in signids]
+            if cache.enabled:
+                # (looking at signs might have decoded them, which can change the corpus's revision)
+                cache.put(corpusrevision(corpus), combinedfingerprint(fingerprints), signids)
+            matchingsigns = [sign.signlevel_information for sign in signs]
+            resultsdict[target_name] = {"corpus": corpusname, "corpuspath": corpus.path, "display": display_vals,"signs": matchingsigns, "negative": negative_rows}
         
         elif self.matchdegree == 'any':
-            for row in selected_rows:
+            for row, signids in zip(selected_rows, self.matching_sign_ids(corpus, selected_rows, processes, job, profile)):
                 negative_rows = [] 
-                target_dict = {self.target_type(row): [row]}
                 if self.is_negative(row):
                     negative_rows.append("Negative")
                 else:
                     negative_rows.append("Positive")
                 target_name = self.target_name(row)
-                matchingsigns = [] # each element is a gloss/id tuple
-                for sign in corpus.signs:
-                    if self.sign_matches_target(sign, target_dict):
-                        matchingsigns.append(sign.signlevel_information)
-                resultsdict[target_name] = {"corpus": corpusname, "display": self.target_display(row), "signs": matchingsigns, "negative": negative_rows}
+                matchingsigns = [sign.signlevel_information for sign in corpus.signs if id(sign) in signids] # each element is a gloss/id tuple
+                resultsdict[target_name] = {"corpus": corpusname, "corpuspath": corpus.path, "display": self.target_display(row), "signs": matchingsigns, "negative": negative_rows}
 
+        logging.debug("search result cache: %s", searchresultcache().stats())
+        if profile is not None:
+            profile.seconds = time.perf_counter() - start
+            logging.debug("search profile: %s", profile)
         return resultsdict
-    
-    def sign_matches_target(self, sign, target_dict={}):
-        # ORDER: xslot, sign level, sign type, mvmt, locn, reln
-        if TargetTypes.XSLOT in target_dict: # one module per sign
-            if not self.sign_matches_xslot(target_dict[TargetTypes.XSLOT], sign):
-                return False
-            
-        if TargetTypes.SIGNLEVELINFO in target_dict: # one module per sign
-            if not self.sign_matches_SLI(target_dict[TargetTypes.SIGNLEVELINFO], sign):
-                return False
-
-        if TargetTypes.SIGNTYPEINFO in target_dict: # one module per sign
-            if not self.sign_matches_ST(target_dict[TargetTypes.SIGNTYPEINFO], sign):
-                return False
-            
-        # TODO: I added a quick fix for the problem where "match all" doesn't work for two targets with the same target / module type.
-        # But there should be a better way to do this
-        # E.g. save a module object containing the info from all targets of one type, and pass that to the "filter modules" functions (in mvmt, locn, and reln)
-        
-        if ModuleTypes.HANDCONFIG in target_dict: 
-            hc_rows, ef_rows = [], []
-            for r in target_dict[ModuleTypes.HANDCONFIG]:
-                module_type = self.target_module(r).moduletype
-                if module_type == ModuleTypes.HANDCONFIG:
-                    hc_rows.append(r)
-                elif module_type == TargetTypes.EXTENDEDFINGERS:
-                    ef_rows.append(r)
-
-            if hc_rows and not self.sign_matches_handconfig(hc_rows, sign):
-                return False
-
-            if ef_rows and not self.sign_matches_extendedfingers(ef_rows, sign):
-                return False
-            
-        if ModuleTypes.ORIENTATION in target_dict: 
-            modules_to_check = [m for m in sign.getmoduledict(ModuleTypes.ORIENTATION).values()]
-            target_rows = target_dict[ModuleTypes.ORIENTATION]
-            for row in target_rows:
-                target_module = self.target_module(row)
-                orientation_matching = filter_modules_by_target_orientation(modules_to_check, target_module, matchtype=self.matchtype)
-                if not (self.is_negative(row) ^ bool(orientation_matching)):
-                    return False
-
-        for ttype in [ModuleTypes.MOVEMENT, ModuleTypes.LOCATION, ModuleTypes.RELATION]:
-            if ttype in target_dict:                
-                modules_to_check = [m for m in sign.getmoduledict(ttype).values()]
-                if not modules_to_check:
-                    return False
-                target_rows = target_dict[ttype]
-                for row in target_rows:
-                    matching_modules = modules_to_check
-                    terminate_early = True if row == target_rows[-1] else False
-                    # TODO match xslottype
-                    target_module = self.target_module(row)
-                    if ttype == ModuleTypes.LOCATION:
-                        matching_modules = filter_modules_by_target_locn(matching_modules, target_module, matchtype=self.matchtype, terminate_early=terminate_early)
-                    elif ttype == ModuleTypes.MOVEMENT:
-                        matching_modules = filter_modules_by_target_mvmt(matching_modules, target_module, matchtype=self.matchtype, terminate_early=terminate_early)
-                    elif ttype == ModuleTypes.RELATION:
-                        matching_modules = filter_modules_by_target_reln(matching_modules, target_module, matchtype=self.matchtype, terminate_early=terminate_early)
-
-                    if not matching_modules: return False    
-
-        for ttype in [TargetTypes.LOC_REL, TargetTypes.MOV_REL]:
-            if ttype in target_dict:
-                anchortype = ModuleTypes.LOCATION if ttype == TargetTypes.LOC_REL else ModuleTypes.MOVEMENT
-                modules_to_check = [m for m in sign.getmoduledict(ModuleTypes.RELATION).values() if m.relationy.linkedmoduletype == anchortype]
-                if not modules_to_check: return False
-                target_rows = target_dict[ttype]
-                for row in target_rows:  
-                    matching_relation_modules = modules_to_check
-                    terminate_early = True if row == target_rows[-1] else False
-                    target_reln_module = self.target_associatedrelnmodule(row)
-                    matching_relation_modules = filter_modules_by_target_reln(matching_relation_modules, target_reln_module, matchtype=self.matchtype, terminate_early=terminate_early)
-                    if not matching_relation_modules: return False
-                    anchormodulelist = []
-                    for m in matching_relation_modules:
-                        anchormod = sign.getmoduledict(anchortype)[m.relationy.linkedmoduleids[0]]
-                        anchormodulelist.append(anchormod)
-                        # TODO: terminate early?
-                        if ttype == TargetTypes.LOC_REL:
-                            anchormodulelist = filter_modules_by_target_locn(anchormodulelist, self.target_module(row), matchtype=self.matchtype, terminate_early=False)
-                        elif ttype == TargetTypes.MOV_REL:
-                            anchormodulelist = filter_modules_by_target_mvmt(anchormodulelist, self.target_module(row), matchtype=self.matchtype, terminate_early=False)
-                        if not anchormodulelist: return False
-        return True
-    
-    def sign_matches_xslot(self, rows, sign):
-        # there's no difference between minimal and exact matchtypes for this module type.
-        numxslots = int(sign.xslotstructure.number)
-        for row in rows:
-            min_val = self.target_module(row).min_xslots
-            max_val = self.target_module(row).max_xslots
-            if not (self.is_negative(row) ^ (min_val <= numxslots and numxslots <= max_val)):
-                return False
-        return True
-            
-  
-    
-    def sign_matches_SLI(self, sli_rows, sign):
-        # TODO: handle Notes (AdditionalInfo)
-        sli = sign.signlevel_information
-        for row in sli_rows:
-            target_sli = self.target_module(row)
-            if not (self.is_negative(row) ^ signlevelinfo_matches_target(sli, target_sli, self.matchtype)):
-                return False
-        return True
-    
-    
-    def sign_matches_ST(self, rows, sign):
-        # TODO: handle Notes (AdditionalInfo)
 
-        specs_dict = sign.signtype.convertspecstodict() if sign.signtype else {}
-        for row in rows:
-            target_specs_dict = self.target_module(row).convertspecstodict()
-            if not (self.is_negative(row) ^ signtype_matches_target(specs_dict, target_specs_dict, self.matchtype)):
-                return False
-        return True
-
-
-    def sign_matches_handconfig(self, rows, sign):
-        
-        modulelist = [m for m in sign.getmoduledict(ModuleTypes.HANDCONFIG).values()]
-
-        for row in rows:
-            target_module = self.target_module(row)
-            if not (self.is_negative(row) ^ bool(filter_modules_by_target_handconfig(modulelist, target_module, self.matchtype))):
-                return False
-        return True
-        
-    def sign_matches_extendedfingers(self, rows, sign):
-        matching_modules = [m for m in sign.getmoduledict(ModuleTypes.HANDCONFIG).values()]
-
-        for row in rows:
-            target_module = self.target_module(row)
-            if not (self.is_negative(row) ^ bool(filter_modules_by_target_extendedfingers(matching_modules, target_module, self.matchtype))):
-                return False
-        return True
-        
+    def matching_sign_ids(self, corpus, rows, processes=None, job=None, profile=None):
+        """ The signs in corpus that match each of the targets in rows on its own.
+
+            Each target's results come from the result cache (see search/result_cache.py) if they're there. The rest
+            are found together (in a single pass over the corpus, unless processes is given) and added to the cache.
+            job and profile are as for search_corpus().
+        Returns:
+            list with a frozenset of the IDs (id(sign)) of the matching signs for each row, in the same order as rows
+        """
+        job = job or ForegroundJob()
+        cache = searchresultcache()
+        revision = corpusrevision(corpus) if cache.enabled else None
+        steps = [self.plan_step(self.target_type(row), row) for row in rows]
+        fingerprints = [targetfingerprint(step.ttype, step.target) for step in steps]
+        signids = [cache.get(revision, fingerprint) if cache.enabled else None for fingerprint in fingerprints]
+        uncached = [i for i, ids in enumerate(signids) if ids is None]
+        if profile is not None:
+            for step, ids in zip(steps, signids):
+                if ids is not None:
+                    profile.cachedstep(step, len(corpus.signs))
+        if not uncached:
+            return signids
+
+        plans = []
+        for i in uncached:
+            candidates = self.target_candidates(corpus, steps[i].ttype, rows[i], profile)
+            if candidates is not None:
+                steps[i].numcandidates = len(candidates)
+            if profile is not None:
+                profile.profilestep(steps[i], len(corpus.signs))
+            plans.append(planquery(corpus, [steps[i]], candidates))
+            self.searchplans[steps[i].name] = plans[-1]
+        if processes is None:
+            # one pass over the corpus for all the targets; see matchingsignsforeach()
+            job.startphase("Searching", len(corpus.signs))
+            matchingsignslists = matchingsignsforeach(corpus.signs, plans, searchprogress(job))
+        else:
+            job.startphase("Searching", sum(len(plan.candidates) for plan in plans))
+            matchingsignslists = []
+            done = found = 0
+            for plan in plans:
+                signs = self.matching_signs(plan, processes, searchprogress(job, done, found))
+                matchingsignslists.append(signs)
+                done += len(plan.candidates)
+                found += len(signs)
+        if cache.enabled:
+            # (looking at signs might have decoded them, which can change the corpus's revision)
+            revision = corpusrevision(corpus)
+        for i, signs in zip(uncached, matchingsignslists):
+            signids[i] = frozenset(id(sign) for sign in signs)
+            if cache.enabled:
+                cache.put(revision, fingerprints[i], signids[i])
+        return signids
+
+    # a LiveSearchResults (see search/live_results.py) for keeping resultsdict, the results of the search of corpus that
+    #   search_corpus() has just done, up to date as the corpus changes
+    def live_results(self, corpus, resultsdict):
+        selected_rows = self.get_selected_rows()
+        if self.matchdegree == 'all':
+            resultsets = {tuple(self.target_name(row) for row in selected_rows):
+                          [self.plan_step(self.target_type(row), row) for row in selected_rows]}
+        else:
+            resultsets = {self.target_name(row): [self.plan_step(self.target_type(row), row)] for row in selected_rows}
+        liveresults = LiveSearchResults(resultsets)
+        liveresults.seed(corpus.signs, resultsdict)
+        return liveresults
+
+    def search_corpora(self, corpuspaths, loadcorpus, processes=None, searchcorpus=None):
+        """ Search each of several corpora in turn. Only one corpus is loaded at a time: each is let go of before the
+            next is loaded, so however many there are, memory use is only that of the largest.
+        Args:
+            corpuspaths: list of paths of the corpus (.slpaa) files to search
+            loadcorpus: function(path) returning the Corpus in the file at path
+            processes: as for search_corpus()
+            searchcorpus: function(corpus) returning the results of searching it (on the GUI thread, say); by default
+                just search_corpus(corpus, processes)
+        Yields:
+            (path, resultsdict as from search_corpus(), seconds taken to load the corpus, seconds taken to search it)
+            for each corpus, as soon as it's been searched
+        """
+        if searchcorpus is None:
+            searchcorpus = lambda corpus: self.search_corpus(corpus, processes)
+        for corpuspath in corpuspaths:
+            # (the last corpus's plans hold its signs)
+            self.searchplans = {}
+            start = time.perf_counter()
+            corpus = loadcorpus(corpuspath)
+            loaded = time.perf_counter()
+            resultsdict = searchcorpus(corpus)
+            searched = time.perf_counter()
+            del corpus
+            yield corpuspath, resultsdict, loaded - start, searched - loaded
+
+    # a QueryPlan (see search/query_planner.py) for finding the signs in corpus that match all the targets in
+    #   target_dict (target type -> rows). Each row is compiled into a predicate (see search/compiled_targets.py), so
+    #   that nothing about the targets has to be worked out again for each sign, and the predicates are put in order of
+    #   how quickly they're expected to rule signs out.
+    # candidates (if given) is a set of the IDs (id(sign)) of the only signs that could match (eg, as found from the
+    #   result cache); compiledsteps (if given) has the PlanStep for each row, if it's already been compiled;
+    #   profile is as for search_corpus()
+    def plan_search(self, corpus, target_dict, profile=None, candidates=None, compiledsteps=None):
+        steps = []
+        for ttype, rows in target_dict.items():
+            for row in rows:
+                step = compiledsteps[row] if compiledsteps else self.plan_step(ttype, row)
+                rowcandidates = self.target_candidates(corpus, ttype, row, profile)
+                if rowcandidates is not None:
+                    candidates = rowcandidates if candidates is None else candidates & rowcandidates
+                    step.numcandidates = len(rowcandidates)
+                steps.append(step)
+        return planquery(corpus, steps, candidates)
+
+    # a PlanStep for comparing signs with the target in row (of type ttype), compiled
+    def plan_step(self, ttype, row):
+        target = compiletarget(ttype, self.target_module(row), self.target_associatedrelnmodule(row),
+                               matchtype=self.matchtype, negative=self.is_negative(row))
+        return PlanStep(ttype, self.target_name(row), target, self.is_negative(row))
+
+    # progress is as for matchingsignsforeach()
+    def matching_signs(self, plan, processes=None, progress=None):
+        if processes is None:
+            return plan.matchingsigns(progress)
+        return matchingsignsparallel(plan, processes, progress=progress)
+
+    # IDs of the signs in corpus that could match the target in row (of type ttype), or None if the target could match
+    #   any sign
+    # signs whose modules don't have the paths selected in movement, location or relation targets, or the handshape
+    #   or extended fingers selected in (non-negative) hand configuration targets, are ruled out using the corpus's path
+    #   and handshape indexes, so that the search doesn't have to look through every module of every sign
+    # profile is as for search_corpus(); the time spent in the indexes is added to it
+    def target_candidates(self, corpus, ttype, row, profile=None):
+        start = time.perf_counter()
+        candidates = None
+        if ttype in indexedtargettypes:
+            candidates = corpusindex(corpus, PathIndex).candidatesigns(ttype, self.target_module(row))
+        elif ttype == ModuleTypes.HANDCONFIG and not self.is_negative(row):
+            candidates = corpusindex(corpus, HandshapeIndex).candidatesigns(self.target_module(row), self.matchtype)
+        if profile is not None:
+            profile.indexseconds += time.perf_counter() - start
+        return candidates
 
     def unserialize(self, type, serialmodule): # TODO reduce repetition by combining param modules?
         if serialmodule is not None:
             if type in [ModuleTypes.MOVEMENT, TargetTypes.MOV_REL]:
-                mvmttreemodel = MovementTreeModel(serialmodule.movementtree)
+                mvmttree = compactmovementtree(serialmodule.movementtree)
                 articulators = serialmodule.articulators
                 inphase = serialmodule.inphase if (hasattr(serialmodule, 'inphase') and serialmodule.inphase is not None) else 0
                 timingintervals = serialmodule.timingintervals
                 addedinfo = serialmodule.addedinfo if hasattr(serialmodule, 'addedinfo') else AddedInfo()  # for backward compatibility with pre-20230208 movement modules
                 phonlocs = serialmodule.phonlocs
-                unserialized = MovementModule(mvmttreemodel, articulators, timingintervals, phonlocs, addedinfo, inphase)
+                unserialized = MovementModule(None, articulators, timingintervals, phonlocs, addedinfo, inphase, movementtree=mvmttree)
                 
                 return unserialized
             elif type in [ModuleTypes.LOCATION, TargetTypes.LOC_REL]:
-                locntreemodel = LocationTreeModel(serialmodule.locationtree)
+                locntree = compactlocationtree(serialmodule.locationtree)
                 articulators = serialmodule.articulators
                 inphase = serialmodule.inphase if (hasattr(serialmodule, 'inphase') and serialmodule.inphase is not None) else 0
                 timingintervals = serialmodule.timingintervals
                 addedinfo = serialmodule.addedinfo if hasattr(serialmodule, 'addedinfo') else AddedInfo()  # 
                 phonlocs = serialmodule.phonlocs
-                unserialized = LocationModule(locntreemodel, articulators, timingintervals, phonlocs, addedinfo, inphase)
+                unserialized = LocationModule(None, articulators, timingintervals, phonlocs, addedinfo, inphase, locationtree=locntree)
                 return unserialized
             elif type == ModuleTypes.RELATION:
 
@@ -468,6 +539,22 @@ class SearchModel(QStandardItemModel):
 
 
 
+# a progress function for comparing signs with a search's targets (see matchingsignsforeach()) that reports to job,
+#   counting on from the given numbers of signs already compared and matches already found
+def searchprogress(job, donebefore=0, foundbefore=0):
+    return lambda done, found: job.setprogress(donebefore + done,
+                                               "{} matches found so far".format(foundbefore + found))
+
+
+# Loads the search saved (see SearchModelSerializable) in the file at path.
+def load_search_binary(path):
+    with open(path, 'rb') as f:
+        searchmodel = SearchModel(serializedsearchmodel=pickle.load(f))
+        # in case we're loading a search that was originally created on a different machine / in a different folder
+        searchmodel.path = path
+        return searchmodel
+
+
 # This class is a serializable form of the class SearchModel, which is itself not pickleable.
 # Rather than being based on QStandardItemModel, this one uses dictionary structures to convert to
 # and from saveable form.
@@ -547,11 +634,11 @@ class SearchValuesItem:
                 # todisplay.append("Additional info") # TODO could be more specific re type / contents of additional info
             paths = []
             if self.type == ModuleTypes.MOVEMENT:
-                paths = module.movementtreemodel.get_checked_items()
+                paths = module.movementtree.get_checked_items()
                 if len(paths) > 0: self.paths = paths
             elif self.type == ModuleTypes.LOCATION:
                 # paths is a list of dicts: "path", "abbrev", "details"
-                paths = module.locationtreemodel.get_checked_items(only_fully_checked=True, include_details=True)
+                paths = module.locationtree.get_checked_items(only_fully_checked=True, include_details=True)
                 # convert to a list of tuples, since that's what we'll try to match when searching
                 if len(paths) > 0:
                     self.paths = []
@@ -562,8 +649,8 @@ class SearchValuesItem:
                 if not module.phonlocs.allfalse():
                     self.phonlocs = module.phonlocs
                     # todisplay.extend(phonlocsdisplaytext(self.phonlocs))
-                if not module.locationtreemodel.locationtype.allfalse():
-                    self.loctype = module.locationtreemodel.locationtype
+                if not module.locationtree.locationtype.allfalse():
+                    self.loctype = module.locationtree.locationtype
                     # todisplay.extend(loctypedisplaytext(self.loctype))
             # else: # relation
             #     # paths is a dict matching selected articulators to a list of dicts: "path", "abbrev", "details"
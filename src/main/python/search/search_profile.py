@@ -0,0 +1,99 @@
+import time
+from collections import Counter
+
+# Profiling a search, to see where its time goes: for each target, how long was spent comparing signs with it, how many
+# signs the indexes left as candidates for it and how many were compared with it (and passed), and how many modules
+# each stage of its filter (articulators, phonlocs, loctype, paths, etc.; see CompiledModuleTarget.stage()) ruled out.
+# Targets whose results came from the result cache (see search/result_cache.py) weren't compared with any signs.
+
+
+# One target's share of a search.
+class TargetProfile:
+    __slots__ = ('name', 'ttype', 'negative', 'numsigns', 'numcandidates', 'compared', 'passed', 'seconds',
+                 'stagecounts', 'cached')
+
+    def __init__(self, step, numsigns, cached=False):
+        self.name = step.name
+        self.ttype = step.ttype
+        self.negative = step.negative
+        self.numsigns = numsigns
+        # the number of signs the indexes left as candidates, or None if they couldn't narrow them down
+        self.numcandidates = step.numcandidates
+        self.compared = 0
+        self.passed = 0
+        self.seconds = 0.0
+        # stage name -> number of modules it ruled out
+        self.stagecounts = Counter()
+        self.cached = cached
+
+    def candidatesdisplay(self):
+        return str(self.numsigns if self.numcandidates is None else self.numcandidates)
+
+    def stagesdisplay(self):
+        return ", ".join("{}: {}".format(stage, count) for stage, count in self.stagecounts.items())
+
+    def describe(self):
+        name = ("NOT " if self.negative else "") + str(self.name)
+        if self.cached:
+            return "{} ({}): cached".format(name, self.ttype)
+        description = "{} ({}): {} candidates, {} compared, {} passed, {:.1f} ms".format(
+            name, self.ttype, self.candidatesdisplay(), self.compared, self.passed, self.seconds * 1000)
+        if self.stagecounts:
+            description += "; modules ruled out by " + self.stagesdisplay()
+        return description
+
+
+class SearchProfile:
+    """ Per-target times and counts for one search of a corpus; see SearchModel.search_corpus(profile=...).
+
+        Every sign is compared with the targets in this process while a search is being profiled (even if it was asked
+        to use worker processes), so that all the comparisons are counted and timed.
+    """
+
+    def __init__(self):
+        # TargetProfile for each target, in the order they were first compared with signs
+        self.targets = []
+        self.numsigns = 0
+        # seconds taken by the whole search, and by looking up candidates in the indexes (including bringing them up
+        #   to date)
+        self.seconds = 0.0
+        self.indexseconds = 0.0
+
+    # start profiling step (a PlanStep for searching a corpus of numsigns signs): its check is replaced with one that's
+    #   timed and counted, and its target counts the modules each of its filter stages rules out
+    def profilestep(self, step, numsigns):
+        targetprofile = TargetProfile(step, numsigns)
+        self.targets.append(targetprofile)
+        check = step.check
+
+        def profiledcheck(signdata):
+            start = time.perf_counter()
+            passed = check(signdata)
+            targetprofile.seconds += time.perf_counter() - start
+            targetprofile.compared += 1
+            if passed:
+                targetprofile.passed += 1
+            return passed
+
+        step.check = profiledcheck
+        if hasattr(step.target, "countstages"):
+            step.target.countstages(targetprofile.stagecounts)
+        return targetprofile
+
+    # step's results came from the result cache
+    def cachedstep(self, step, numsigns):
+        targetprofile = TargetProfile(step, numsigns, cached=True)
+        self.targets.append(targetprofile)
+        return targetprofile
+
+    def summary(self):
+        return "Searched {} signs in {:.1f} ms ({:.1f} ms in the indexes)".format(
+            self.numsigns, self.seconds * 1000, self.indexseconds * 1000)
+
+    def describe(self):
+        lines = [self.summary() + ":"]
+        lines.extend("  " + targetprofile.describe() for targetprofile in self.targets)
+        return "\n".join(lines)
+
+    def __str__(self):
+        return self.describe()
@@ -0,0 +1,49 @@
+# Base class for indexes over a corpus's signs that are used to narrow down searches (see PathIndex and HandshapeIndex).
+# Signs are identified by id(), since their hashes depend on their entry IDs, which can change. An index is kept up to
+#   date incrementally: update() only (re)indexes signs that have been added to the corpus or changed (ie whose
+#   revision has gone up) since the last update, and drops signs that have been removed.
+# Subclasses implement indexsign(), which adds a sign's modules to the index and returns whatever unindexsign() will
+#   need to take them out again.
+class SignIndex:
+
+    def __init__(self):
+        # id(sign) -> (sign, its revision when indexed, what indexsign() returned for it)
+        self._indexedsigns = {}
+
+    def __len__(self):
+        return len(self._indexedsigns)
+
+    def update(self, signs):
+        seen = set()
+        for sign in signs:
+            signid = id(sign)
+            seen.add(signid)
+            indexed = self._indexedsigns.get(signid)
+            if indexed is None or indexed[0] is not sign or indexed[1] != sign.revision:
+                if indexed is not None:
+                    self._removesign(signid)
+                indexed = self.indexsign(signid, sign)
+                # (read after the modules, since looking at them might have decoded the sign, which can change its revision)
+                self._indexedsigns[signid] = (sign, sign.revision, indexed)
+        for signid in [signid for signid in self._indexedsigns if signid not in seen]:
+            self._removesign(signid)
+
+    def _removesign(self, signid):
+        _, _, indexed = self._indexedsigns.pop(signid)
+        self.unindexsign(signid, indexed)
+
+    def indexsign(self, signid, sign):
+        raise NotImplementedError
+
+    def unindexsign(self, signid, indexed):
+        raise NotImplementedError
+
+
+# corpus's index of type indexclass (a subclass of SignIndex), brought up to date with its current signs
+#   (it's built the first time it's needed)
+def corpusindex(corpus, indexclass):
+    index = corpus.searchindexes.get(indexclass)
+    if index is None:
+        index = corpus.searchindexes[indexclass] = indexclass()
+    index.update(corpus.signs)
+    return index
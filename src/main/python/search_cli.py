@@ -0,0 +1,124 @@
+import argparse
+import multiprocessing
+import os
+import pickle
+import sys
+import zlib
+
+from PyQt5.QtCore import QCoreApplication, QSettings
+
+from lexicon.lexicon_classes import loadcorpusfile
+from lexicon.module_classes import setdefaultentryidsettings
+from search.results import ResultSummaryModel, IndividualSummaryModel, write_results
+from search.search_models import load_search_binary
+from search.search_profile import SearchProfile
+
+# Runs a saved search (.slpst, as saved from the search window) over one or more corpora (.slpaa) without the GUI, and
+# writes the summary and/or individual results in the same formats as exporting them from the results window.
+#
+# Run from src/main/python, eg:
+#     python search_cli.py handshapes.slpst corpus1.slpaa corpus2.slpaa --matchdegree any --summary summary.tsv
+#         --individual individual.json
+
+
+resultformats = ["tsv", "json", "xml"]
+
+# what reading a corpus file or one of its signs' records raises if the file is missing, damaged or not a corpus file
+readerrors = (OSError, pickle.UnpicklingError, EOFError, ValueError, zlib.error)
+
+
+# the corpus in the file at path, or exits if it can't be loaded
+def loadcorpus(path):
+    try:
+        return loadcorpusfile(path)
+    except readerrors as e:
+        sys.exit("Could not load the corpus from {}: {}".format(path, e))
+
+
+# the format to write results to path in: the one given, or else the one the file extension says (tsv if it's not
+#   .json or .xml, as when exporting from the results window)
+def resultformat(path, fileformat=None):
+    if fileformat is not None:
+        return fileformat
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    return extension if extension in resultformats else "tsv"
+
+
+def argumentparser():
+    parser = argparse.ArgumentParser(description="Run a saved SLP-AA search over one or more corpora.")
+    parser.add_argument("search", help="saved search targets file (.slpst)")
+    parser.add_argument("corpora", nargs="+", help="corpus files (.slpaa) to search")
+    parser.add_argument("--matchtype", choices=["minimal", "exact"], default="minimal",
+                        help="how closely signs have to match the targets (default: minimal)")
+    parser.add_argument("--matchdegree", choices=["all", "any"], default="all",
+                        help="whether signs have to match all the targets together, or each target is searched for "
+                             "separately (default: all)")
+    parser.add_argument("--summary", metavar="PATH", help="file to write the summary results (frequencies) to")
+    parser.add_argument("--individual", metavar="PATH", help="file to write the individual matching signs to")
+    parser.add_argument("--format", choices=resultformats, dest="fileformat",
+                        help="format of the results files (default: from each file's extension, or tsv)")
+    parser.add_argument("--processes", type=int,
+                        help="compare signs with the targets in this many worker processes")
+    parser.add_argument("--profile", action="store_true",
+                        help="print how long each target took, and how many signs and modules it ruled out "
+                             "(compares every sign in this process, whatever --processes says)")
+    return parser
+
+
+def main(argv=None):
+    parser = argumentparser()
+    args = parser.parse_args(argv)
+    if args.summary is None and args.individual is None:
+        parser.error("at least one of --summary and --individual is needed")
+
+    # the corpora's and search's Qt models need an application, but not a GUI one
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+    # the same as MainWindow's, so that the app's settings (eg which entry ID elements to show) are read from the same
+    #   place, with the same defaults if the app has never been run
+    QCoreApplication.setOrganizationName("UBC Phonology Tools")
+    QCoreApplication.setApplicationName("Sign Language Phonetic Annotator and Analyzer")
+    setdefaultentryidsettings(QSettings())
+
+    try:
+        searchmodel = load_search_binary(args.search)
+    except (OSError, pickle.UnpicklingError, EOFError) as e:
+        print("Could not load the search from {}: {}".format(args.search, e), file=sys.stderr)
+        return 1
+    if not searchmodel.get_selected_rows():
+        print("{} has no included targets to search for".format(args.search), file=sys.stderr)
+        return 1
+    searchmodel.matchtype = args.matchtype
+    searchmodel.matchdegree = args.matchdegree
+
+    # (signs are only decoded from the corpus file as the search needs them, so a damaged one shows up here)
+    def searchcorpus(corpus):
+        profile = SearchProfile() if args.profile else None
+        try:
+            resultsdict = searchmodel.search_corpus(corpus, args.processes, profile=profile)
+        except readerrors as e:
+            sys.exit("Could not read the signs of {}: {}".format(corpus.path, e))
+        if profile is not None:
+            print("{}: {}".format(corpus.path, profile), file=sys.stderr)
+        return resultsdict
+
+    summarymodel = ResultSummaryModel()
+    individualmodel = IndividualSummaryModel()
+    # (one corpus at a time)
+    for corpuspath, resultsdict, loadseconds, searchseconds in searchmodel.search_corpora(
+            args.corpora, loadcorpus, searchcorpus=searchcorpus):
+        print("{}: loaded in {:.2f} s, searched in {:.2f} s".format(corpuspath, loadseconds, searchseconds),
+              file=sys.stderr)
+        summarymodel.populate(resultsdict)
+        individualmodel.populate(resultsdict)
+
+    if args.summary is not None:
+        write_results(summarymodel, args.summary, resultformat(args.summary, args.fileformat))
+    if args.individual is not None:
+        write_results(individualmodel, args.individual, resultformat(args.individual, args.fileformat))
+    return 0
+
+
+if __name__ == '__main__':
+    # needed for worker processes (eg for searching in parallel) in a frozen build
+    multiprocessing.freeze_support()
+    sys.exit(main())
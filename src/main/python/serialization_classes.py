@@ -1,12 +1,20 @@
+from collections import defaultdict
 from copy import copy
+import bz2
 import io
+import lzma
+import os
 import pickle
+import shutil
+import tempfile
+import zlib
 
 from PyQt5.QtCore import Qt
 
-from lexicon.module_classes import PhonLocations, AddedInfo, LocationType
-from models.movement_models import fx
-from constant import HAND, userdefinedroles as udr
+from lexicon.module_classes import PhonLocations, AddedInfo, LocationType, sharedifempty
+from models.movement_models import fx, movementoptionspaths
+from models.path_registry import pathregistry
+from constant import HAND, MIGRATION_VERSION, userdefinedroles as udr
 import logging
 
 class ParameterModuleSerializable:
@@ -80,7 +88,7 @@ class LocationModuleSerializable(ParameterModuleSerializable):
 
         # creates a full serializable copy of the location module, eg for saving to disk
         self._inphase = locnmodule.inphase
-        self.locationtree = LocationTreeSerializable(locnmodule.locationtreemodel)
+        self.locationtree = LocationTreeSerializable(locnmodule.locationtree)
 
     @property
     def inphase(self):
@@ -126,7 +134,7 @@ class MovementModuleSerializable(ParameterModuleSerializable):
 
         # creates a full serializable copy of the movement module, eg for saving to disk
         self._inphase = mvmtmodule.inphase
-        self.movementtree = MovementTreeSerializable(mvmtmodule.movementtreemodel)
+        self.movementtree = MovementTreeSerializable(mvmtmodule.movementtree)
 
     @property
     def inphase(self):
@@ -144,6 +152,8 @@ class MovementModuleSerializable(ParameterModuleSerializable):
 # Rather than being based on QStandardItemModel, this one uses dictionary structures to convert to
 # and from saveable form.
 class MovementTreeSerializable:
+    # class-level default, for backward compatibility with trees serialized before migration versions existed
+    migrationversion = 0
 
     def __init__(self, mvmttreemodel=None, infodicts=None):
 
@@ -157,20 +167,29 @@ class MovementTreeSerializable:
             # just import the dicts directly-- not from an existing MovementTreeModel
             self.__dict__.update(infodicts)
 
-        else:
+        elif isinstance(mvmttreemodel, MovementTreeSerializable):
+            # copy an existing serialized tree, eg from a movement module whose tree model has never been built
+            self.checkstates = dict(mvmttreemodel.checkstates)
+            self.addedinfos = {pathtext: sharedifempty(copy(addedinfo)) for pathtext, addedinfo in mvmttreemodel.addedinfos.items()}
+            self.userspecifiedvalues = dict(mvmttreemodel.userspecifiedvalues)
+            self.migrationversion = mvmttreemodel.migrationversion
+
+        elif mvmttreemodel is not None:
             # creates a full serializable copy of the movement tree, eg for saving to disk
             treenode = mvmttreemodel.invisibleRootItem()
             self.collectdatafromMovementTreeModel(treenode)
+            # a tree model's paths are always current
+            self.migrationversion = MIGRATION_VERSION
 
     def collectdatafromMovementTreeModel(self, treenode):
         if treenode is not None:
             for r in range(treenode.rowCount()):
                 treechild = treenode.child(r, 0)
                 if treechild is not None:
-                    pathtext = treechild.data(Qt.UserRole + udr.pathdisplayrole)
+                    pathtext = pathregistry.intern(treechild.data(Qt.UserRole + udr.pathdisplayrole))
                     checkstate = treechild.checkState()
                     addedinfo = treechild.addedinfo
-                    self.addedinfos[pathtext] = copy(addedinfo)
+                    self.addedinfos[pathtext] = sharedifempty(copy(addedinfo))
                     iseditable = treechild.data(Qt.UserRole + udr.isuserspecifiablerole) != fx
                     userspecifiedvalue = treechild.data(Qt.UserRole + udr.userspecifiedvaluerole)
                     if iseditable:
@@ -179,11 +198,42 @@ class MovementTreeSerializable:
                     self.checkstates[pathtext] = checkstate
                 self.collectdatafromMovementTreeModel(treechild)
 
+    # The methods below answer the same read-only queries as the corresponding MovementTreeModel methods,
+    # so that movement modules can be abbreviated and searched without building a (Qt) tree model.
+
+    def get_checked_from_serialized_tree(self):
+        return [pathtext for pathtext, checkstate in self.checkstates.items() if checkstate == Qt.Checked]
+
+    # checked paths that don't exist in the current movement options tree
+    def compare_checked_lists(self):
+        optionspaths = movementoptionspaths()
+        return [pathtext for pathtext in self.get_checked_from_serialized_tree() if pathtext not in optionspaths]
+
+    # see MovementTreeModel.get_checked_items(); items are returned in the same (tree) order
+    def get_checked_items(self, only_fully_checked=False, include_details=False):
+        optionspaths = movementoptionspaths()
+        checkstate_to_match = Qt.Checked if only_fully_checked else Qt.PartiallyChecked
+        checkedpaths = [pathtext for pathtext, checkstate in self.checkstates.items()
+                        if checkstate >= checkstate_to_match and pathtext in optionspaths]
+        checkedpaths.sort(key=lambda pathtext: optionspaths[pathtext][0])
+
+        if include_details:
+            return [{'path': pathtext,
+                     'abbrev': optionspaths[pathtext][1],
+                     'usv': self.userspecifiedvalues.get(pathtext, "")} for pathtext in checkedpaths]
+        return checkedpaths
+
 
 # This class is a serializable form of the class LocationTreeModel, which is itself not pickleable.
 # Rather than being based on QStandardItemModel, this one uses dictionary structures to convert to
 # and from saveable form.
 class LocationTreeSerializable:
+    # class-level defaults, for backward compatibility with trees serialized before these attributes existed
+    multiple_selection_allowed = False
+    nodes_are_terminal = False
+    defaultneutralselected = False
+    defaultneutrallist = None
+    migrationversion = 0
 
     def __init__(self, locntreemodel=None):
 
@@ -197,9 +247,20 @@ class LocationTreeSerializable:
         self.defaultneutralselected = False
         self.defaultneutrallist = None
 
-        # creates a full serializable copy of the location tree, eg for saving to disk
-        treenode = locntreemodel.invisibleRootItem()
-        self.collectdatafromLocationTreeModel(treenode)
+        if isinstance(locntreemodel, LocationTreeSerializable):
+            # copy an existing serialized tree, eg from a location module whose tree model has never been built
+            self.checkstates = dict(locntreemodel.checkstates)
+            self.detailstables = {pathtext: LocationTableSerializable(locntable) for pathtext, locntable in locntreemodel.detailstables.items()}
+            self.addedinfos = {pathtext: sharedifempty(copy(addedinfo)) for pathtext, addedinfo in locntreemodel.addedinfos.items()}
+            self.migrationversion = locntreemodel.migrationversion
+        elif locntreemodel is not None:
+            # creates a full serializable copy of the location tree, eg for saving to disk
+            treenode = locntreemodel.invisibleRootItem()
+            self.collectdatafromLocationTreeModel(treenode)
+            # a tree model's paths are always current
+            self.migrationversion = MIGRATION_VERSION
+        else:
+            return
         self.locationtype = copy(locntreemodel.locationtype)
         self.multiple_selection_allowed = locntreemodel.multiple_selection_allowed
         self.nodes_are_terminal = locntreemodel.nodes_are_terminal
@@ -212,11 +273,11 @@ class LocationTreeSerializable:
             for r in range(treenode.rowCount()):
                 treechild = treenode.child(r, 0)
                 if treechild is not None:
-                    pathtext = treechild.data(Qt.UserRole + udr.pathdisplayrole)
+                    pathtext = pathregistry.intern(treechild.data(Qt.UserRole + udr.pathdisplayrole))
                     checkstate = treechild.checkState()
-                    locntable = treechild.detailstable
+                    locntable = treechild.readonlydetailstable
                     addedinfo = treechild.addedinfo
-                    self.addedinfos[pathtext] = copy(addedinfo)
+                    self.addedinfos[pathtext] = sharedifempty(copy(addedinfo))
                     self.detailstables[pathtext] = LocationTableSerializable(locntable)
                     self.checkstates[pathtext] = checkstate
                     iseditable = treechild.data(Qt.UserRole + udr.isuserspecifiablerole) != fx
@@ -226,6 +287,39 @@ class LocationTreeSerializable:
 
                 self.collectdatafromLocationTreeModel(treechild)
 
+    # The methods below answer the same read-only queries as the corresponding LocationTreeModel methods,
+    # so that location modules can be abbreviated and searched without building a (Qt) tree model.
+
+    def get_checked_from_serialized_tree(self):
+        return [pathtext for pathtext, checkstate in self.checkstates.items() if checkstate == Qt.Checked]
+
+    # checked paths that don't exist in the current location options tree (for this location type)
+    def compare_checked_lists(self):
+        optionspaths = self.optionspaths()
+        return [pathtext for pathtext in self.get_checked_from_serialized_tree() if pathtext not in optionspaths]
+
+    # see LocationTreeModel.get_checked_items(); items are returned in the same (tree) order
+    def get_checked_items(self, only_fully_checked=True, include_details=False):
+        optionspaths = self.optionspaths()
+        checkstate_to_match = Qt.Checked if only_fully_checked else Qt.PartiallyChecked
+        checkedpaths = [pathtext for pathtext, checkstate in self.checkstates.items()
+                        if checkstate >= checkstate_to_match and pathtext in optionspaths]
+        checkedpaths.sort(key=lambda pathtext: optionspaths[pathtext][0])
+
+        if include_details:
+            return [{'path': pathtext,
+                     'abbrev': optionspaths[pathtext][1],
+                     'details': self.detailstables.get(pathtext, LocationTableSerializable())} for pathtext in checkedpaths]
+        return checkedpaths
+
+    def hasselections(self):
+        return len(self.get_checked_from_serialized_tree()) > 0
+
+    def optionspaths(self):
+        # imported here rather than at the top of the file, because models.location_models imports this module
+        from models.location_models import locationoptionspaths
+        return locationoptionspaths(self.locationtype)
+
 
 # This class is a serializable form of the class LocationTableModel, which is itself not pickleable.
 # Rather than being based on QAbstractTableModel, this one uses the underlying lists from the
@@ -236,15 +330,32 @@ class LocationTableSerializable:
         self.col_labels = ["", ""]
         self.col_contents = [[], []]
 
-        # creates a full serializable copy of the location table, eg for saving to disk
-        self.col_labels = locntablemodel.col_labels
-        self.col_contents = locntablemodel.col_contents
+        if isinstance(locntablemodel, LocationTableSerializable):
+            # copy an existing serialized table
+            self.col_labels = list(locntablemodel.col_labels)
+            self.col_contents = [[[txt, checked] for txt, checked in col] for col in locntablemodel.col_contents]
+        elif locntablemodel is not None:
+            # creates a full serializable copy of the location table, eg for saving to disk
+            self.col_labels = locntablemodel.col_labels
+            self.col_contents = locntablemodel.col_contents
 
     def isempty(self):
         labelsempty = self.col_labels == ["", ""]
         contentsempty = self.col_contents == [[], []]
         return labelsempty and contentsempty
 
+    # see LocationTableModel.get_checked_values()
+    def get_checked_values(self):
+        details_dict = {key: [] for key in self.col_labels}
+        for i, detail in enumerate(self.col_labels):
+            for surface, checked in self.col_contents[i]:
+                if checked:  # if the surface or subarea is checked
+                    details_dict[detail].append(surface)
+        return details_dict
+
+    def hascheckedvalues(self):
+        return True in [checked for col in self.col_contents for txt, checked in col]
+
     def __repr__(self):
         return '<LocationTableSerializable: ' + repr(self.col_labels) + ' / ' + repr(self.col_contents) + '>'
 
@@ -318,6 +429,349 @@ def renamed_loads(pickled_bytes):
     return renamed_load(file_obj)
 
 
+# As of 20261018, corpora are saved as indexed corpus files rather than as a single pickled Corpus.serialize() dict
+# (which can still be loaded with renamed_load). An indexed corpus file consists of
+#   - indexedcorpusmagic
+#   - an indexed block with the corpus-level info and all of the corpus's signs
+#   - zero or more journal entries, each an indexed block with the corpus-level info, the signs that were changed or
+#       added, and the entry IDs of signs that were removed, as of a save since the file was last written in full
+# where an indexed block consists of
+#   - the length in bytes of the header (8 bytes, big-endian)
+#   - the header: a pickled dict with the corpus-level info and an index with an entry for each sign, giving its
+#       sign-level info (entry ID, glosses, lemma, ID-gloss, dates, etc) and the offset/length of its record
+#   - the sign records, each a separately pickled Sign.serializerecord() dict
+# so that the corpus can be listed as soon as the headers are read, each sign decoded only when it's needed,
+# and a save only has to write the signs that have changed.
+# As of format version 2, each header and sign record may be compressed (see recordcodecs).
+# As of format version 3, each index entry has the crc32 of its (stored) record, and each header has a 'file stamp' that
+# is new every time the file is written in full, so that a save copying records from a file can check that the file
+# hasn't been replaced since they were read (see readcopiedrecords()).
+# Every header has its block's 'format version'; files written by a later version of the format can't be read.
+indexedcorpusmagic = b'SLPAA indexed corpus\n'
+indexedcorpusversion = 3
+# a full save (rather than another journal entry) is done once there are this many journal entries,
+# or once the journal entries take up more space than the signs in the file's first block
+maxjournalentries = 50
+
+
+# A compression codec that the headers and sign records of an indexed corpus file can be stored with.
+# Each compressed header or record starts with its codec's magic bytes, so reading one never needs to be told which
+# codec (if any) it was written with: a pickle (protocol 2 or higher) always starts with b'\x80', which none of the
+# codecs' magic bytes do. levels is the (lowest, highest) compression level the codec accepts.
+class RecordCodec:
+
+    def __init__(self, name, magic, compress, decompress, levels, defaultlevel):
+        self.name = name
+        self.magic = magic
+        self.compress = compress
+        self.decompress = decompress
+        self.levels = levels
+        self.defaultlevel = defaultlevel
+
+
+# codec name -> RecordCodec; to support another codec, add it here
+recordcodecs = {codec.name: codec for codec in [
+    RecordCodec('zlib', b'\x78', lambda data, level: zlib.compress(data, level), zlib.decompress, (1, 9), 6),
+    RecordCodec('lzma', b'\xfd7zXZ\x00', lambda data, level: lzma.compress(data, preset=level), lzma.decompress, (0, 9), 6),
+    RecordCodec('bz2', b'BZh', lambda data, level: bz2.compress(data, level), bz2.decompress, (1, 9), 9),
+]}
+# the codec setting for storing headers and records uncompressed
+nocompression = 'none'
+
+
+# returns the RecordCodec that recordbytes (a header or sign record) was compressed with, or None if it wasn't
+def recordcodec(recordbytes):
+    for codec in recordcodecs.values():
+        if recordbytes.startswith(codec.magic):
+            return codec
+    return None
+
+
+# compression is a (codec name, level) pair; a codec name of nocompression (or compression of None) leaves
+# recordbytes as they are
+# recordbytes that are already compressed (eg, copied from an existing file) are only recompressed if they were
+# compressed with a different codec
+def compressrecord(recordbytes, compression=None):
+    codecname, level = compression or (nocompression, None)
+    currentcodec = recordcodec(recordbytes)
+    if currentcodec is not None and currentcodec.name == codecname:
+        return recordbytes
+    if currentcodec is not None:
+        recordbytes = currentcodec.decompress(recordbytes)
+    if codecname == nocompression:
+        return recordbytes
+    return recordcodecs[codecname].compress(recordbytes, level)
+
+
+def decompressrecord(recordbytes):
+    codec = recordcodec(recordbytes)
+    return recordbytes if codec is None else codec.decompress(recordbytes)
+
+
+# unpickle a header or sign record, whether or not it's compressed
+def loadrecord(recordbytes):
+    return renamed_loads(decompressrecord(recordbytes))
+
+
+# The location of one sign's record in an indexed corpus file, along with its sign-level info from the index
+# crc is the record's crc32 and stamp is the file stamp of the file it's in, or None for files written before format
+# version 3
+class SignRecord:
+
+    def __init__(self, path, offset, length, serializedsignlevelinfo, crc=None, stamp=None):
+        self.path = path
+        self.offset = offset
+        self.length = length
+        self.serializedsignlevelinfo = serializedsignlevelinfo
+        self.crc = crc
+        self.stamp = stamp
+
+    def readbytes(self):
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            return checkrecordbytes(f.read(self.length), self)
+
+    def read(self):
+        return loadrecord(self.readbytes())
+
+
+# raises ValueError unless recordbytes are all of signrecord's record, as it was when written
+def checkrecordbytes(recordbytes, signrecord):
+    if len(recordbytes) != signrecord.length \
+            or (signrecord.crc is not None and zlib.crc32(recordbytes) != signrecord.crc):
+        raise ValueError("Damaged sign record (offset {}, length {}) in {}".format(
+            signrecord.offset, signrecord.length, signrecord.path))
+    return recordbytes
+
+
+# a new file stamp, for a file that's about to be written in full
+def newfilestamp():
+    return os.urandom(8).hex()
+
+
+# the file stamp of the indexed corpus file at path (None if it was written before format version 3)
+def readfilestamp(path):
+    with open(path, 'rb') as f:
+        return filestamp(f, path)
+
+
+# the file stamp of the indexed corpus file open (for binary reading) as file_obj, from path
+def filestamp(file_obj, path):
+    file_obj.seek(0)
+    if file_obj.read(len(indexedcorpusmagic)) != indexedcorpusmagic:
+        raise ValueError("Not an indexed corpus file: " + path)
+    header, _ = readindexedblock(file_obj, os.fstat(file_obj.fileno()).st_size)
+    if header is None:
+        raise ValueError("Incomplete indexed corpus file: " + path)
+    return header.get('file stamp')
+
+
+# the bytes of each of signrecords (which may come from several files), for copying into a file being saved
+# each file is opened only once, and its records are read in the order they're in in the file
+# raises ValueError if any of the files they come from has been written in full (eg, replaced by saving another corpus
+#   to the same path) since the records were read from it, or if any of the records is damaged, rather than copy
+#   the wrong bytes
+def readcopiedrecords(signrecords):
+    # (path, stamp) -> indices in signrecords of the records from that file
+    recordsbyfile = defaultdict(list)
+    for index, signrecord in enumerate(signrecords):
+        recordsbyfile[(signrecord.path, signrecord.stamp)].append(index)
+    copiedrecords = [None] * len(signrecords)
+    for (path, stamp), indices in recordsbyfile.items():
+        with open(path, 'rb') as f:
+            if filestamp(f, path) != stamp:
+                raise ValueError(path + " has been replaced since its signs were read, so they can't be copied from it")
+            for index in sorted(indices, key=lambda index: signrecords[index].offset):
+                signrecord = signrecords[index]
+                f.seek(signrecord.offset)
+                copiedrecords[index] = checkrecordbytes(f.read(signrecord.length), signrecord)
+    return copiedrecords
+
+
+# (inode, modification time, size) of the file at path, or None if there isn't one; if this hasn't changed, nothing
+#   else has written to the file
+def fileidentity(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def isindexedcorpusfile(path):
+    with open(path, 'rb') as f:
+        return f.read(len(indexedcorpusmagic)) == indexedcorpusmagic
+
+
+# returns a dict with the same keys as Corpus.serialize(), except that 'signs' is a list of SignRecords,
+# plus 'indexed file', with info about the file needed to decide whether the next save can be a journal entry
+def readindexedcorpus(path):
+    with open(path, 'rb') as f:
+        stat = os.fstat(f.fileno())
+        filelength = stat.st_size
+        if f.read(len(indexedcorpusmagic)) != indexedcorpusmagic:
+            raise ValueError("Not an indexed corpus file: " + path)
+        header, signrecords = readindexedblock(f, filelength)
+        if header is None:
+            raise ValueError("Incomplete indexed corpus file: " + path)
+        signrecordsbyid = {signrecord.serializedsignlevelinfo['entryid']: signrecord for signrecord in signrecords}
+        baselength = f.tell()
+
+        journalentries = 0
+        while f.tell() < filelength:
+            entryheader, entrysignrecords = readindexedblock(f, filelength)
+            if entryheader is None:
+                # an incomplete journal entry (eg, if the app crashed while saving) is ignored
+                break
+            header.update({k: v for k, v in entryheader.items()
+                           if k not in ['index', 'records length', 'removed', 'file stamp']})
+            for entryid in entryheader['removed']:
+                signrecordsbyid.pop(entryid, None)
+            for signrecord in entrysignrecords:
+                signrecordsbyid[signrecord.serializedsignlevelinfo['entryid']] = signrecord
+            journalentries += 1
+        validlength = f.tell()
+
+    serializedcorpus = {k: v for k, v in header.items() if k not in ['index', 'records length', 'file stamp']}
+    serializedcorpus['signs'] = list(signrecordsbyid.values())
+    serializedcorpus['indexed file'] = {
+        'path': path,
+        'identity': (stat.st_ino, stat.st_mtime_ns, stat.st_size),
+        'stamp': header.get('file stamp'),
+        'length': validlength,
+        'base length': baselength,
+        'journal entries': journalentries,
+        'entry ids': set(signrecordsbyid.keys()),
+    }
+    return serializedcorpus
+
+
+# returns the header and SignRecords of the indexed block starting at the current position of file_obj,
+# or (None, []) if the block is incomplete, in which case the file position is left where the block starts
+# raises ValueError if the block is complete but isn't one this version of the format can read
+def readindexedblock(file_obj, filelength):
+    blockstart = file_obj.tell()
+    headerlengthbytes = file_obj.read(8)
+    headerlength = int.from_bytes(headerlengthbytes, 'big')
+    recordsstart = blockstart + 8 + headerlength
+    if len(headerlengthbytes) < 8 or recordsstart > filelength:
+        file_obj.seek(blockstart)
+        return None, []
+    try:
+        header = loadrecord(file_obj.read(headerlength))
+    except Exception as e:
+        raise ValueError("Unreadable block header at byte {} of {}: {}".format(blockstart, file_obj.name, e)) from e
+    checkindexedheader(header, file_obj.name, blockstart)
+    if recordsstart + header['records length'] > filelength:
+        file_obj.seek(blockstart)
+        return None, []
+    file_obj.seek(recordsstart + header['records length'])
+    stamp = header.get('file stamp')
+    return header, [SignRecord(file_obj.name, recordsstart + entry['offset'], entry['length'], entry['signlevel'],
+                               entry.get('crc'), stamp)
+                    for entry in header['index']]
+
+
+# raises ValueError unless header (read from the block at blockstart in the file at path) has a format version this
+# code can read and an index whose records all lie within the block's records
+def checkindexedheader(header, path, blockstart):
+    where = "block at byte {} of {}".format(blockstart, path)
+    if not isinstance(header, dict) or not {'format version', 'index', 'records length'} <= header.keys():
+        raise ValueError("Not an indexed corpus block header: " + where)
+    version = header['format version']
+    if not isinstance(version, int) or version < 1:
+        raise ValueError("Unknown indexed corpus format version {!r}: {}".format(version, where))
+    if version > indexedcorpusversion:
+        raise ValueError("Indexed corpus format version {} is newer than this version of SLPAA can read "
+                         "(version {}): {}".format(version, indexedcorpusversion, where))
+    recordslength = header['records length']
+    for entry in header['index']:
+        if not 0 <= entry['offset'] <= entry['offset'] + entry['length'] <= recordslength:
+            raise ValueError("Sign record (offset {}, length {}) outside the block's {} bytes of records: {}".format(
+                entry['offset'], entry['length'], recordslength, where))
+
+
+# serializedcorpus is as from Corpus.serializeindexed(); ie, the same keys as Corpus.serialize() except that 'signs' is
+# a list of (serialized sign-level info, sign record) pairs, where each sign record is either the pickled bytes or
+# a SignRecord to copy them from (see Sign.snapshotrecord())
+# returns the SignRecords (in the same order as serializedcorpus['signs']) for the file just written, which refer to
+# recordspath if given (eg, if file_obj is a temporary file that's about to be renamed) or else to file_obj's name
+# compression is as for compressrecord()
+# serializedcorpus can give the new file's 'file stamp' (see newfilestamp()); if it doesn't, a new one is made
+def writeindexedcorpus(file_obj, serializedcorpus, recordspath=None, compression=None):
+    file_obj.write(indexedcorpusmagic)
+    if 'file stamp' not in serializedcorpus:
+        serializedcorpus = dict(serializedcorpus, **{'file stamp': newfilestamp()})
+    return writeindexedblock(file_obj, serializedcorpus, recordspath, compression)
+
+
+# writes serializedcorpus (as for writeindexedcorpus()) to a new temporary file in the same folder as path, so that
+# it can then replace the file at path with an atomic rename (see replacewithtempfile()), and a crash partway through
+# writing never leaves a corrupt corpus file behind
+# returns the path of the temporary file and the SignRecords (which refer to path, not to the temporary file)
+def writeindexedcorpustempfile(path, serializedcorpus, compression=None):
+    folder, filename = os.path.split(os.path.abspath(path))
+    filedescriptor, temppath = tempfile.mkstemp(prefix='.' + filename + '.', suffix='.tmp', dir=folder)
+    try:
+        with os.fdopen(filedescriptor, 'wb') as f:
+            signrecords = writeindexedcorpus(f, serializedcorpus, recordspath=path, compression=compression)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(path):
+            shutil.copymode(path, temppath)
+    except BaseException:
+        os.remove(temppath)
+        raise
+    return temppath, signrecords
+
+
+def replacewithtempfile(temppath, path):
+    os.replace(temppath, path)
+
+
+# serializedchanges is as from Corpus.serializechanges(); ie, the same as for writeindexedcorpus() but with only the
+# signs that have changed since the file was last read or written, plus 'removed' (a list of entry IDs) and the file's
+# 'file stamp' (which a journal entry doesn't change)
+# file_obj must be positioned at the end of the file's last complete block
+# returns the SignRecords (in the same order as serializedchanges['signs']) for the journal entry just written
+# (no temporary file is needed here: if writing is interrupted, the incomplete journal entry is ignored when reading)
+def appendindexedcorpusjournal(file_obj, serializedchanges, compression=None):
+    file_obj.truncate()
+    signrecords = writeindexedblock(file_obj, serializedchanges, compression=compression)
+    file_obj.flush()
+    os.fsync(file_obj.fileno())
+    return signrecords
+
+
+def writeindexedblock(file_obj, serializedcorpus, recordspath=None, compression=None):
+    copied = iter(readcopiedrecords([record for _, record in serializedcorpus['signs'] if isinstance(record, SignRecord)]))
+    signs = [(serializedsignlevelinfo,
+              compressrecord(next(copied) if isinstance(record, SignRecord) else record, compression))
+             for serializedsignlevelinfo, record in serializedcorpus['signs']]
+    index = []
+    offset = 0
+    for serializedsignlevelinfo, recordbytes in signs:
+        index.append({'signlevel': serializedsignlevelinfo, 'offset': offset, 'length': len(recordbytes),
+                      'crc': zlib.crc32(recordbytes)})
+        offset += len(recordbytes)
+    header = {k: v for k, v in serializedcorpus.items() if k != 'signs'}
+    header['format version'] = indexedcorpusversion
+    header['index'] = index
+    header['records length'] = offset
+    headerbytes = compressrecord(pickle.dumps(header, protocol=pickle.HIGHEST_PROTOCOL), compression)
+
+    blockstart = file_obj.tell()
+    file_obj.write(len(headerbytes).to_bytes(8, 'big'))
+    file_obj.write(headerbytes)
+    for _, recordbytes in signs:
+        file_obj.write(recordbytes)
+
+    recordsstart = blockstart + 8 + len(headerbytes)
+    return [SignRecord(recordspath or file_obj.name, recordsstart + entry['offset'], entry['length'], entry['signlevel'],
+                       entry['crc'], header.get('file stamp'))
+            for entry in index]
+
+
 # copied and adapted from
 # https://github.com/pydantic/pydantic/blob/fd2991fe6a73819b48c906e3c3274e8e47d0f761/pydantic/utils.py#L200
 # ... otherwise importable from pydantic.utils import deep_update